@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import argparse
+import time
+
+from kicad.pcbnew import FootprintIndex
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='build and search an index of footprint libraries')
+
+    parser.add_argument('index', help='index file, created when it does not exist', action='store')
+    parser.add_argument('--scan', help='.pretty libraries to add or refresh', action='store', nargs='+', default=[])
+
+    parser.add_argument('--keyword', help='keyword the footprint is tagged with', action='store')
+    parser.add_argument('--pads', help='number of pads', action='store', type=int)
+    parser.add_argument('--max-width', help='maximum courtyard width in mm', action='store', type=float)
+    parser.add_argument('--max-height', help='maximum courtyard height in mm', action='store', type=float)
+    parser.add_argument('--pitch', help='pad pitch in mm', action='store', type=float)
+
+    args = parser.parse_args()
+
+    index = FootprintIndex(args.index)
+
+    if args.scan:
+        start = time.time()
+        parsed = index.update(args.scan)
+        index.save()
+        print('{} footprints parsed, {} indexed in {:.2f} s'.format(parsed, len(index), time.time() - start))
+
+    if any(v is not None for v in (args.keyword, args.pads, args.max_width, args.max_height, args.pitch)):
+        start = time.time()
+        result = index.search(keyword=args.keyword, pad_count=args.pads, max_width=args.max_width,
+                              max_height=args.max_height, pitch=args.pitch)
+        for info in result:
+            print('{}:{}\t{}'.format(info.library, info.name, info.description))
+        print('{} footprints found in {:.1f} ms'.format(len(result), (time.time() - start) * 1000))
@@ -44,10 +44,12 @@ if __name__ == "__main__":
     parser.add_argument('board', help='board file to list elements', action='store')
     parser.add_argument('minimal_drill', help='minimal drill size', type=float, default=0., action='store')
     parser.add_argument('minimal_copper', help='minimal copper size to solder', type=float, default=0., action='store')
+    parser.add_argument('--backend', help='"lazy" to only write the modified modules, without KiCad',
+                        choices=['pcbnew', 'lazy'], default='pcbnew', action='store')
 
     args = parser.parse_args()
 
-    board = Board.from_file(args.board)
+    board = Board.from_file(args.board, backend=args.backend)
 
     resize_pads(board, args.minimal_drill, args.minimal_copper*2)
 
@@ -17,17 +17,24 @@ import sys
 
 try:
     _pcbnew = __import__('pcbnew')  # We need to import the pcbnew module this way
+    _PCBNEW_AVAILABLE = True
 except ImportError as e:
-    if 'sphinx' not in sys.modules:
-        raise e
-    else:
-        class PcbnewDummy(object):
-            PCB_LAYER_ID_COUNT = 0
-            PLOT_FORMAT_HPGL = None
-            PLOT_FORMAT_GERBER = None
-            PLOT_FORMAT_POST = None
-            PLOT_FORMAT_DXF = None
-            PLOT_FORMAT_PDF = None
-            PLOT_FORMAT_SVG = None
+    _PCBNEW_AVAILABLE = False
+    _PCBNEW_IMPORT_ERROR = e
 
-        _pcbnew = PcbnewDummy()
+    class PcbnewDummy(object):
+        PCB_LAYER_ID_COUNT = 0
+        PLOT_FORMAT_HPGL = None
+        PLOT_FORMAT_GERBER = None
+        PLOT_FORMAT_POST = None
+        PLOT_FORMAT_DXF = None
+        PLOT_FORMAT_PDF = None
+        PLOT_FORMAT_SVG = None
+
+        def __getattr__(self, name):
+            # the pure python parts (like the sexpr backend) work without KiCad, everything else fails on first use
+            if 'sphinx' in sys.modules or name.startswith('__'):
+                raise AttributeError(name)  # do not break introspection like hasattr(_pcbnew, '__wrapped__')
+            raise ImportError("pcbnew is required to access '{}' ({})".format(name, _PCBNEW_IMPORT_ERROR))
+
+    _pcbnew = PcbnewDummy()
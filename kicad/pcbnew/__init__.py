@@ -26,8 +26,10 @@ from kicad.pcbnew.drawsegment import Polygon        # noqa: F401
 from kicad.pcbnew.layer import Layer, LayerSet      # noqa: F401
 
 from kicad.pcbnew.module import Module              # noqa: F401
+from kicad.pcbnew.module import FootprintLibrary    # noqa: F401
+from kicad.pcbnew.module import FootprintIndex      # noqa: F401
 
-from kicad.pcbnew.net import Net                    # noqa: F401
+from kicad.pcbnew.net import Net, NetIndex          # noqa: F401
 
 from kicad.pcbnew.pad import Pad                    # noqa: F401
 
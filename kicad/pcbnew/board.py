@@ -13,20 +13,49 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import itertools
+
 from typing import Generator  # noqa: F401
 
-from kicad.pcbnew.boarditem import BoardItem, from_board_item
+from kicad.util.files import numpy, _NUMPY_AVAILABLE  # noqa: F401
+
+from kicad.pcbnew.boarditem import BoardItem, WrapperCache, from_board_item
+from kicad.pcbnew.layer import Layer, LayerSet, _standard_layers, _standard_layer_names
 
 from kicad.pcbnew.module import Module
+from kicad.pcbnew.net import Net, NetIndex
 from kicad.pcbnew.track import Track
 from kicad.pcbnew.via import Via
 from kicad.pcbnew.zone import Zone
 
 from kicad.util.point import Point2D
+from kicad.util.rtree import RTree
 
 from kicad._native import _pcbnew
 
 
+# columns of Board.track_array(), coordinates and sizes are in mm
+TRACK_ARRAY_DTYPE = [('start_x', 'f8'), ('start_y', 'f8'), ('end_x', 'f8'), ('end_y', 'f8'), ('width', 'f8'),
+                     ('net_code', 'i4'), ('layer_id', 'i4')]
+
+# columns of Board.via_array(), coordinates and sizes are in mm
+VIA_ARRAY_DTYPE = [('x', 'f8'), ('y', 'f8'), ('width', 'f8'), ('drill', 'f8'),
+                   ('net_code', 'i4'), ('top_layer_id', 'i4'), ('bottom_layer_id', 'i4')]
+
+
+def _structured_array(rows, dtype, scale=1.):
+    """Create a structured array from a list of tuples and scale all float columns"""
+    if not _NUMPY_AVAILABLE:
+        raise ImportError("numpy is required to create array snapshots")
+
+    array = numpy.array(rows, dtype=dtype)
+    if scale != 1.:
+        for name, type in dtype:
+            if type == 'f8':
+                array[name] *= scale
+    return array
+
+
 class Board(BoardItem):
     """Create a new Board object
 
@@ -44,6 +73,9 @@ class Board(BoardItem):
             board = _pcbnew.BOARD()
         assert isinstance(board, _pcbnew.BOARD)
         super(Board, self).__init__(board)
+        self._track_partition = None  # type: dict
+        self._layer_table = None  # type: tuple
+        self._net_index = None  # type: NetIndex
 
     def get_native(self):
         # type: () -> _pcbnew.BOARD
@@ -68,12 +100,16 @@ class Board(BoardItem):
         return Board(_pcbnew.GetBoard())
 
     @staticmethod
-    def from_file(path):
-        # type: (str) -> Board
+    def from_file(path, backend='pcbnew'):
+        # type: (str, str) -> Board
         """Load a board from a given filepath
 
         :param path: path to the ".kicad_pcb" file
         :type path: ``str``, ``unicode``
+        :param backend: ``'pcbnew'`` to load the board using KiCad, ``'sexpr'`` to parse the file read-only in
+                        pure python (see :class:`kicad.pcbnew.sexprboard.SexprBoard`), or ``'lazy'`` to parse only
+                        the parts of the file which are accessed (see :class:`kicad.pcbnew.sexprboard.LazySexprBoard`)
+        :type backend: ``str``
 
         :return: :class:`kicad.pcbnew.Board`
 
@@ -81,8 +117,18 @@ class Board(BoardItem):
 
         >>> from kicad.pcbnew import Board
         >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+        >>> b = Board.from_file("path/to/board.kicad_pcb", backend='sexpr')# doctest: +SKIP
         """
-        return Board(_pcbnew.LoadBoard(path))
+        if backend == 'pcbnew':
+            return Board(_pcbnew.LoadBoard(path))
+        elif backend == 'sexpr':
+            from kicad.pcbnew.sexprboard import SexprBoard
+            return SexprBoard(path)
+        elif backend == 'lazy':
+            from kicad.pcbnew.sexprboard import LazySexprBoard
+            return LazySexprBoard(path)
+        else:
+            raise ValueError("unknown backend \"{}\"".format(backend))
 
     def to_file(self, path):
         # type: (str) -> None
@@ -93,6 +139,80 @@ class Board(BoardItem):
         """
         _pcbnew.SaveBoard(path, self.get_native())
 
+    def snapshot(self, path):
+        """Write a binary snapshot of the items of the Board, which can be opened again without parsing
+
+        :param path: path of the snapshot file
+        :type path: ``str``, ``unicode``
+
+        :return: :class:`kicad.pcbnew.snapshot.BoardSnapshot`
+
+        :Example:
+
+        >>> from kicad.pcbnew import Board
+        >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+        >>> snapshot = b.snapshot("path/to/board.snap")# doctest: +SKIP
+        """
+        from kicad.pcbnew.snapshot import BoardSnapshot
+        BoardSnapshot.write(self, path)
+        return BoardSnapshot.open(path)
+
+    def _tracks_of_type(self, item_type):
+        """Get all items of the track list with the given concrete type
+
+        The track list contains tracks, vias (and arcs in newer KiCad versions). It is partitioned by type in a single
+        pass on first use, and reused until :func:`invalidate_cache` is called.
+        """
+        if self._track_partition is None:
+            partition = {}
+            for item in self._obj.GetTracks():
+                partition.setdefault(type(item), []).append(item)
+            self._track_partition = partition
+        return self._track_partition.get(item_type, [])
+
+    def invalidate_cache(self):
+        # type: () -> None
+        """Drop all data cached from the native board
+
+        Has to be called after items were added to or removed from the board using the native API, otherwise
+        properties like :attr:`tracks` and :attr:`vias` still return the old items.
+        """
+        self._track_partition = None
+        self._layer_table = None
+        self._net_index = None
+        if self._cache is not None:
+            self._cache.clear()
+
+    @property
+    def wrapper_cache(self):
+        # type: () -> bool
+        """Reuse the wrapper objects of items instead of creating new ones on every access
+
+        When enabled, iterating multiple times over items like :attr:`modules` returns the same Python objects, as
+        long as they are still referenced somewhere. :func:`invalidate_cache` has to be called after items were
+        removed from the board.
+
+        :return: ``bool``
+
+        :Example:
+
+        >>> from kicad.pcbnew import Board
+        >>> b = Board()
+        >>> b.wrapper_cache = True
+        >>> b.wrapper_cache
+        True
+        """
+        return self._cache is not None
+
+    @wrapper_cache.setter
+    def wrapper_cache(self, enabled):
+        # type: (bool) -> None
+        assert type(enabled) is bool
+        if enabled and self._cache is None:
+            self._cache = WrapperCache()
+        elif not enabled:
+            self._cache = None
+
     @property
     def filepath(self):
         # type: () -> str
@@ -165,29 +285,120 @@ class Board(BoardItem):
         :return: Iterator over :class:`kicad.pcbnew.Module`
         """
         for item in self._obj.GetModules():
-            yield Module(item)
+            yield self._wrap(item, Module)
 
     @property
     def tracks(self):
         # type: () -> Generator[Track, None, None]
         """List of Tracks present in the Board
 
+        The track list of the board is only read once and reused afterwards. When tracks or vias are added or removed
+        through the native API, the result is stale until :func:`invalidate_cache` is called.
+
         :return: Iterator over :class:`kicad.pcbnew.Track`
         """
-        for item in self._obj.GetTracks():
-            if type(item) is _pcbnew.TRACK:
-                yield Track(item)
+        for item in self._tracks_of_type(_pcbnew.TRACK):
+            yield self._wrap(item, Track)
 
     @property
     def vias(self):
         # type: () -> Generator[Via, None, None]
         """List of Vias present in the Board
 
+        The track list of the board is only read once and reused afterwards. When tracks or vias are added or removed
+        through the native API, the result is stale until :func:`invalidate_cache` is called.
+
         :return: Iterator over :class:`kicad.pcbnew.Via`
         """
-        for item in self._obj.GetTracks():
-            if type(item) is _pcbnew.VIA:
-                yield Via(item)
+        for item in self._tracks_of_type(_pcbnew.VIA):
+            yield self._wrap(item, Via)
+
+    def track_array(self):
+        """Snapshot of all Tracks present in the Board as structured array
+
+        All columns are filled in a single pass over the tracks, which is much faster than accessing every
+        :class:`kicad.pcbnew.Track` on its own. The columns are defined in ``TRACK_ARRAY_DTYPE``.
+
+        :return: ``numpy.ndarray``
+
+        :Example:
+
+        >>> from kicad.pcbnew import Board
+        >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+        >>> t = b.track_array()# doctest: +SKIP
+        >>> lengths = numpy.hypot(t['end_x'] - t['start_x'], t['end_y'] - t['start_y'])# doctest: +SKIP
+        """
+        rows = []
+        append = rows.append
+        for item in self._tracks_of_type(_pcbnew.TRACK):
+            start = item.GetStart()
+            end = item.GetEnd()
+            append((start.x, start.y, end.x, end.y, item.GetWidth(), item.GetNetCode(), item.GetLayer()))
+        return _structured_array(rows, TRACK_ARRAY_DTYPE, 1. / _pcbnew.IU_PER_MM)
+
+    def via_array(self):
+        """Snapshot of all Vias present in the Board as structured array
+
+        The columns are defined in ``VIA_ARRAY_DTYPE``.
+
+        :return: ``numpy.ndarray``
+        """
+        rows = []
+        append = rows.append
+        for item in self._tracks_of_type(_pcbnew.VIA):
+            pos = item.GetPosition()
+            append((pos.x, pos.y, item.GetWidth(), item.GetDrillValue(), item.GetNetCode(),
+                    item.TopLayer(), item.BottomLayer()))
+        return _structured_array(rows, VIA_ARRAY_DTYPE, 1. / _pcbnew.IU_PER_MM)
+
+    @property
+    def nets(self):
+        # type: () -> Generator[Net, None, None]
+        """List of Nets present in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.Net`
+        """
+        for code in range(self._obj.GetNetCount()):
+            yield Net(self._obj.FindNet(code))
+
+    @property
+    def net_index(self):
+        # type: () -> NetIndex
+        """Index to look up all items of a Net
+
+        The index is built on first access and reused until :func:`invalidate_cache` is called.
+
+        :return: :class:`kicad.pcbnew.NetIndex`
+        """
+        if self._net_index is None:
+            self._net_index = NetIndex(self)
+        return self._net_index
+
+    def spatial_index(self, layer=None):
+        # type: (Layer) -> RTree
+        """Create a spatial index over the bounding boxes of tracks, vias, pads and zones
+
+        The index is a snapshot, items which are moved afterwards have to be updated using
+        :func:`kicad.util.rtree.RTree.update`.
+
+        :param layer: only index items present on this layer
+        :type layer: :class:`kicad.pcbnew.Layer`
+
+        :return: :class:`kicad.util.rtree.RTree`
+
+        :Example:
+
+        >>> from kicad.pcbnew import Board, Layer
+        >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+        >>> index = b.spatial_index(layer=Layer.from_name('F.Cu'))# doctest: +SKIP
+        >>> index.query_point((100, 80))# doctest: +SKIP
+        >>> index.nearest((100, 80), k=3)# doctest: +SKIP
+        """
+        items = itertools.chain(self.tracks, self.vias, (pad for module in self.modules for pad in module.pads),
+                                self.zones)
+        if layer is not None:
+            items = (item for item in items if layer in item.layers)
+        return RTree((item, item.bounding_box) for item in items)
 
     @property
     def zones(self):
@@ -197,7 +408,7 @@ class Board(BoardItem):
         :return: Iterator over :class:`kicad.pcbnew.Zone`
         """
         for idx in range(self._obj.GetAreaCount()):
-            yield Zone(self._obj.GetArea(idx))
+            yield self._wrap(self._obj.GetArea(idx), Zone)
 
     def is_zone_filled(self):
         pass  # TODO: implement
@@ -211,11 +422,77 @@ class Board(BoardItem):
     @property
     def drawings(self):
         for item in self._obj.GetDrawings():
-            yield from_board_item(item)
+            yield self._wrap(item, from_board_item)
+
+    def _supported_drawings(self):
+        """Drawings which are supported by the wrapper classes, and the number of all other drawings (like curves)
+
+        :return: ``(list of drawings, int)``
+        """
+        drawings = []
+        unsupported = 0
+        for item in self._obj.GetDrawings():
+            try:
+                drawings.append(self._wrap(item, from_board_item))
+            except NotImplementedError:
+                unsupported += 1
+        return drawings, unsupported
 
     @property
     def layers_enabled(self):
-        return self._obj.GetEnabledLayers()  # TODO: add wrapper and setter
+        # type: () -> LayerSet
+        """All layers enabled in the Board
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        return LayerSet(self._obj.GetEnabledLayers())
+
+    @layers_enabled.setter
+    def layers_enabled(self, layers):
+        # type: (LayerSet) -> None
+        assert isinstance(layers, LayerSet)
+        self._obj.SetEnabledLayers(layers.get_native())
+        self._layer_table = None
+
+    def _layer_tables(self):
+        # type: () -> tuple
+        """Get the dicts to convert layer names of this board to id and back
+
+        Standard names are always known, the names of enabled layers can be changed by the user.
+        """
+        if self._layer_table is None:
+            by_name = dict(_standard_layers())
+            by_id = dict(_standard_layer_names())
+            for layer in self.layers_enabled:
+                name = self._obj.GetLayerName(layer.id)
+                by_name[name] = layer.id
+                by_id[layer.id] = name
+            self._layer_table = by_name, by_id
+        return self._layer_table
+
+    def layer_from_name(self, name):
+        # type: (str) -> Layer
+        """Get Layer object from a name used in this Board
+
+        In contrast to :func:`kicad.pcbnew.Layer.from_name` this also knows layers renamed by the user.
+
+        :param name: user defined or standard name of the layer
+        :type name: ``str``, ``unicode``
+
+        :return: :class:`kicad.pcbnew.Layer`
+        """
+        return Layer.from_id(self._layer_tables()[0][name])
+
+    def layer_name(self, layer):
+        # type: (Layer) -> str
+        """Get the name of a layer as used in this Board
+
+        :param layer: layer to get the name of
+        :type layer: :class:`kicad.pcbnew.Layer`
+
+        :return: ``unicode``
+        """
+        return self._layer_tables()[1].get(layer.id, "")
 
     def __repr__(self):
         # type: () -> str
@@ -13,65 +13,95 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import weakref
+
 from kicad.pcbnew.layer import Layer, LayerSet
 
+from kicad.util.point import Point2D
+
 from kicad._native import _pcbnew
 
 
-def from_board_item(board_item):
-    # type: (_pcbnew.BOARD_ITEM) -> BoardItem
-    item = board_item.Cast()
-    item_type = type(item)
+# native type -> function creating the wrapper, built on first use to avoid circular imports
+_ITEM_FACTORIES = None  # type: dict
 
-    if item_type is _pcbnew.TEXTE_PCB:
-        from kicad.pcbnew.text import Text
-        return Text(item)
 
-    elif item_type is _pcbnew.BOARD:
+def _item_factories():
+    # type: () -> dict
+    global _ITEM_FACTORIES
+    if _ITEM_FACTORIES is None:
         from kicad.pcbnew.board import Board
-        return Board(item)
-
-    elif item_type is _pcbnew.DIMENSION:
         from kicad.pcbnew.dimension import Dimension
-        return Dimension(item)
-
-    elif item_type is _pcbnew.DRAWSEGMENT:
         from kicad.pcbnew.drawsegment import Drawsegment
-        return Drawsegment.from_drawsegment(item)
+        from kicad.pcbnew.module import Module
+        from kicad.pcbnew.pad import Pad
+        from kicad.pcbnew.pcbtarget import PcbTarget
+        from kicad.pcbnew.text import Text
+        from kicad.pcbnew.track import Track
+        from kicad.pcbnew.via import Via
+        from kicad.pcbnew.zone import Zone
+
+        _ITEM_FACTORIES = {
+            _pcbnew.TEXTE_PCB: Text,
+            _pcbnew.BOARD: Board,
+            _pcbnew.DIMENSION: Dimension,
+            _pcbnew.DRAWSEGMENT: Drawsegment.from_drawsegment,
+            _pcbnew.MODULE: Module,
+            _pcbnew.D_PAD: Pad,
+            _pcbnew.TEXTE_MODULE: Text,
+            _pcbnew.VIA: Via,
+            _pcbnew.TRACK: Track,
+            _pcbnew.PCB_TARGET: PcbTarget,
+            _pcbnew.ZONE_CONTAINER: Zone,
+        }
+    return _ITEM_FACTORIES
+
+
+def from_board_item(board_item):
+    # type: (_pcbnew.BOARD_ITEM) -> BoardItem
+    item = board_item.Cast()
+    item_type = type(item)
 
-    elif item_type is _pcbnew.EDGE_MODULE:
+    factory = _item_factories().get(item_type)
+    if factory is None:
         raise NotImplementedError(item_type)
+    return factory(item)
 
-    elif item_type is _pcbnew.MODULE:
-        from kicad.pcbnew.module import Module
-        return Module(item)
 
-    elif item_type is _pcbnew.D_PAD:
-        from kicad.pcbnew.pad import Pad
-        return Pad(item)
+class WrapperCache(object):
+    """Map native objects to the wrapper objects created for them
 
-    elif item_type is _pcbnew.TEXTE_MODULE:
-        from kicad.pcbnew.text import Text  # type: ignore
-        return Text(item)
+    The wrappers are only referenced weakly, so they are dropped as soon as nobody uses them anymore. Every wrapper
+    created by the cache shares it, which means items returned by this wrapper (like :attr:`kicad.pcbnew.Module.pads`)
+    are cached as well.
+    """
 
-    elif item_type is _pcbnew.VIA:
-        from kicad.pcbnew.via import Via
-        return Via(item)
+    def __init__(self):
+        self._wrappers = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary
 
-    elif item_type is _pcbnew.TRACK:
-        from kicad.pcbnew.track import Track
-        return Track(item)
+    def get(self, native, factory):
+        """Get the wrapper of a native object, or create it using factory
 
-    elif item_type is _pcbnew.PCB_TARGET:
-        from kicad.pcbnew.pcbtarget import PcbTarget
-        return PcbTarget(item)
+        :param native: native object to wrap
+        :param factory: function creating the wrapper out of the native object
 
-    elif item_type is _pcbnew.ZONE_CONTAINER:
-        from kicad.pcbnew.zone import Zone
-        return Zone(item)
+        :return: :class:`kicad.pcbnew.boarditem.BoardItem`
+        """
+        key = int(native.this)
+        wrapper = self._wrappers.get(key)
+        if wrapper is None:
+            wrapper = factory(native)
+            wrapper._cache = self
+            self._wrappers[key] = wrapper
+        return wrapper
 
-    else:
-        raise NotImplementedError(item_type)
+    def clear(self):
+        # type: () -> None
+        """Forget all wrappers, which is required when the native objects were changed or deleted"""
+        self._wrappers.clear()
+
+    def __len__(self):
+        return len(self._wrappers)
 
 
 class BoardItem(object):
@@ -81,6 +111,8 @@ class BoardItem(object):
     :type board_item: :class:`pcbnew.BOARD_ITEM`
     """
 
+    _cache = None  # type: WrapperCache
+
     def __init__(self, board_item):
         # type: (_pcbnew.BOARD_ITEM) -> None
         assert isinstance(board_item, _pcbnew.BOARD_ITEM)
@@ -94,6 +126,12 @@ class BoardItem(object):
         """
         return self._obj
 
+    def _wrap(self, native, factory):
+        """Create the wrapper of a child item, or reuse it when a :class:`WrapperCache` is used"""
+        if self._cache is None:
+            return factory(native)
+        return self._cache.get(native, factory)
+
     @property
     def is_highlighted(self):
         # type: () -> bool
@@ -163,32 +201,36 @@ class BoardItem(object):
         """
         return LayerSet(self._obj.GetLayerSet())
 
-    def __eq__(self, other):
-        if not isinstance(self, other.__class__):
-            return False
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the item
 
-        if not isinstance(self._obj, other._obj.__class__):
-            return False
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        box = self._obj.GetBoundingBox()
+        box.Normalize()
+        return Point2D.from_wxPoint(box.GetOrigin()), Point2D.from_wxPoint(box.GetEnd())
 
-        if self._obj == other._obj:
-            return True
+    def _identity(self):
+        # type: () -> int
+        """Address of the native object, which is the same for all wrappers of it
 
-        if self.is_highlighted != other.is_highlighted:
+        :return: ``int``
+        """
+        return int(self._obj.this)
+
+    def __eq__(self, other):
+        if not isinstance(other, BoardItem):
             return False
 
-        # now we will do some hack to check if the other object is actually the same. We know is_highlighted is the same
-        old_value = self.is_highlighted
-        self.is_highlighted = not self.is_highlighted
-        is_still_same = self.is_highlighted == other.is_highlighted  # TODO: replace with something better
-        self.is_highlighted = old_value
-        return is_still_same
+        return self._identity() == other._identity()
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
         # type: () -> int
-        return hash(self.layers)
+        return hash(self._identity())
 
     def __repr__(self):
         # type: () -> str
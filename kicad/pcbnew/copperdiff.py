@@ -0,0 +1,313 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import hashlib
+import io
+import math
+import multiprocessing
+import os
+
+from typing import Dict, List, Tuple  # noqa: F401
+
+from kicad.pcbnew.board import Board
+from kicad.pcbnew.layer import Layer
+
+from kicad.primitives import PolygonSet
+from kicad.util.files import atomic_write, makedirs
+
+from kicad._native import _pcbnew
+
+
+# @see: https://github.com/twlostow/kicad-dev/blob/tom-polygon-gen/qa/polygon_generator/test_polygon_generator.cpp
+_SEGMENTS_PER_CIRCLE = 64
+_CORRECTION_FACTOR = 1.0 / math.cos(math.pi / _SEGMENTS_PER_CIRCLE)
+
+# increase when the polygon generation changes, to invalidate all cached polygons
+_CACHE_VERSION = 1
+
+# boards loaded once by every worker process, see _init_worker()
+_worker_state = None  # type: tuple
+
+
+def create_polyset_from_item(board_item):
+    """Create PolygonSet from a BoardItem
+
+    :param board_item: item to convert
+    :type board_item: :class:`kicad.pcbnew.boarditem.BoardItem`
+
+    :return: :class:`kicad.primitives.PolygonSet`
+    """
+    p = PolygonSet()
+    # TODO: method not exported in kicad-python by now, which means we need to access it native
+    board_item.get_native().TransformShapeWithClearanceToPolygon(p.get_native(), 1, _SEGMENTS_PER_CIRCLE,
+                                                                 _CORRECTION_FACTOR)
+    return p
+
+
+def _item_fingerprint(item):
+    # type: (object) -> bytes
+    """Describe everything of an item which has an influence on its copper"""
+    native = item.get_native()
+    item_type = type(native)
+    if item_type is _pcbnew.TRACK:
+        start = native.GetStart()
+        end = native.GetEnd()
+        values = ('track', start.x, start.y, end.x, end.y, native.GetWidth())
+    elif item_type is _pcbnew.VIA:
+        pos = native.GetPosition()
+        values = ('via', pos.x, pos.y, native.GetWidth(), native.TopLayer(), native.BottomLayer())
+    elif item_type is _pcbnew.D_PAD:
+        pos = native.GetPosition()
+        size = native.GetSize()
+        offset = native.GetOffset()
+        delta = native.GetDelta()
+        box = native.GetBoundingBox()  # covers custom shapes
+        values = ('pad', pos.x, pos.y, size.x, size.y, offset.x, offset.y, delta.x, delta.y, native.GetShape(),
+                  native.GetOrientation(), native.GetRoundRectRadiusRatio(), native.GetLayerSet().FmtHex(),
+                  box.GetX(), box.GetY(), box.GetWidth(), box.GetHeight())
+    elif item_type is _pcbnew.ZONE_CONTAINER:
+        values = ('zone', native.GetLayerSet().FmtHex())
+        return repr(values).encode('utf-8') + PolygonSet(native.GetFilledPolysList()).to_bytes()
+    else:
+        raise NotImplementedError(item_type)
+    return repr(values).encode('utf-8')
+
+
+def net_key(board, layer, net):
+    """Content hash of all items of a net which have copper on a layer
+
+    The key only depends on the geometry of the items, it does not change when unrelated parts of the board change,
+    or when the net is renamed.
+
+    :param board: board containing the net
+    :type board: :class:`kicad.pcbnew.Board`
+    :param layer: layer to look at
+    :type layer: :class:`kicad.pcbnew.Layer`
+    :param net: net as object or net code
+    :type net: :class:`kicad.pcbnew.Net`, ``int``
+
+    :return: ``str``
+    """
+    fingerprints = sorted(_item_fingerprint(item) for item in board.net_index.items(net) if layer in item.layers)
+
+    digest = hashlib.sha1()
+    digest.update(repr((_CACHE_VERSION, _SEGMENTS_PER_CIRCLE, layer.id, len(fingerprints))).encode('utf-8'))
+    for fingerprint in fingerprints:
+        digest.update(hashlib.sha1(fingerprint).digest())
+    return digest.hexdigest()
+
+
+class PolygonCache(object):
+    """Directory storing merged polygons of nets, addressed by :func:`net_key`
+
+    Every entry is a single file written atomically, which allows multiple processes to share the same directory.
+
+    :param path: directory of the cache, created when it does not exist
+    :type path: ``str``, ``unicode``
+
+    :Example:
+
+    >>> from kicad.pcbnew.copperdiff import PolygonCache, diff_boards
+    >>> cache = PolygonCache("path/to/cache")# doctest: +SKIP
+    >>> unchanged, added, removed = diff_boards(old, new, layer, cache=cache)# doctest: +SKIP
+    """
+
+    def __init__(self, path):
+        self._path = path
+        makedirs(path)
+
+    @property
+    def path(self):
+        """Directory of the cache
+
+        :return: ``str``
+        """
+        return self._path
+
+    def _file(self, key):
+        # type: (str) -> str
+        return os.path.join(self._path, key + '.poly')
+
+    def get(self, key):
+        """Load the polygons stored for a key
+
+        :param key: key created by :func:`net_key`
+        :type key: ``str``
+
+        :return: :class:`kicad.primitives.PolygonSet`, or ``None`` if nothing is stored for the key
+        """
+        try:
+            with io.open(self._file(key), 'rb') as f:
+                return PolygonSet.from_bytes(f.read())
+        except (IOError, OSError, ValueError):
+            return None  # missing or broken entries are simply recalculated
+
+    def put(self, key, polyset):
+        """Store the polygons of a key
+
+        :param key: key created by :func:`net_key`
+        :type key: ``str``
+        :param polyset: polygons to store
+        :type polyset: :class:`kicad.primitives.PolygonSet`
+        """
+        with atomic_write(self._file(key)) as f:
+            f.write(polyset.to_bytes())
+
+
+def _merge_cached(board, layer, net, key, cache):
+    # type: (Board, Layer, int, str, PolygonCache) -> PolygonSet
+    """Get the merged polygons of a net from the cache, or create and store them"""
+    poly = cache.get(key)
+    if poly is None:
+        poly = merge_net(board, layer, net)
+        cache.put(key, poly)
+    return poly
+
+
+def _net_codes(board):
+    # type: (Board) -> Dict[str, int]
+    """Map the name of every net with items to its code, codes are not comparable between boards"""
+    return {net.name: net.code for net in board.net_index}
+
+
+def merge_net(board, layer, net):
+    """Create the merged and fractured PolygonSet of all items of a net on a layer
+
+    :param board: board containing the net
+    :type board: :class:`kicad.pcbnew.Board`
+    :param layer: layer to convert
+    :type layer: :class:`kicad.pcbnew.Layer`
+    :param net: net as object or net code
+    :type net: :class:`kicad.pcbnew.Net`, ``int``
+
+    :return: :class:`kicad.primitives.PolygonSet`
+    """
+    polysets = [create_polyset_from_item(item) for item in board.net_index.items(net) if layer in item.layers]
+    merged = PolygonSet.union_all(polysets)
+    merged.fracture()
+    return merged
+
+
+def diff_net(old_poly, new_poly):
+    """Calculate the difference of the copper of a single net
+
+    :param old_poly: copper of the net in the old board, ``None`` if the net does not exist
+    :type old_poly: :class:`kicad.primitives.PolygonSet`
+    :param new_poly: copper of the net in the new board, ``None`` if the net does not exist
+    :type new_poly: :class:`kicad.primitives.PolygonSet`
+
+    :return: ``tuple`` of :class:`kicad.primitives.PolygonSet` (unchanged, added, removed)
+    """
+    if old_poly is None:
+        return new_poly.copy(), new_poly.copy(), PolygonSet()
+    if new_poly is None:
+        return old_poly.copy(), PolygonSet(), old_poly.copy()
+
+    nodiff_poly = PolygonSet.union_all([old_poly, new_poly])
+
+    add_poly = new_poly.copy()
+    add_poly.difference(old_poly)
+
+    sub_poly = old_poly.copy()
+    sub_poly.difference(new_poly)
+
+    return nodiff_poly, add_poly, sub_poly
+
+
+def _diff_net_names(old_board, new_board, layer, names, cache=None):
+    # type: (Board, Board, Layer, List[str], PolygonCache) -> List[Tuple[PolygonSet, PolygonSet, PolygonSet]]
+    old_codes = _net_codes(old_board)
+    new_codes = _net_codes(new_board)
+
+    result = []
+    for name in names:
+        if cache is None:
+            old_poly = merge_net(old_board, layer, old_codes[name]) if name in old_codes else None
+            new_poly = merge_net(new_board, layer, new_codes[name]) if name in new_codes else None
+            result.append(diff_net(old_poly, new_poly))
+            continue
+
+        old_key = net_key(old_board, layer, old_codes[name]) if name in old_codes else None
+        new_key = net_key(new_board, layer, new_codes[name]) if name in new_codes else None
+        old_poly = _merge_cached(old_board, layer, old_codes[name], old_key, cache) if old_key else None
+        if old_key == new_key:
+            result.append((old_poly, PolygonSet(), PolygonSet()))  # nothing changed, no need to diff the net
+            continue
+        new_poly = _merge_cached(new_board, layer, new_codes[name], new_key, cache) if new_key else None
+        result.append(diff_net(old_poly, new_poly))
+    return result
+
+
+def _init_worker(old_path, new_path, layer, cache):
+    # type: (str, str, Layer, PolygonCache) -> None
+    global _worker_state
+    _worker_state = Board.from_file(old_path), Board.from_file(new_path), layer, cache
+
+
+def _diff_worker(names):
+    # type: (List[str]) -> List[Tuple[PolygonSet, PolygonSet, PolygonSet]]
+    old_board, new_board, layer, cache = _worker_state
+    return _diff_net_names(old_board, new_board, layer, names, cache)
+
+
+def diff_boards(old_board, new_board, layer, processes=None, cache=None):
+    """Compare the copper of two boards on a layer
+
+    With multiple processes, the nets are split into shards which are processed by workers. Every worker loads both
+    boards from their files, builds and diffs the polygons of its nets, and sends the results back as compact
+    coordinate buffers. Changes of the boards which were not saved are not seen by the workers.
+
+    :param old_board: original board
+    :type old_board: :class:`kicad.pcbnew.Board`
+    :param new_board: board to compare to
+    :type new_board: :class:`kicad.pcbnew.Board`
+    :param layer: layer to compare
+    :type layer: :class:`kicad.pcbnew.Layer`
+    :param processes: number of worker processes, ``None`` to run in this process only
+    :type processes: ``int``
+    :param cache: cache of merged net polygons, nets which are the same in both boards are not diffed at all
+    :type cache: :class:`kicad.pcbnew.copperdiff.PolygonCache`
+
+    :return: ``tuple`` of fractured :class:`kicad.primitives.PolygonSet` (unchanged, added, removed)
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board, Layer
+    >>> from kicad.pcbnew.copperdiff import diff_boards
+    >>> old = Board.from_file("path/to/old.kicad_pcb")# doctest: +SKIP
+    >>> new = Board.from_file("path/to/new.kicad_pcb")# doctest: +SKIP
+    >>> unchanged, added, removed = diff_boards(old, new, Layer.from_name('F.Cu'), processes=4)# doctest: +SKIP
+    """
+    assert isinstance(layer, Layer)
+    names = sorted(set(_net_codes(old_board)) | set(_net_codes(new_board)))
+
+    if not processes or processes <= 1:
+        net_diffs = _diff_net_names(old_board, new_board, layer, names, cache)
+    else:
+        # interleaved shards, because the nets sorted by name tend to have similar sizes next to each other
+        shards = [names[i::processes * 4] for i in range(min(len(names), processes * 4))]
+        pool = multiprocessing.Pool(processes, _init_worker, (old_board.filepath, new_board.filepath, layer, cache))
+        try:
+            net_diffs = [net_diff for shard in pool.map(_diff_worker, shards) for net_diff in shard]
+        finally:
+            pool.close()
+            pool.join()
+
+    result = []
+    for polysets in zip(*net_diffs) if net_diffs else ([], [], []):
+        merged = PolygonSet.union_all(polysets)
+        merged.fracture()
+        result.append(merged)
+    return tuple(result)
@@ -0,0 +1,428 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import hashlib
+import math
+
+from typing import Dict, List, Tuple  # noqa: F401
+
+from kicad.pcbnew.drawsegment import Arc, Circle, Line, Polygon
+from kicad.pcbnew.text import Text
+
+from kicad.util.point import IU_PER_MM, Point2D
+
+
+def _nm(value):
+    # type: (float) -> int
+    return int(round(value * IU_PER_MM))
+
+
+def _digest(values):
+    # type: (tuple) -> str
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
+def _rollup(hashes):
+    # type: (List[str]) -> str
+    """Combine hashes independent of their order"""
+    digest = hashlib.sha1()
+    for h in sorted(hashes):
+        digest.update(h.encode('ascii'))
+    return digest.hexdigest()
+
+
+def _decidegree(angle):
+    # type: (float) -> int
+    return int(round(angle * 10))  # KiCad stores angles in 0.1 degree
+
+
+def _module_content(module):
+    return ('module', module.reference, module.value, module.fpid, module.position.to_nm(),
+            _decidegree(module.orientation), module.is_flipped)
+
+
+def _relative_position(point, module):
+    # type: (Point2D, Module) -> Point2D
+    """Position relative to the module, which does not change when the module is moved or rotated"""
+    angle = math.radians(module.orientation)
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    offset = point - module.position
+    return Point2D(offset.x * cos - offset.y * sin, offset.x * sin + offset.y * cos)
+
+
+def _pad_content(pad, module):
+    return ('pad', pad.name, _relative_position(pad.position, module).to_nm(), pad.size.to_nm(),
+            pad.drill_size.to_nm(), pad.layers.mask, pad.net.name)
+
+
+def _track_content(track):
+    return 'track', track.start.to_nm(), track.end.to_nm(), _nm(track.width), track.layer.id, track.net.name
+
+
+def _via_content(via):
+    return 'via', via.position.to_nm(), _nm(via.width), _nm(via.drill), via.layers.mask, via.net.name
+
+
+def _zone_content(zone):
+    return 'zone', zone.layers.mask, zone.net.name, zone.priority, tuple(p.to_nm() for p in zone.outline)
+
+
+def _drawing_content(drawing):
+    if isinstance(drawing, Text):
+        return ('text', drawing.layer.id, drawing.text, drawing.position.to_nm(), drawing.text_size.to_nm(),
+                _nm(drawing.thickness))
+
+    if isinstance(drawing, Arc):
+        geometry = drawing.center.to_nm(), drawing.start.to_nm(), _decidegree(drawing.angle)
+    elif isinstance(drawing, Circle):
+        geometry = drawing.center.to_nm(), _nm(drawing.radius)
+    elif isinstance(drawing, Line):
+        geometry = drawing.start.to_nm(), drawing.end.to_nm()
+    elif isinstance(drawing, Polygon):
+        geometry = tuple(p.to_nm() for p in drawing.points)
+    else:
+        geometry = ()  # dimensions and targets are only compared by their type and layer
+    return 'drawing', type(drawing).__name__, drawing.layer.id, _nm(getattr(drawing, 'width', 0.)), geometry
+
+
+def _unique_keys(names):
+    """Make keys unique by adding the number of the occurrence, like for multiple modules named "REF**"."""
+    seen = {}
+    for name in names:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        yield name, count
+
+
+class BoardHashes(object):
+    """Content hashes of all items of a board
+
+    Every item gets a canonical hash of the properties which describe it. Pads are rolled up into the hash of their
+    module, while tracks, vias, zones and drawings are rolled up per kind and layer. The root hash covers the whole
+    board, which allows to detect identical boards without comparing any item.
+
+    Pads are hashed by their position relative to the module, which means moving or rotating a module only changes
+    the hash of the module itself. Drawings with a shape which is not supported by the wrapper classes, like curves
+    of the pcbnew backend, are skipped and only counted (see :attr:`unsupported_drawings`).
+
+    :param board: board to hash
+    :type board: :class:`kicad.pcbnew.Board`
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board
+    >>> from kicad.pcbnew.diff import BoardHashes
+    >>> old = BoardHashes(Board.from_file("path/to/old.kicad_pcb"))# doctest: +SKIP
+    >>> new = BoardHashes(Board.from_file("path/to/new.kicad_pcb"))# doctest: +SKIP
+    >>> old.root == new.root# doctest: +SKIP
+    True
+    """
+
+    def __init__(self, board):
+        # module key -> (rolled up hash, hash of the module itself, module, {pad key: (hash, pad)})
+        self._modules = {}  # type: Dict[tuple, tuple]
+        modules = list(board.modules)
+        for key, module in zip(_unique_keys(m.reference for m in modules), modules):
+            pads = list(module.pads)
+            pad_hashes = {pad_key: (_digest(_pad_content(pad, module)), pad)
+                          for pad_key, pad in zip(_unique_keys(p.name for p in pads), pads)}
+            own_hash = _digest(_module_content(module))
+            module_hash = _rollup([own_hash] + [h for h, _ in pad_hashes.values()])
+            self._modules[key] = (module_hash, own_hash, module, pad_hashes)
+
+        # (kind, layer id) -> (rolled up hash, {item hash: [items]})
+        self._layers = {}  # type: Dict[tuple, tuple]
+        groups = {}  # type: Dict[tuple, Dict[str, list]]
+        drawings, self._unsupported_drawings = board._supported_drawings()
+        for kind, items, content in (('track', board.tracks, _track_content), ('via', board.vias, _via_content),
+                                     ('zone', board.zones, _zone_content),
+                                     ('drawing', drawings, _drawing_content)):
+            for item in items:
+                group = groups.setdefault((kind, item.layer.id), {})
+                group.setdefault(_digest(content(item)), []).append(item)
+        for key, group in groups.items():
+            self._layers[key] = (_rollup([h for h, items in group.items() for _ in items]), group)
+
+        self._root = _rollup([h for h, _, _, _ in self._modules.values()] +
+                             [_digest((key, h)) for key, (h, _) in self._layers.items()])
+
+    @property
+    def root(self):
+        """Hash of the whole board
+
+        :return: ``str``
+        """
+        return self._root
+
+    @property
+    def module_hashes(self):
+        """Rolled up hash of every module (including its pads), keyed by ``(reference, occurrence)``
+
+        :return: ``dict``
+        """
+        return {key: entry[0] for key, entry in self._modules.items()}
+
+    @property
+    def layer_hashes(self):
+        """Rolled up hash of all tracks, vias, zones and drawings, keyed by ``(kind, layer id)``
+
+        :return: ``dict``
+        """
+        return {key: entry[0] for key, entry in self._layers.items()}
+
+    @property
+    def unsupported_drawings(self):
+        """Number of drawings which are not hashed, because their shape is not supported by the wrapper classes
+
+        Changes of those drawings are not detected.
+
+        :return: ``int``
+        """
+        return self._unsupported_drawings
+
+    def module_entry(self, key):
+        # type: (tuple) -> tuple
+        """Hashes of a single module
+
+        :param key: ``(reference, occurrence)`` of the module
+        :type key: ``tuple``
+
+        :return: ``(rolled up hash, hash of the module itself, module, {pad key: (hash, pad)})``, or ``None`` if there
+                 is no such module
+        """
+        return self._modules.get(key)
+
+    def layer_entry(self, key):
+        # type: (tuple) -> tuple
+        """Hashes of all items of one kind on a layer
+
+        :param key: ``(kind, layer id)``
+        :type key: ``tuple``
+
+        :return: ``(rolled up hash, {item hash: [items]})``, or ``(None, {})`` if there are no such items
+        """
+        return self._layers.get(key, (None, {}))
+
+
+class ItemChange(object):
+    """Single difference between two boards
+
+    :param kind: ``'module'``, ``'pad'``, ``'track'``, ``'via'``, ``'zone'`` or ``'drawing'``
+    :type kind: ``str``
+    :param key: identification of the item, like the reference of a module
+    :param old: item in the old board, ``None`` if it was added
+    :param new: item in the new board, ``None`` if it was removed
+    """
+
+    def __init__(self, kind, key, old, new):
+        self._kind = kind
+        self._key = key
+        self._old = old
+        self._new = new
+
+    @property
+    def kind(self):
+        """Kind of the changed item
+
+        :return: ``str``
+        """
+        return self._kind
+
+    @property
+    def key(self):
+        """Identification of the item
+
+        Modules are identified by ``(reference, occurrence)``, pads by ``((reference, occurrence), (name,
+        occurrence))``. All other items have no identity in KiCad, they are identified by their content hash, which
+        is why they are only reported as added or removed.
+        """
+        return self._key
+
+    @property
+    def old(self):
+        """Item in the old board
+
+        :return: :class:`kicad.pcbnew.boarditem.BoardItem` or ``None``
+        """
+        return self._old
+
+    @property
+    def new(self):
+        """Item in the new board
+
+        :return: :class:`kicad.pcbnew.boarditem.BoardItem` or ``None``
+        """
+        return self._new
+
+    @property
+    def change(self):
+        """Type of the change
+
+        :return: ``'added'``, ``'removed'`` or ``'modified'``
+        """
+        if self._old is None:
+            return 'added'
+        elif self._new is None:
+            return 'removed'
+        return 'modified'
+
+    def __repr__(self):
+        return "kicad.pcbnew.diff.ItemChange({!r}, {!r}, {})".format(self._kind, self._key, self.change)
+
+
+class BoardDiff(object):
+    """Structural difference between two boards
+
+    :param changes: all changes
+    :type changes: ``list`` of :class:`kicad.pcbnew.diff.ItemChange`
+    :param unsupported_drawings: number of drawings of both boards which could not be compared
+    :type unsupported_drawings: ``int``
+    """
+
+    def __init__(self, changes, unsupported_drawings=0):
+        self._changes = changes
+        self._unsupported_drawings = unsupported_drawings
+
+    @property
+    def added(self):
+        """All items which only exist in the new board
+
+        :return: ``list`` of :class:`kicad.pcbnew.diff.ItemChange`
+        """
+        return [c for c in self._changes if c.change == 'added']
+
+    @property
+    def removed(self):
+        """All items which only exist in the old board
+
+        :return: ``list`` of :class:`kicad.pcbnew.diff.ItemChange`
+        """
+        return [c for c in self._changes if c.change == 'removed']
+
+    @property
+    def modified(self):
+        """All items which exist in both boards, but differ
+
+        :return: ``list`` of :class:`kicad.pcbnew.diff.ItemChange`
+        """
+        return [c for c in self._changes if c.change == 'modified']
+
+    @property
+    def unsupported_drawings(self):
+        """Number of drawings of both boards which could not be compared, changes of them are not reported
+
+        :return: ``int``
+        """
+        return self._unsupported_drawings
+
+    def __iter__(self):
+        return iter(self._changes)
+
+    def __len__(self):
+        return len(self._changes)
+
+    def __bool__(self):
+        return bool(self._changes)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return "kicad.pcbnew.diff.BoardDiff(<{} added, {} removed, {} modified>)".format(
+            len(self.added), len(self.removed), len(self.modified))
+
+
+def _diff_pads(module_key, old_pads, new_pads):
+    # type: (tuple, dict, dict) -> List[ItemChange]
+    changes = []
+    for key in sorted(set(old_pads) | set(new_pads)):
+        old_hash, old_pad = old_pads.get(key, (None, None))
+        new_hash, new_pad = new_pads.get(key, (None, None))
+        if old_hash != new_hash:
+            changes.append(ItemChange('pad', (module_key, key), old_pad, new_pad))
+    return changes
+
+
+def diff_hashes(old, new):
+    """Compare the hashes of two boards
+
+    Only modules and layers whose rolled up hash differs are looked at in detail.
+
+    :param old: hashes of the original board
+    :type old: :class:`kicad.pcbnew.diff.BoardHashes`
+    :param new: hashes of the board to compare to
+    :type new: :class:`kicad.pcbnew.diff.BoardHashes`
+
+    :return: :class:`kicad.pcbnew.diff.BoardDiff`
+    """
+    changes = []
+    unsupported_drawings = old.unsupported_drawings + new.unsupported_drawings
+    if old.root == new.root:
+        return BoardDiff(changes, unsupported_drawings)
+
+    for key in sorted(set(old.module_hashes) | set(new.module_hashes)):
+        old_entry = old.module_entry(key)
+        new_entry = new.module_entry(key)
+        if old_entry is None:
+            changes.append(ItemChange('module', key, None, new_entry[2]))
+            changes.extend(_diff_pads(key, {}, new_entry[3]))
+        elif new_entry is None:
+            changes.append(ItemChange('module', key, old_entry[2], None))
+            changes.extend(_diff_pads(key, old_entry[3], {}))
+        elif old_entry[0] != new_entry[0]:
+            if old_entry[1] != new_entry[1]:
+                changes.append(ItemChange('module', key, old_entry[2], new_entry[2]))
+            changes.extend(_diff_pads(key, old_entry[3], new_entry[3]))
+
+    for key in sorted(set(old.layer_hashes) | set(new.layer_hashes)):
+        old_hash, old_group = old.layer_entry(key)
+        new_hash, new_group = new.layer_entry(key)
+        if old_hash == new_hash:
+            continue
+        kind = key[0]
+        for item_hash in sorted(set(old_group) | set(new_group)):
+            old_items = old_group.get(item_hash, [])
+            new_items = new_group.get(item_hash, [])
+            for item in old_items[len(new_items):]:
+                changes.append(ItemChange(kind, item_hash, item, None))
+            for item in new_items[len(old_items):]:
+                changes.append(ItemChange(kind, item_hash, None, item))
+
+    return BoardDiff(changes, unsupported_drawings)
+
+
+def diff(old_board, new_board):
+    """Structural difference between two boards
+
+    Modules are matched by their reference and pads by their name inside of the module. All other items are matched
+    by their content, which means a moved track is reported as removed and added.
+
+    :param old_board: original board
+    :type old_board: :class:`kicad.pcbnew.Board`
+    :param new_board: board to compare to
+    :type new_board: :class:`kicad.pcbnew.Board`
+
+    :return: :class:`kicad.pcbnew.diff.BoardDiff`
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board
+    >>> from kicad.pcbnew.diff import diff
+    >>> old = Board.from_file("path/to/old.kicad_pcb", backend='sexpr')# doctest: +SKIP
+    >>> new = Board.from_file("path/to/new.kicad_pcb", backend='sexpr')# doctest: +SKIP
+    >>> for change in diff(old, new):# doctest: +SKIP
+    ...     print(change.change, change.kind, change.key)
+    """
+    return diff_hashes(BoardHashes(old_board), BoardHashes(new_board))
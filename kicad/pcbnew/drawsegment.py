@@ -234,6 +234,14 @@ class Polygon(Drawsegment):
         assert polygon.GetShape() is _pcbnew.S_POLYGON
         super(Polygon, self).__init__(polygon)
 
+    @property
+    def points(self):
+        """Corners of the polygon
+
+        :return: ``list`` of :class:`kicad.util.Point2D`
+        """
+        return [Point2D.from_wxPoint(point) for point in self._obj.GetPolyPoints()]
+
     def __repr__(self):
         return "kicad.pcbnew.Polygon({})".format(self._obj)
 
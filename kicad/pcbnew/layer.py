@@ -15,22 +15,73 @@
 
 import sys
 
-from kicad._native import _pcbnew
+from kicad._native import _pcbnew, _PCBNEW_AVAILABLE
 
 
-# dict for default layers to convert layer names to id and back
-_LAYERS = {_pcbnew.BOARD_GetStandardLayerName(n): n for n in range(_pcbnew.PCB_LAYER_ID_COUNT)}
-if sys.version_info >= (3,):
-    _LAYERS_NAME_LOOKUP = {s: n for n, s in _LAYERS.items()}
-else:
-    _LAYERS_NAME_LOOKUP = {s: n for n, s in _LAYERS.iteritems()}
+# standard layer names in the order of their id, used when pcbnew is not available
+_STANDARD_LAYER_NAMES = ['F.Cu'] + ['In{}.Cu'.format(n) for n in range(1, 31)] + \
+    ['B.Cu', 'B.Adhes', 'F.Adhes', 'B.Paste', 'F.Paste', 'B.SilkS', 'F.SilkS', 'B.Mask', 'F.Mask',
+     'Dwgs.User', 'Cmts.User', 'Eco1.User', 'Eco2.User', 'Edge.Cuts', 'Margin', 'B.CrtYd', 'F.CrtYd', 'B.Fab', 'F.Fab']
+
+# dicts for default layers to convert layer names to id and back, built on first use
+_LAYERS = None
+_LAYERS_NAME_LOOKUP = None
+
+
+def _standard_layers():
+    # type: () -> dict
+    """Get the dict to convert standard layer names to id"""
+    global _LAYERS, _LAYERS_NAME_LOOKUP
+    if _LAYERS is None:
+        if _PCBNEW_AVAILABLE:
+            names = [_pcbnew.BOARD_GetStandardLayerName(n) for n in range(_pcbnew.PCB_LAYER_ID_COUNT)]
+        else:
+            names = _STANDARD_LAYER_NAMES
+        _LAYERS_NAME_LOOKUP = {n: name for n, name in enumerate(names)}
+        _LAYERS = {name: n for n, name in enumerate(names)}
+    return _LAYERS
+
+
+def _standard_layer_names():
+    # type: () -> dict
+    """Get the dict to convert layer ids to standard layer names"""
+    _standard_layers()
+    return _LAYERS_NAME_LOOKUP
 
 
 class Layer(object):
+    """Layer of a board
+
+    Layers are immutable, and there only exists one Layer object per id which is shared by everyone.
+
+    :param id: internal ID of the layer
+    :type id: ``int``
+
+    :Example:
+
+    >>> from kicad.pcbnew import Layer
+    >>> Layer.from_id(0) is Layer.from_name('F.Cu')
+    True
+    """
+    __slots__ = ('_id',)
+
+    _interned = {}  # type: dict
+
+    def __new__(cls, id=None):
+        if cls is not Layer:
+            return super(Layer, cls).__new__(cls)  # subclasses are views on other objects
+
+        layer = Layer._interned.get(id)
+        if layer is None:
+            assert type(id) is int
+            layer = super(Layer, cls).__new__(cls)
+            layer._id = id
+            Layer._interned[id] = layer
+        return layer
+
     def __init__(self, id):
         # type: (int) -> None
-        assert type(id) is int
-        self._id = id
+        pass  # initialized by __new__
 
     @staticmethod
     def from_id(id):
@@ -42,13 +93,19 @@ class Layer(object):
 
         :return: :class:`kicad.pcbnew.Layer`
         """
-        return Layer(id)
+        layer = Layer._interned.get(id)
+        if layer is None:
+            layer = Layer(id)
+        return layer
 
     @staticmethod
     def from_name(name):
         # type: (str) -> Layer
         """Get Layer object from name
 
+        Only standard layer names are known, use :func:`kicad.pcbnew.Board.layer_from_name` to respect the layer
+        names of a specific board.
+
         :param name:
         :type id: ``str``
 
@@ -58,7 +115,7 @@ class Layer(object):
             assert type(name) is str
         else:
             assert type(name) in [str, unicode]
-        return Layer(_LAYERS[name])
+        return Layer.from_id(_standard_layers()[name])
 
     @property
     def id(self):
@@ -69,20 +126,14 @@ class Layer(object):
         """
         return self._id
 
-    @id.setter
-    def id(self, id):
-        # type: (int) -> None
-        assert type(id) is int
-        self._id = id
-
     @property
     def name(self):
         # type: () -> str
-        """name of the layer
+        """standard name of the layer
 
         :return: ``unicode``
         """
-        return _LAYERS_NAME_LOOKUP.get(self._id, "")
+        return _standard_layer_names().get(self._id, "")
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
@@ -96,6 +147,9 @@ class Layer(object):
     def __hash__(self):
         return hash(self.id)
 
+    def __reduce__(self):
+        return Layer.from_id, (self.id,)
+
     def __repr__(self):
         return "kicad.pcbnew.Layer(id={})".format(self.id)
 
@@ -135,38 +189,146 @@ class BoardItemLayer(Layer):
 
 
 class LayerSet(object):
+    """Set of layers, stored as bitmask where bit ``n`` represents the layer with id ``n``
+
+    Membership tests and set algebra work on the bitmask and do not require any call into pcbnew.
+
+    :param layer_set: already existing layer set
+    :type layer_set: :class:`pcbnew.LSET`
+
+    :Example:
+
+    >>> from kicad.pcbnew import Layer, LayerSet
+    >>> s = LayerSet.from_layers([Layer.from_name('F.Cu'), Layer.from_name('B.Cu')])
+    >>> Layer.from_name('F.Cu') in s
+    True
+    >>> len(s | LayerSet.from_layers([Layer.from_name('F.Mask')]))
+    3
+    """
+
     def __init__(self, layer_set):
         # type: (_pcbnew.LSET) -> None
         assert isinstance(layer_set, _pcbnew.LSET)
         self._obj = layer_set
+        self._mask = int(layer_set.FmtHex().replace('_', ''), 16)
+
+    @staticmethod
+    def from_mask(mask):
+        # type: (int) -> LayerSet
+        """Create a LayerSet from a bitmask
+
+        :param mask: bitmask where bit ``n`` represents the layer with id ``n``
+        :type mask: ``int``
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        layer_set = LayerSet.__new__(LayerSet)
+        layer_set._obj = None
+        layer_set._mask = mask
+        return layer_set
+
+    @staticmethod
+    def from_layers(layers):
+        """Create a LayerSet from layers or layer ids
+
+        :param layers: layers which are part of the set
+        :type layers: iterable of :class:`kicad.pcbnew.Layer` or ``int``
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        mask = 0
+        for layer in layers:
+            mask |= 1 << (layer if type(layer) is int else layer.id)
+        return LayerSet.from_mask(mask)
 
     def get_native(self):
         # type: () -> _pcbnew.LSET
         """Get native object from the low level API
+
         :return: :class:`pcbnew.LSET`
         """
+        if self._obj is None:
+            mask_hex = '{:x}'.format(self._mask)
+            self._obj = _pcbnew.LSET()
+            self._obj.ParseHex(mask_hex, len(mask_hex))
         return self._obj
 
+    @property
+    def mask(self):
+        # type: () -> int
+        """bitmask where bit ``n`` represents the layer with id ``n``
+
+        :return: ``int``
+        """
+        return self._mask
+
+    def union(self, other):
+        # type: (LayerSet) -> LayerSet
+        """Layers which are in either set
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        return LayerSet.from_mask(self._mask | other._mask)
+
+    def intersection(self, other):
+        # type: (LayerSet) -> LayerSet
+        """Layers which are in both sets
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        return LayerSet.from_mask(self._mask & other._mask)
+
+    def difference(self, other):
+        # type: (LayerSet) -> LayerSet
+        """Layers which are in this set but not in the other set
+
+        :return: :class:`kicad.pcbnew.LayerSet`
+        """
+        return LayerSet.from_mask(self._mask & ~other._mask)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __contains__(self, layer):
+        # type: (Layer) -> bool
+        return (self._mask >> (layer if type(layer) is int else layer.id)) & 1 == 1
+
+    def __len__(self):
+        # type: () -> int
+        return bin(self._mask).count('1')
+
+    def __bool__(self):
+        return self._mask != 0
+
+    __nonzero__ = __bool__
+
     def __iter__(self):
-        for id in self._obj.SeqStackupBottom2Top():
-            yield Layer.from_id(id)
+        """Iterate over all layers in the order of their id"""
+        mask = self._mask
+        id = 0
+        while mask:
+            if mask & 1:
+                yield Layer.from_id(id)
+            mask >>= 1
+            id += 1
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
             return False
 
-        return set(iter(self)) == set(iter(other))  # TODO: verify
+        return self._mask == other._mask
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
         # type: () -> int
-        return hash(self._obj.FmtHex())
+        return hash(self._mask)
 
     def __repr__(self):
         # type: () -> str
-        return "kicad.pcbnew.LayerSet({})".format(self._obj)
+        return "kicad.pcbnew.LayerSet.from_mask({:#x})".format(self._mask)
 
     def __str__(self):
         # type: () -> str
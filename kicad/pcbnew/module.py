@@ -13,13 +13,21 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
-from typing import Generator  # noqa: F401
+import collections
+import io
+import json
+import math
+import os
+
+from typing import Dict, Generator, List, Optional, Tuple  # noqa: F401
 
 from kicad.pcbnew.boarditem import BoardItem
 
 from kicad.pcbnew.pad import Pad
 
 from kicad.util.point import Point2D
+from kicad.util.files import atomic_write
+from kicad.util.sexpr import SexprList, parse, open_file
 
 from kicad._native import _pcbnew
 
@@ -39,28 +47,34 @@ class Module(BoardItem):
         return self._obj
 
     @staticmethod
-    def from_library(lib_path, name):
-        # type: (str, str) -> Module
+    def from_library(lib_path, name, plugin=None):
+        # type: (str, str, _pcbnew.PCB_IO) -> Module
         """Load Module from library
 
+        To load many footprints, :class:`kicad.pcbnew.FootprintLibrary` caches already parsed ones.
+
         :param lib_path: library path
         :type lib_path: ``str``, ``unicode``
         :param name: name of the footprin to load
         :type name: ``str``, ``unicode``
+        :param plugin: library reader to reuse when loading many footprints, a new one is created when not given
+        :type plugin: :class:`pcbnew.PCB_IO`
 
         :return: :class:`pcbnew.MODULE`
         """
-        io = _pcbnew.PCB_IO()
+        io = _pcbnew.PCB_IO() if plugin is None else plugin
         return Module(io.FootprintLoad(lib_path, name))
 
-    def to_library(self, lib_path):
-        # type: (str) -> None
+    def to_library(self, lib_path, plugin=None):
+        # type: (str, _pcbnew.PCB_IO) -> None
         """Save Module to library
 
         :param lib_path: library path where to save the footprint
         :type lib_path: ``str``, ``unicode``
+        :param plugin: library writer to reuse when saving many footprints, a new one is created when not given
+        :type plugin: :class:`pcbnew.PCB_IO`
         """
-        io = _pcbnew.PCB_IO()
+        io = _pcbnew.PCB_IO() if plugin is None else plugin
         io.FootprintSave(lib_path, self.get_native())  # TODO: uses FPID().GetLibItemName(), what to do when not set?
 
     @property
@@ -99,7 +113,7 @@ class Module(BoardItem):
         :return: Iterator over :class:`kicad.pcbnew.Pad`
         """
         for p in self._obj.Pads():
-            yield Pad(p)
+            yield self._wrap(p, Pad)
 
     @property
     def position(self):
@@ -114,6 +128,39 @@ class Module(BoardItem):
     def position(self, pos):
         self._obj.SetPosition(Point2D(pos).to_wxPoint())
 
+    @property
+    def orientation(self):
+        # type: () -> float
+        """Orientation of the Module in degree
+
+        :return: ``float``
+        """
+        return self._obj.GetOrientation() / 10.
+
+    @orientation.setter
+    def orientation(self, orientation):
+        # type: (float) -> None
+        assert type(orientation) in [int, float]
+        self._obj.SetOrientation(orientation * 10.)
+
+    @property
+    def is_flipped(self):
+        # type: () -> bool
+        """is placed on the back side of the board?
+
+        :return: ``bool``
+        """
+        return self._obj.IsFlipped()
+
+    @property
+    def fpid(self):
+        # type: () -> str
+        """Identifier of the footprint in the library, like ``"Resistors_SMD:R_0805"``
+
+        :return: ``unicode``
+        """
+        return str(self._obj.GetFPID().Format())
+
     @property
     def reference(self):
         # type: () -> str
@@ -149,3 +196,416 @@ class Module(BoardItem):
     def __str__(self):
         # type: () -> str
         return "kicad.pcbnew.Module(\"{}\")".format(self.reference)
+
+
+_FOOTPRINT_EXTENSION = '.kicad_mod'
+
+
+class FootprintLibrary(object):
+    """Footprint library (``.pretty`` directory) which caches parsed footprints
+
+    The names of all footprints are indexed when they are needed first, and indexed again when the directory was
+    modified. The most recently loaded footprints are kept in memory, every call of :func:`load` returns a new copy
+    of the cached one. A footprint is parsed again when its file was modified. All footprints are read using the
+    same IO plugin.
+
+    :param lib_path: path of the library directory
+    :type lib_path: ``str``, ``unicode``
+    :param cache_size: maximum number of parsed footprints kept in memory
+    :type cache_size: ``int``
+
+    :Example:
+
+    >>> from kicad.pcbnew import FootprintLibrary
+    >>> lib = FootprintLibrary("path/to/Resistor_SMD.pretty")# doctest: +SKIP
+    >>> modules = [lib.load('R_0603_1608Metric') for _ in range(100)]# doctest: +SKIP
+    """
+
+    def __init__(self, lib_path, cache_size=256):
+        # type: (str, int) -> None
+        assert type(cache_size) is int and cache_size >= 0
+        self._path = lib_path
+        self._cache_size = cache_size
+        self._plugin = None  # type: _pcbnew.PCB_IO
+        self._index = None  # type: Dict[str, str]
+        self._index_mtime = None  # type: float
+        self._cache = collections.OrderedDict()  # name -> (file mtime, native module)
+
+    @property
+    def path(self):
+        # type: () -> str
+        """Path of the library directory
+
+        :return: ``str``, ``unicode``
+        """
+        return self._path
+
+    @property
+    def plugin(self):
+        # type: () -> _pcbnew.PCB_IO
+        """IO plugin shared by all loads and saves of this library
+
+        :return: :class:`pcbnew.PCB_IO`
+        """
+        if self._plugin is None:
+            self._plugin = _pcbnew.PCB_IO()
+        return self._plugin
+
+    def _files(self):
+        # type: () -> Dict[str, str]
+        """Index of footprint name -> file path, built again when the directory was modified"""
+        mtime = os.stat(self._path).st_mtime
+        if self._index is None or self._index_mtime != mtime:
+            self._index = {name[:-len(_FOOTPRINT_EXTENSION)]: os.path.join(self._path, name)
+                           for name in os.listdir(self._path) if name.endswith(_FOOTPRINT_EXTENSION)}
+            self._index_mtime = mtime
+        return self._index
+
+    @property
+    def names(self):
+        # type: () -> List[str]
+        """Names of all footprints in the library
+
+        :return: sorted ``list`` of ``str``
+        """
+        return sorted(self._files())
+
+    def load(self, name):
+        # type: (str) -> Module
+        """Load a footprint, using the cached one when its file was not modified
+
+        :param name: name of the footprint to load
+        :type name: ``str``, ``unicode``
+
+        :return: :class:`kicad.pcbnew.Module`
+
+        :raises KeyError: when the footprint does not exist in the library
+        """
+        path = self._files().get(name)
+        if path is None:
+            raise KeyError("footprint '{}' not found in library '{}'".format(name, self._path))
+        mtime = os.stat(path).st_mtime
+
+        entry = self._cache.pop(name, None)
+        if entry is None or entry[0] != mtime:
+            entry = mtime, self.plugin.FootprintLoad(self._path, name)
+
+        if self._cache_size > 0:
+            self._cache[name] = entry  # insert as most recently used
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return Module(_pcbnew.MODULE(entry[1]))  # copy, to not modify the cached footprint
+
+    def save(self, module):
+        # type: (Module) -> None
+        """Save a footprint into the library
+
+        :param module: footprint to save, its name is taken from the FPID
+        :type module: :class:`kicad.pcbnew.Module`
+        """
+        module.to_library(self._path, plugin=self.plugin)
+        self._cache.pop(str(module.get_native().GetFPID().GetLibItemName()), None)  # UTF8 object of the FPID
+        self._index = None  # the file could be new
+
+    def clear_cache(self):
+        # type: () -> None
+        """Forget all parsed footprints and the index of the library"""
+        self._cache.clear()
+        self._index = None
+        self._index_mtime = None
+
+    def __contains__(self, name):
+        return name in self._files()
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self._files())
+
+    def __repr__(self):
+        return "kicad.pcbnew.FootprintLibrary({!r})".format(self._path)
+
+
+_COURTYARD_LAYERS = frozenset(['F.CrtYd', 'B.CrtYd'])
+_FOOTPRINT_INDEX_VERSION = 1
+
+
+def _xy_of(node):
+    # type: (list) -> Tuple[float, float]
+    return float(node[1]), float(node[2])
+
+
+def _courtyard_points(graphic):
+    """Points which span the bounding box of a courtyard graphic"""
+    kind = graphic.name
+    if kind == 'fp_line':
+        return [_xy_of(graphic.find('start')), _xy_of(graphic.find('end'))]
+    elif kind in ('fp_circle', 'fp_arc'):
+        # arcs are treated like the whole circle, which is good enough to search for footprints by size
+        cx, cy = _xy_of(graphic.find('center' if kind == 'fp_circle' else 'start'))
+        ex, ey = _xy_of(graphic.find('end'))
+        r = math.hypot(ex - cx, ey - cy)
+        return [(cx - r, cy - r), (cx + r, cy + r)]
+    elif kind == 'fp_poly':
+        return [_xy_of(xy) for xy in graphic.find('pts').find_all('xy')]
+    return []
+
+
+def _pitch(positions):
+    # type: (List[Tuple[float, float]]) -> Optional[float]
+    """Smallest distance between neighbouring pads in a row or column"""
+    pitch = None
+    for key in (lambda p: (round(p[1], 4), p[0]), lambda p: (round(p[0], 4), p[1])):
+        ordered = sorted(set(positions), key=key)
+        for a, b in zip(ordered, ordered[1:]):
+            distance = math.hypot(b[0] - a[0], b[1] - a[1])
+            if distance > 0 and (pitch is None or distance < pitch):
+                pitch = distance
+    return None if pitch is None else round(pitch, 6)
+
+
+class FootprintInfo(object):
+    """Summary of a footprint stored in a :class:`kicad.pcbnew.FootprintIndex`
+
+    :param library: path of the library directory
+    :param name: name of the footprint
+    :param mtime: modification time of the footprint file when it was indexed
+    :param description: description of the footprint
+    :param keywords: keywords of the footprint
+    :param pad_count: number of pads, including unnamed mechanical ones
+    :param courtyard: bounding box of the courtyard as ``(min_x, min_y, max_x, max_y)`` in mm, ``None`` without one
+    :param pitch: smallest distance between neighbouring pads in mm, ``None`` for less than two pads
+    """
+    __slots__ = ('library', 'name', 'mtime', 'description', 'keywords', 'pad_count', 'courtyard', 'pitch')
+
+    def __init__(self, library, name, mtime, description, keywords, pad_count, courtyard, pitch):
+        self.library = library
+        self.name = name
+        self.mtime = mtime
+        self.description = description
+        self.keywords = keywords
+        self.pad_count = pad_count
+        self.courtyard = courtyard
+        self.pitch = pitch
+
+    @staticmethod
+    def from_file(library, name):
+        # type: (str, str) -> FootprintInfo
+        """Parse a footprint file of a library
+
+        :param library: path of the library directory
+        :type library: ``str``
+        :param name: name of the footprint
+        :type name: ``str``
+
+        :return: :class:`kicad.pcbnew.module.FootprintInfo`
+        """
+        path = os.path.join(library, name + _FOOTPRINT_EXTENSION)
+        mtime = os.stat(path).st_mtime
+        with open_file(path) as f:
+            node = parse(f)
+
+        points = []
+        positions = []
+        pad_count = 0
+        for child in node[1:]:
+            if type(child) is not SexprList:
+                continue
+            if child.name == 'pad':
+                pad_count += 1
+                positions.append(_xy_of(child.find('at')))
+            elif child.value('layer') in _COURTYARD_LAYERS:
+                points.extend(_courtyard_points(child))
+
+        courtyard = None
+        if points:
+            xs, ys = zip(*points)
+            courtyard = (min(xs), min(ys), max(xs), max(ys))
+
+        return FootprintInfo(library, name, mtime, node.value('descr', ''), node.value('tags', '').split(),
+                             pad_count, courtyard, _pitch(positions))
+
+    @property
+    def size(self):
+        # type: () -> Optional[Tuple[float, float]]
+        """Width and height of the courtyard
+
+        :return: ``tuple`` of two ``float`` or ``None``
+        """
+        if self.courtyard is None:
+            return None
+        return self.courtyard[2] - self.courtyard[0], self.courtyard[3] - self.courtyard[1]
+
+    def _to_row(self):
+        return [self.name, self.mtime, self.description, self.keywords, self.pad_count,
+                None if self.courtyard is None else list(self.courtyard), self.pitch]
+
+    @staticmethod
+    def _from_row(library, row):
+        name, mtime, description, keywords, pad_count, courtyard, pitch = row
+        return FootprintInfo(library, name, mtime, description, keywords, pad_count,
+                             None if courtyard is None else tuple(courtyard), pitch)
+
+    def __repr__(self):
+        return "kicad.pcbnew.module.FootprintInfo('{}', '{}')".format(os.path.basename(self.library), self.name)
+
+
+class FootprintIndex(object):
+    """Searchable summary of footprint libraries, stored in a single file
+
+    Libraries are scanned with :func:`update`, which only parses footprint files which are new or were modified
+    since the last scan. Searching only uses the index, no footprint file is read.
+
+    The footprint files are read with the S-expression parser, which means KiCad does not need to be installed.
+
+    :param path: path of the index file, which is created by :func:`save`
+    :type path: ``str``
+
+    :Example:
+
+    >>> from kicad.pcbnew import FootprintIndex
+    >>> index = FootprintIndex("footprints.idx")# doctest: +SKIP
+    >>> index.update(["path/to/Package_SO.pretty", "path/to/Package_QFP.pretty"])# doctest: +SKIP
+    >>> index.save()# doctest: +SKIP
+    >>> index.search(keyword='SOIC', pad_count=8, pitch=1.27)# doctest: +SKIP
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self._path = path
+        self._libraries = {}  # type: Dict[str, Dict[str, FootprintInfo]]
+        self._keywords = None  # type: Dict[str, List[FootprintInfo]]
+        if os.path.isfile(path):
+            self._load()
+
+    def _load(self):
+        with io.open(self._path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != _FOOTPRINT_INDEX_VERSION:
+            return  # written by another version, everything is scanned again
+        for library, rows in data['libraries'].items():
+            infos = (FootprintInfo._from_row(library, row) for row in rows)
+            self._libraries[library] = {info.name: info for info in infos}
+
+    def save(self):
+        # type: () -> None
+        """Write the index file"""
+        data = {'version': _FOOTPRINT_INDEX_VERSION,
+                'libraries': {library: [info._to_row() for info in infos.values()]
+                              for library, infos in self._libraries.items()}}
+        with atomic_write(self._path, 'w', encoding='utf-8') as f:
+            f.write(u'{}'.format(json.dumps(data, separators=(',', ':'))))
+
+    def update(self, libraries):
+        # type: (List[str]) -> int
+        """Scan libraries, and parse all footprints which changed since the last scan
+
+        Footprints removed from a library are removed from the index. Libraries which were indexed before, but are
+        not given, are kept unchanged.
+
+        :param libraries: paths of the library directories
+        :type libraries: ``list`` of ``str``
+
+        :return: number of parsed footprint files
+        """
+        parsed = 0
+        for library in libraries:
+            library = os.path.abspath(library)
+            old = self._libraries.get(library, {})
+            new = {}
+            for filename in os.listdir(library):
+                if not filename.endswith(_FOOTPRINT_EXTENSION):
+                    continue
+                name = filename[:-len(_FOOTPRINT_EXTENSION)]
+                info = old.get(name)
+                if info is None or info.mtime != os.stat(os.path.join(library, filename)).st_mtime:
+                    info = FootprintInfo.from_file(library, name)
+                    parsed += 1
+                new[name] = info
+            self._libraries[library] = new
+        self._keywords = None
+        return parsed
+
+    def remove(self, library):
+        # type: (str) -> None
+        """Remove a library from the index
+
+        :raises KeyError: when the library is not indexed
+        """
+        del self._libraries[os.path.abspath(library)]
+        self._keywords = None
+
+    @property
+    def libraries(self):
+        # type: () -> List[str]
+        """Paths of all indexed libraries
+
+        :return: sorted ``list`` of ``str``
+        """
+        return sorted(self._libraries)
+
+    def _keyword_table(self):
+        if self._keywords is None:
+            self._keywords = {}
+            for info in self:
+                for keyword in set(k.lower() for k in info.keywords):
+                    self._keywords.setdefault(keyword, []).append(info)
+        return self._keywords
+
+    def search(self, keyword=None, pad_count=None, max_width=None, max_height=None, pitch=None, library=None):
+        """Find footprints matching all given conditions
+
+        :param keyword: keyword the footprint has to be tagged with (case insensitive)
+        :type keyword: ``str``
+        :param pad_count: exact number of pads
+        :type pad_count: ``int``
+        :param max_width: maximum width of the courtyard in mm
+        :type max_width: ``float``
+        :param max_height: maximum height of the courtyard in mm
+        :type max_height: ``float``
+        :param pitch: pad pitch in mm
+        :type pitch: ``float``
+        :param library: path of the library to search in
+        :type library: ``str``
+
+        :return: ``list`` of :class:`kicad.pcbnew.module.FootprintInfo`, sorted by library and name
+        """
+        if keyword is not None:
+            candidates = self._keyword_table().get(keyword.lower(), [])
+        elif library is not None:
+            candidates = self._libraries.get(os.path.abspath(library), {}).values()
+        else:
+            candidates = iter(self)
+
+        if library is not None:
+            library = os.path.abspath(library)
+        result = []
+        for info in candidates:
+            if library is not None and info.library != library:
+                continue
+            if pad_count is not None and info.pad_count != pad_count:
+                continue
+            if max_width is not None or max_height is not None:
+                size = info.size
+                if size is None:
+                    continue
+                if (max_width is not None and size[0] > max_width) or \
+                        (max_height is not None and size[1] > max_height):
+                    continue
+            if pitch is not None and (info.pitch is None or abs(info.pitch - pitch) > 1e-4):
+                continue
+            result.append(info)
+        return sorted(result, key=lambda i: (i.library, i.name))
+
+    def __iter__(self):
+        for infos in self._libraries.values():
+            for info in infos.values():
+                yield info
+
+    def __len__(self):
+        return sum(len(infos) for infos in self._libraries.values())
+
+    def __repr__(self):
+        return "kicad.pcbnew.FootprintIndex('{}', <{} footprints>)".format(self._path, len(self))
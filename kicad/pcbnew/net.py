@@ -13,6 +13,8 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import math
+
 from kicad._native import _pcbnew
 
 
@@ -36,6 +38,14 @@ class Net(object):
         """
         return self._obj.GetNetname()
 
+    @property
+    def code(self):
+        """Net code, which is the number used to reference the Net inside of the Board
+
+        :return: ``int``
+        """
+        return self._obj.GetNet()
+
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
             return False
@@ -59,3 +69,134 @@ class Net(object):
 
     def __str__(self):
         return "kicad.pcbnew.Net(\"{}\")".format(self.name)
+
+
+class NetIndex(object):
+    """Index of all items of a board which are connected to a Net
+
+    The index is created in a single pass over tracks, vias, zones and pads of the board. Afterwards, all items of a
+    net can be looked up without iterating over the board again. Nets can be given as :class:`kicad.pcbnew.Net` or
+    as net code.
+
+    :param board: board to index
+    :type board: :class:`kicad.pcbnew.Board`
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board
+    >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+    >>> index = b.net_index# doctest: +SKIP
+    >>> for net in index:# doctest: +SKIP
+    ...     print(net.name, index.count(net), index.track_length(net))
+    """
+
+    _KINDS = ('tracks', 'vias', 'zones', 'pads')
+
+    def __init__(self, board):
+        self._nets = {}  # type: dict
+        self._items = {}  # type: dict
+        self._track_length = {}  # type: dict
+
+        for kind, items in (('tracks', board.tracks), ('vias', board.vias), ('zones', board.zones),
+                            ('pads', (pad for module in board.modules for pad in module.pads))):
+            for item in items:
+                net = item.net
+                code = net.code
+                entry = self._items.get(code)
+                if entry is None:
+                    entry = self._items[code] = {k: [] for k in NetIndex._KINDS}
+                    self._nets[code] = net
+                    self._track_length[code] = 0.
+                entry[kind].append(item)
+                if kind == 'tracks':
+                    start = item.start
+                    end = item.end
+                    self._track_length[code] += math.hypot(end.x - start.x, end.y - start.y)
+
+    @staticmethod
+    def _code(net):
+        return net.code if isinstance(net, Net) else net
+
+    def _get(self, net, kind):
+        entry = self._items.get(NetIndex._code(net))
+        return [] if entry is None else entry[kind]
+
+    def net(self, code):
+        # type: (int) -> Net
+        """Get the Net with the given net code
+
+        :param code: net code
+        :type code: ``int``
+
+        :return: :class:`kicad.pcbnew.Net`, or ``None`` if no item is connected to this net
+        """
+        return self._nets.get(code)
+
+    def tracks(self, net):
+        """Tracks connected to a Net
+
+        :return: ``list`` of :class:`kicad.pcbnew.Track`
+        """
+        return self._get(net, 'tracks')
+
+    def vias(self, net):
+        """Vias connected to a Net
+
+        :return: ``list`` of :class:`kicad.pcbnew.Via`
+        """
+        return self._get(net, 'vias')
+
+    def zones(self, net):
+        """Zones connected to a Net
+
+        :return: ``list`` of :class:`kicad.pcbnew.Zone`
+        """
+        return self._get(net, 'zones')
+
+    def pads(self, net):
+        """Pads connected to a Net
+
+        :return: ``list`` of :class:`kicad.pcbnew.Pad`
+        """
+        return self._get(net, 'pads')
+
+    def items(self, net):
+        """All items connected to a Net, in the order tracks, vias, zones and pads
+
+        :return: ``list``
+        """
+        entry = self._items.get(NetIndex._code(net))
+        if entry is None:
+            return []
+        return [item for kind in NetIndex._KINDS for item in entry[kind]]
+
+    def count(self, net):
+        """Number of items connected to a Net
+
+        :return: ``int``
+        """
+        entry = self._items.get(NetIndex._code(net))
+        if entry is None:
+            return 0
+        return sum(len(entry[kind]) for kind in NetIndex._KINDS)
+
+    def track_length(self, net):
+        """Summed up length of all Tracks of a Net
+
+        :return: ``float``
+        """
+        return self._track_length.get(NetIndex._code(net), 0.)
+
+    def __contains__(self, net):
+        return NetIndex._code(net) in self._items
+
+    def __iter__(self):
+        """Iterate over all Nets which have at least one item, ordered by net code"""
+        for code in sorted(self._nets):
+            yield self._nets[code]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return "kicad.pcbnew.NetIndex(<{} nets>)".format(len(self))
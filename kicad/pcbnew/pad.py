@@ -69,6 +69,18 @@ class Pad(BoardItem):
     def size(self, size):
         self._obj.SetSize(Point2D(size).to_wxSize())
 
+    @property
+    def position(self):
+        """Position of the Pad
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return Point2D.from_wxPoint(self._obj.GetPosition())
+
+    @position.setter
+    def position(self, pos):
+        self._obj.SetPosition(Point2D(pos).to_wxPoint())
+
     @property
     def net(self):
         """Net of the Zone
@@ -0,0 +1,1242 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+"""Read-only board backend which parses ".kicad_pcb" files in pure python, without requiring pcbnew"""
+
+import io
+import math
+import mmap
+import os
+import re
+
+from typing import Dict, Generator, Iterable, List, Tuple  # noqa: F401
+
+from kicad.pcbnew.board import Board, TRACK_ARRAY_DTYPE, VIA_ARRAY_DTYPE, _structured_array
+from kicad.pcbnew.drawsegment import Arc, Circle, Drawsegment, Line, Polygon
+from kicad.pcbnew.layer import Layer, LayerSet, _standard_layers, _standard_layer_names
+from kicad.pcbnew.module import Module
+from kicad.pcbnew.net import Net
+from kicad.pcbnew.pad import Pad
+from kicad.pcbnew.text import Text
+from kicad.pcbnew.track import Track
+from kicad.pcbnew.via import Via
+from kicad.pcbnew.zone import Zone
+
+from kicad.util.point import Point2D
+from kicad.util.files import atomic_write
+from kicad.util.sexpr import SexprList, changed_ranges, format_float, iter_parse, open_file, parse, splice, write_root
+from kicad.util.sexpr import _STRUCTURE_RE
+
+
+_COPPER_LAYER_MASK = (1 << 32) - 1  # F.Cu, In1.Cu ... In30.Cu, B.Cu
+
+# top level expressions which describe the board itself, they are always parsed
+_HEADER_SECTIONS = ('general', 'layers', 'setup', 'net')
+
+# top level expressions which are drawings, in the order they are returned by SexprBoard.drawings
+_DRAWING_SECTIONS = ('gr_line', 'gr_arc', 'gr_circle', 'gr_poly', 'gr_curve', 'gr_text')
+
+# top level expressions which are required by the backend, everything else is skipped while parsing
+_BOARD_SECTIONS = frozenset(_HEADER_SECTIONS + _DRAWING_SECTIONS + ('module', 'segment', 'via', 'zone'))
+
+
+# KiCad writes every top level expression on a new line, indented by two spaces
+_SECTION_START_RE = re.compile(br'\n  \(([^\s()"]+)')
+
+
+def _point(node, default=(0., 0.)):
+    # type: (SexprList, tuple) -> Point2D
+    if node is None:
+        return Point2D(default)
+    return Point2D(float(node[1]), float(node[2]))
+
+
+def _lowest_layer(layer_set):
+    # type: (LayerSet) -> Layer
+    mask = layer_set.mask
+    return Layer.from_id((mask & -mask).bit_length() - 1)
+
+
+def _copy(node):
+    # type: (SexprList) -> SexprList
+    """Copy the structure of an expression (atoms are immutable and shared)"""
+    return SexprList([_copy(item) if type(item) is SexprList else item for item in node])
+
+
+def _float(node, name, default=0.):
+    # type: (SexprList, str, float) -> float
+    value = node.value(name)
+    return default if value is None else float(value)
+
+
+# lists of an item which contain a point of its geometry
+_POINT_NODES = frozenset(['start', 'end', 'center', 'at'])
+
+
+def _points(node):
+    # type: (SexprList) -> List[Point2D]
+    """All points of the geometry of an item, like start and end of a line, or the corners of a polygon"""
+    points = [_point(item) for item in node if type(item) is SexprList and item.name in _POINT_NODES]
+    pts = node.find('pts')
+    if pts is not None:
+        points.extend(_point(xy) for xy in pts.find_all('xy'))
+    return points
+
+
+def _bounding_box(points, margin=0.):
+    # type: (List[Point2D], float) -> Tuple[Point2D, Point2D]
+    """Axis aligned bounding box of some points, grown by a margin"""
+    return (Point2D(min(p.x for p in points) - margin, min(p.y for p in points) - margin),
+            Point2D(max(p.x for p in points) + margin, max(p.y for p in points) + margin))
+
+
+class SexprNet(Net):
+    """Net of a board parsed by the sexpr backend
+
+    :param code: net code
+    :type code: ``int``
+    :param name: name of the net
+    :type name: ``str``
+    """
+
+    def __init__(self, code, name):
+        self._obj = (code, name)
+
+    @property
+    def name(self):
+        """Name of Net
+
+        :return: ``unicode``
+        """
+        return self._obj[1]
+
+    @property
+    def code(self):
+        """Net code, which is the number used to reference the Net inside of the Board
+
+        :return: ``int``
+        """
+        return self._obj[0]
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprNet({}, {!r})".format(*self._obj)
+
+
+class _SexprItem(object):
+    """Common read-only implementation of all items parsed by the sexpr backend
+
+    Must be the first base class, so it replaces the accessors of the native wrapper classes.
+    """
+
+    def __init__(self, node, board):
+        # type: (SexprList, SexprBoard) -> None
+        self._obj = node
+        self._board = board
+
+    def get_native(self):
+        """Get the parsed S-expression, there is no native object
+
+        :return: :class:`kicad.util.sexpr.SexprList`
+        """
+        return self._obj
+
+    @property
+    def is_highlighted(self):
+        """is highlighted?
+
+        :return: ``bool``
+        """
+        return False
+
+    @property
+    def is_locked(self):
+        """is locked?
+
+        :return: ``bool``
+        """
+        return 'locked' in self._obj.atoms() or self._obj.find('locked') is not None
+
+    @property
+    def is_selected(self):
+        """is selected?
+
+        :return: ``bool``
+        """
+        return False
+
+    @property
+    def layer(self):
+        """primary layer of the item
+
+        :return: ``kicad.pcbnew.Layer``
+        """
+        name = self._obj.value('layer')
+        if name is not None:
+            return Layer.from_id(self._board._layer_id(name))
+        if self._obj.find('layers') is None:
+            raise ValueError("{} is not placed on any layer".format(self._obj.name))
+        return _lowest_layer(self.layers)  # items on multiple layers, like zones of KiCad 5.1
+
+    @property
+    def layers(self):
+        """All layers where the item is present on
+
+        :return: ``kicad.pcbnew.LayerSet``
+        """
+        layers = self._obj.find('layers')
+        if layers is None:
+            return LayerSet.from_mask(1 << self.layer.id)
+        return LayerSet.from_mask(self._board._layer_mask(layers.atoms()))
+
+    @property
+    def net(self):
+        """Net of the item
+
+        :return: :class:`kicad.pcbnew.sexprboard.SexprNet`
+        """
+        return self._board._net(self._obj.find('net'))
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of all points of the item, grown by half of its width
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        points = _points(self._obj)
+        if not points:
+            raise ValueError("{} has no position".format(self._obj.name))
+        return _bounding_box(points, _float(self._obj, 'width') / 2.)
+
+    def _identity(self):
+        # type: () -> int
+        return id(self._obj)
+
+
+class SexprTrack(_SexprItem, Track):
+    """Track of a board parsed by the sexpr backend"""
+
+    @property
+    def start(self):
+        """Start of the Track
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('start'))
+
+    @property
+    def end(self):
+        """End of the Track
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('end'))
+
+    @property
+    def width(self):
+        """Width of Track in mm
+
+        :return: ``float``
+        """
+        return _float(self._obj, 'width')
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the Track
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        start = self.start
+        end = self.end
+        r = self.width / 2.
+        return (Point2D(min(start.x, end.x) - r, min(start.y, end.y) - r),
+                Point2D(max(start.x, end.x) + r, max(start.y, end.y) + r))
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprTrack({})".format(self._obj)
+
+
+class SexprVia(_SexprItem, Via):
+    """Via of a board parsed by the sexpr backend"""
+
+    @property
+    def layers(self):
+        """All layers where the via is present on
+
+        :return: ``kicad.pcbnew.LayerSet``
+        """
+        if 'blind' not in self._obj.atoms() and 'micro' not in self._obj.atoms():
+            return LayerSet.from_mask(_COPPER_LAYER_MASK)  # through vias are present on all copper layers
+        layer_ids = [self._board._layer_id(name) for name in self._obj.find('layers').atoms()]
+        return LayerSet.from_layers(range(min(layer_ids), max(layer_ids) + 1))
+
+    @property
+    def layer(self):
+        """primary layer of the via
+
+        :return: ``kicad.pcbnew.Layer``
+        """
+        return _lowest_layer(self.layers)
+
+    @property
+    def position(self):
+        """Position of the Via
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('at'))
+
+    @property
+    def drill(self):
+        """Drill size of Via in mm
+
+        :return: ``float``
+        """
+        return _float(self._obj, 'drill', self._board._setup_float('via_drill'))
+
+    @property
+    def width(self):
+        """Width of Via in mm
+
+        :return: ``float``
+        """
+        return _float(self._obj, 'size')
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the Via
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        r = self.width / 2.
+        return self.position - r, self.position + r
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprVia({})".format(self._obj)
+
+
+class SexprZone(_SexprItem, Zone):
+    """Zone of a board parsed by the sexpr backend"""
+
+    @property
+    def priority(self):
+        """Priority of the Zone
+
+        :return: ``int``
+        """
+        return int(self._obj.value('priority', 0))
+
+    @property
+    def outline(self):
+        """Corners of the outline of the Zone, followed by the corners of its holes
+
+        :return: ``list`` of :class:`kicad.util.Point2D`
+        """
+        return [_point(xy) for polygon in self._obj.find_all('polygon') for xy in polygon.find('pts').find_all('xy')]
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the outline of the Zone
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        return _bounding_box([_point(xy) for xy in self._obj.find('polygon').find('pts').find_all('xy')])
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprZone({})".format(self._obj)
+
+
+class SexprPad(_SexprItem, Pad):
+    """Pad of a module parsed by the sexpr backend"""
+
+    def __init__(self, node, board, module):
+        # type: (SexprList, SexprBoard, SexprModule) -> None
+        super(SexprPad, self).__init__(node, board)
+        self._module = module
+
+    @property
+    def layer(self):
+        """primary layer of the pad
+
+        :return: ``kicad.pcbnew.Layer``
+        """
+        return _lowest_layer(self.layers)
+
+    @property
+    def name(self):
+        """Name of the Pad
+
+        :return: ``unicode``
+        """
+        return self._obj[1]
+
+    @property
+    def drill_size(self):
+        """Drill size of the Pad
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        drill = self._obj.find('drill')
+        if drill is None:
+            return Point2D(0., 0.)
+        sizes = [float(v) for v in drill.atoms() if v != 'oval']
+        if not sizes:
+            return Point2D(0., 0.)
+        return Point2D(sizes[0], sizes[-1])
+
+    @drill_size.setter
+    def drill_size(self, drill_size):
+        drill_size = Point2D(drill_size)
+        drill = self._obj.find('drill')
+        if drill is None:
+            drill = SexprList(['drill'])
+            self._obj.insert(self._obj.index(self._obj.find('size')) + 1, drill)
+        if drill_size.x == drill_size.y:
+            atoms = [format_float(drill_size.x)]
+        else:
+            atoms = ['oval', format_float(drill_size.x), format_float(drill_size.y)]
+        drill[1:] = atoms + [item for item in drill[1:] if type(item) is SexprList]  # keep the offset
+
+    @property
+    def size(self):
+        """Size of the Pad
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('size'))
+
+    @size.setter
+    def size(self, size):
+        size = Point2D(size)
+        self._obj.find('size')[1:3] = [format_float(size.x), format_float(size.y)]
+
+    @property
+    def position(self):
+        """Position of the Pad (absolute, including the position and orientation of the module)
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return self._module._to_board(_point(self._obj.find('at')))
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the Pad (including its rotation)
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        at = self._obj.find('at')
+        angle = math.radians(float(at[3])) if len(at) > 3 else 0.
+        cos = abs(math.cos(angle))
+        sin = abs(math.sin(angle))
+        size = self.size
+        extent = Point2D(size.x * cos + size.y * sin, size.x * sin + size.y * cos) / 2.
+        position = self.position
+        return position - extent, position + extent
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprPad({})".format(self._obj)
+
+
+class SexprModule(_SexprItem, Module):
+    """Module of a board parsed by the sexpr backend"""
+
+    def _fp_text(self, kind):
+        # type: (str) -> str
+        for text in self._obj.find_all('fp_text'):
+            if text[1] == kind:
+                return text[2]
+        return ''
+
+    def _to_board(self, point):
+        # type: (Point2D) -> Point2D
+        """Convert a point relative to the module into board coordinates"""
+        at = self._obj.find('at')
+        angle = math.radians(float(at[3])) if len(at) > 3 else 0.
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        # KiCad uses a y-axis pointing downwards, which is why the rotation is clockwise
+        return Point2D(float(at[1]) + point.x * cos + point.y * sin,
+                       float(at[2]) - point.x * sin + point.y * cos)
+
+    @property
+    def description(self):
+        """Description of the Module
+
+        :return: ``unicode``
+        """
+        return self._obj.value('descr', '')
+
+    @property
+    def keywords(self):
+        """Keywords of the Module
+
+        :return: ``unicode``
+        """
+        return self._obj.value('tags', '')
+
+    @property
+    def pads(self):
+        """List of Pads present in the Module
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprPad`
+        """
+        for pad in self._obj.find_all('pad'):
+            yield SexprPad(pad, self._board, self)
+
+    @property
+    def position(self):
+        """Position of the Module
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('at'))
+
+    @property
+    def orientation(self):
+        """Orientation of the Module in degree
+
+        :return: ``float``
+        """
+        at = self._obj.find('at')
+        return float(at[3]) if len(at) > 3 else 0.
+
+    @property
+    def is_flipped(self):
+        """is placed on the back side of the board?
+
+        :return: ``bool``
+        """
+        return self._obj.value('layer') == 'B.Cu'
+
+    @property
+    def fpid(self):
+        """Identifier of the footprint in the library, like ``"Resistors_SMD:R_0805"``
+
+        :return: ``unicode``
+        """
+        return self._obj[1]
+
+    @property
+    def reference(self):
+        """Reference of the Module
+
+        :return: ``unicode``
+        """
+        return self._fp_text('reference')
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the pads and graphic items of the Module, texts are not included
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        points = [self.position]
+        for pad in self.pads:
+            points.extend(pad.bounding_box)
+        for node in self._obj:
+            if type(node) is not SexprList or node.name not in ('fp_line', 'fp_arc', 'fp_circle', 'fp_poly'):
+                continue
+            local = _points(node)
+            margin = _float(node, 'width') / 2.
+            if node.name in ('fp_arc', 'fp_circle'):
+                center = local[0]  # arcs store their center as start
+                margin += math.hypot(local[1].x - center.x, local[1].y - center.y)
+                local = [center]
+            for point in local:
+                point = self._to_board(point)
+                points.extend((point - margin, point + margin))
+        return _bounding_box(points)
+
+    @property
+    def value(self):
+        """Value of the Module
+
+        :return: ``unicode``
+        """
+        return self._fp_text('value')
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprModule({})".format(self._obj[1])
+
+
+class SexprDrawsegment(_SexprItem, Drawsegment):
+    """Drawing of a board parsed by the sexpr backend, used as is for shapes without a dedicated class (curves)"""
+
+    @property
+    def width(self):
+        """Width of line in mm
+
+        :return: ``float``
+        """
+        return _float(self._obj, 'width')
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprDrawsegment({})".format(self._obj)
+
+
+class SexprArc(SexprDrawsegment, Arc):
+    """Arc of a board parsed by the sexpr backend"""
+
+    @property
+    def angle(self):
+        """angle of arc in degree
+
+        :return: ``float``
+        """
+        return _float(self._obj, 'angle')
+
+    @property
+    def center(self):
+        """Center point of arc
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('start'))  # KiCad stores the center as start, and the start as end of an arc
+
+    @property
+    def start(self):
+        """Start point of arc
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('end'))
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the whole circle of the arc, grown by half of the width
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        center = self.center
+        start = self.start
+        return _bounding_box([center], math.hypot(start.x - center.x, start.y - center.y) + self.width / 2.)
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprArc({})".format(self._obj)
+
+
+class SexprCircle(SexprDrawsegment, Circle):
+    """Circle of a board parsed by the sexpr backend"""
+
+    @property
+    def center(self):
+        """Center point of circle
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('center'))
+
+    @property
+    def radius(self):
+        """Radius of circle
+
+        :return: ``float``
+        """
+        diff = self.center - _point(self._obj.find('end'))
+        return math.hypot(diff.x, diff.y)
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the circle, grown by half of the width
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        return _bounding_box([self.center], self.radius + self.width / 2.)
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprCircle({})".format(self._obj)
+
+
+class SexprLine(SexprDrawsegment, Line):
+    """Line of a board parsed by the sexpr backend"""
+
+    @property
+    def start(self):
+        """Start point of line
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('start'))
+
+    @property
+    def end(self):
+        """End point of line
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('end'))
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprLine({})".format(self._obj)
+
+
+class SexprPolygon(SexprDrawsegment, Polygon):
+    """Polygon of a board parsed by the sexpr backend"""
+
+    @property
+    def points(self):
+        """Corners of the polygon
+
+        :return: ``list`` of :class:`kicad.util.Point2D`
+        """
+        return [_point(xy) for xy in self._obj.find('pts').find_all('xy')]
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprPolygon({})".format(self._obj)
+
+
+class SexprText(_SexprItem, Text):
+    """Text of a board parsed by the sexpr backend"""
+
+    def _font(self):
+        # type: () -> SexprList
+        effects = self._obj.find('effects')
+        font = effects.find('font') if effects is not None else None
+        return font if font is not None else SexprList(['font'])
+
+    @property
+    def position(self):
+        """Position of the Text
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._obj.find('at'))
+
+    @property
+    def text(self):
+        """Text
+
+        :return: ``unicode``
+        """
+        return self._obj[1]
+
+    @property
+    def text_size(self):
+        """Text Size
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        size = self._font().find('size')
+        if size is None:
+            return Point2D(0., 0.)
+        return Point2D(float(size[2]), float(size[1]))  # KiCad stores the height first
+
+    @property
+    def thickness(self):
+        """Thickness
+
+        :return: ``float``
+        """
+        return _float(self._font(), 'thickness')
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of the Text, estimated from the number of characters
+
+        The box is centered on the position, and large enough for every orientation and justification of the text.
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        lines = self.text.split('\n')
+        size = self.text_size
+        extent = math.hypot(max(len(line) for line in lines) * size.x, len(lines) * size.y)
+        return _bounding_box([self.position], extent + self.thickness / 2.)
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprText({})".format(self._obj)
+
+
+# top level expression -> wrapper class of the drawing
+_DRAWING_CLASSES = {
+    'gr_line': SexprLine,
+    'gr_arc': SexprArc,
+    'gr_circle': SexprCircle,
+    'gr_poly': SexprPolygon,
+    'gr_curve': SexprDrawsegment,
+    'gr_text': SexprText,
+}
+
+
+class SexprBoard(Board):
+    """Read-only Board parsed from a ".kicad_pcb" file in pure python
+
+    Only modules (including their pads), tracks, vias, zones and drawings are supported. Everything else of the file is
+    skipped while parsing, which keeps the memory footprint small.
+
+    :param path: path to the ".kicad_pcb" file
+    :type path: ``str``, ``unicode``
+
+    :Example:
+
+    >>> from kicad.pcbnew.sexprboard import SexprBoard
+    >>> b = SexprBoard("path/to/board.kicad_pcb")# doctest: +SKIP
+    >>> for module in b.modules:# doctest: +SKIP
+    ...     print(module.reference, [pad.position for pad in module.pads])
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self._filepath = path
+        self._layer_table = dict(_standard_layers()), dict(_standard_layer_names())
+        self._layers_enabled = set()
+        self._nets = {}
+        self._net_index = None
+        self._setup = SexprList(['setup'])
+        self._parsed = {}  # type: Dict[str, List[SexprList]]
+
+        try:
+            self._load()
+        except (ValueError, UnicodeDecodeError) as e:
+            raise IOError("\"{}\" could not be parsed: {}".format(path, e))
+
+    def _load(self):
+        # type: () -> None
+        """Parse the file, called once by the constructor"""
+        with open_file(self._filepath) as f:
+            nodes = iter_parse(f)
+            self._obj = next(nodes)
+            if self._obj.name != 'kicad_pcb':
+                raise IOError("\"{}\" is not a kicad_pcb file".format(self._filepath))
+            for node in nodes:
+                name = node[0] if node else None
+                if name not in _BOARD_SECTIONS:
+                    continue
+                elif name in _HEADER_SECTIONS:
+                    self._add_header_node(node)
+                else:
+                    self._parsed.setdefault(name, []).append(node)
+
+    def _section(self, name):
+        # type: (str) -> List[SexprList]
+        """Parsed top level expressions with the given name, in the order of the file"""
+        return self._parsed.get(name, [])
+
+    def _add_header_node(self, node):
+        # type: (SexprList) -> None
+        """Process a top level expression which describes the board itself (general, layers, setup, net)"""
+        name = node.name
+        if name == 'net':
+            self._nets[int(node[1])] = SexprNet(int(node[1]), node[2])
+        elif name == 'layers':
+            for layer in node[1:]:
+                self._layer_table[0][layer[1]] = int(layer[0])
+                self._layer_table[1][int(layer[0])] = layer[1]
+                self._layers_enabled.add(int(layer[0]))
+        elif name == 'setup':
+            self._setup = node
+
+    def invalidate_cache(self):
+        # type: () -> None
+        self._net_index = None  # everything else is parsed from the file and cannot change
+
+    def _layer_tables(self):
+        # type: () -> tuple
+        return self._layer_table
+
+    def _layer_id(self, name):
+        # type: (str) -> int
+        return self._layer_table[0][name]
+
+    def _layer_mask(self, names):
+        # type: (Iterable[str]) -> int
+        by_name = self._layer_table[0]
+        mask = 0
+        for name in names:
+            if name in by_name:
+                mask |= 1 << by_name[name]
+            elif name == '*.Cu':
+                mask |= _COPPER_LAYER_MASK
+            elif name.startswith('*.') or name.startswith('F&B.'):
+                suffix = name[name.index('.'):]
+                mask |= 1 << by_name['F' + suffix]
+                mask |= 1 << by_name['B' + suffix]
+            else:
+                raise KeyError("unknown layer \"{}\"".format(name))
+        return mask
+
+    def _net(self, node):
+        # type: (SexprList) -> SexprNet
+        if node is None:
+            return self._nets.get(0) or SexprNet(0, '')
+        code = int(node[1])
+        net = self._nets.get(code)
+        if net is None:
+            net = SexprNet(code, node[2] if len(node) > 2 else '')
+        return net
+
+    def _setup_float(self, name, default=0.):
+        # type: (str, float) -> float
+        return _float(self._setup, name, default)
+
+    def get_native(self):
+        """Get the root S-expression of the file, there is no native object
+
+        :return: :class:`kicad.util.sexpr.SexprList`
+        """
+        return self._obj
+
+    @staticmethod
+    def from_file(path):
+        # type: (str) -> SexprBoard
+        """Load a board from a given filepath
+
+        :param path: path to the ".kicad_pcb" file
+        :type path: ``str``, ``unicode``
+
+        :return: :class:`kicad.pcbnew.sexprboard.SexprBoard`
+        """
+        return SexprBoard(path)
+
+    def to_file(self, path, incremental=True):
+        # type: (str, bool) -> None
+        """Save the board to a given filepath
+
+        Only modules, tracks, vias, zones and drawings are kept in memory, everything else is copied from the
+        original file, which must not have been changed since the board was loaded. Otherwise it is saved like
+        :func:`kicad.pcbnew.sexprboard.LazySexprBoard.to_file` does.
+
+        :param path: path for the ".kicad_pcb" file
+        :type path: ``str``, ``unicode``
+        :param incremental: only write modified expressions again
+        :type incremental: ``bool``
+        """
+        board = LazySexprBoard(self._filepath)
+        try:
+            for name, nodes in self._parsed.items():
+                if len(board._section(name)) != len(nodes):
+                    raise IOError("\"{}\" was changed since it was loaded".format(self._filepath))
+                board._parsed[name] = nodes
+            board.to_file(path, incremental)
+        finally:
+            board._mmap.close()
+
+    @property
+    def filepath(self):
+        """Filepath of the Board
+
+        :return: ``unicode``
+        """
+        return self._filepath
+
+    @property
+    def aux_origin(self):
+        """Aux origin of Board
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._setup.find('aux_axis_origin'))
+
+    @property
+    def grid_origin(self):
+        """Grid origin of Board
+
+        :return: :class:`kicad.util.Point2D`
+        """
+        return _point(self._setup.find('grid_origin'))
+
+    @property
+    def modules(self):
+        # type: () -> Generator[SexprModule, None, None]
+        """List of Modules present in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprModule`
+        """
+        for node in self._section('module'):
+            yield SexprModule(node, self)
+
+    @property
+    def tracks(self):
+        # type: () -> Generator[SexprTrack, None, None]
+        """List of Tracks present in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprTrack`
+        """
+        for node in self._section('segment'):
+            yield SexprTrack(node, self)
+
+    @property
+    def vias(self):
+        # type: () -> Generator[SexprVia, None, None]
+        """List of Vias present in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprVia`
+        """
+        for node in self._section('via'):
+            yield SexprVia(node, self)
+
+    def track_array(self):
+        """Snapshot of all Tracks present in the Board as structured array
+
+        The columns are defined in ``kicad.pcbnew.board.TRACK_ARRAY_DTYPE``.
+
+        :return: ``numpy.ndarray``
+        """
+        rows = []
+        append = rows.append
+        for node in self._section('segment'):
+            start = node.find('start')
+            end = node.find('end')
+            append((float(start[1]), float(start[2]), float(end[1]), float(end[2]), _float(node, 'width'),
+                    int(node.value('net', 0)), self._layer_id(node.value('layer'))))
+        return _structured_array(rows, TRACK_ARRAY_DTYPE)
+
+    def via_array(self):
+        """Snapshot of all Vias present in the Board as structured array
+
+        The columns are defined in ``kicad.pcbnew.board.VIA_ARRAY_DTYPE``.
+
+        :return: ``numpy.ndarray``
+        """
+        via_drill = self._setup_float('via_drill')
+        rows = []
+        append = rows.append
+        for node in self._section('via'):
+            at = node.find('at')
+            layer_ids = [self._layer_id(name) for name in node.find('layers').atoms()]
+            append((float(at[1]), float(at[2]), _float(node, 'size'), _float(node, 'drill', via_drill),
+                    int(node.value('net', 0)), min(layer_ids), max(layer_ids)))
+        return _structured_array(rows, VIA_ARRAY_DTYPE)
+
+    @property
+    def nets(self):
+        """List of Nets defined in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprNet`
+        """
+        for code in sorted(self._nets):
+            yield self._nets[code]
+
+    @property
+    def zones(self):
+        # type: () -> Generator[SexprZone, None, None]
+        """List of Zones present in the Board
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprZone`
+        """
+        for node in self._section('zone'):
+            yield SexprZone(node, self)
+
+    @property
+    def drawings(self):
+        """List of Drawings present in the Board, grouped by their kind
+
+        Lines, arcs, circles, polygons, curves and texts are supported, dimensions and targets are skipped.
+
+        :return: Iterator over :class:`kicad.pcbnew.sexprboard.SexprDrawsegment` and
+                 :class:`kicad.pcbnew.sexprboard.SexprText`
+        """
+        for name in _DRAWING_SECTIONS:
+            for node in self._section(name):
+                yield _DRAWING_CLASSES[name](node, self)
+
+    def _supported_drawings(self):
+        return list(self.drawings), 0  # every drawing which is parsed has a wrapper class
+
+    @property
+    def layers_enabled(self):
+        """All layers defined in the board file
+
+        :return: ``kicad.pcbnew.LayerSet``
+        """
+        return LayerSet.from_layers(self._layers_enabled)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.SexprBoard(\"{}\")".format(self._filepath)
+
+    def __str__(self):
+        return "kicad.pcbnew.Board(\"{}\")".format(self._filepath)
+
+
+def _scan_sections_exact(buf):
+    # type: (mmap.mmap) -> List[Tuple[str, int, int]]
+    """Find all top level expressions by following the nesting of the whole file"""
+    sections = []
+    depth = 0
+    start = None
+    for match in _STRUCTURE_RE.finditer(buf):
+        token = match.group()
+        if token == b'(':
+            depth += 1
+            if depth == 2:
+                start = match.start()
+        elif token == b')':
+            if depth == 2:
+                name = re.match(br'\(\s*([^\s()"]+)', buf[start:start + 64]).group(1).decode('ascii')
+                sections.append((name, start, match.end()))
+            depth -= 1
+    if depth != 0:
+        raise ValueError("unbalanced parentheses")
+    return sections
+
+
+def _scan_sections(buf):
+    # type: (mmap.mmap) -> List[Tuple[str, int, int]]
+    """Find the byte range of every top level expression after the root atoms
+
+    Files written by KiCad are scanned using their indentation, without looking at the content of the expressions.
+    All other files are scanned by following their nesting, which is exact but slower.
+    """
+    starts = [(m.group(1).decode('ascii'), m.start() + 3) for m in _SECTION_START_RE.finditer(buf)]
+    root_end = buf.rfind(b')')
+
+    sections = []
+    for idx, (name, start) in enumerate(starts):
+        end = starts[idx + 1][1] - 3 if idx + 1 < len(starts) else root_end
+        while end > start and buf[end - 1:end] in b' \t\r\n':
+            end -= 1
+        if buf[end - 1:end] != b')':
+            return _scan_sections_exact(buf)  # not formatted like KiCad does
+        sections.append((name, start, end))
+    if not sections or buf[sections[-1][2]:root_end].strip():
+        return _scan_sections_exact(buf)
+    return sections
+
+
+class LazySexprBoard(SexprBoard):
+    """Read-only Board parsed on demand from a memory mapped ".kicad_pcb" file
+
+    Opening the board only scans the file for the byte ranges of its top level expressions, and parses the
+    expressions which describe the board itself (layers, setup and nets). Modules, tracks, vias, zones and drawings are
+    parsed when they are accessed first, every kind on its own. This keeps the memory footprint small when only some
+    kinds of items are of interest, like the modules of a board with big zone fills.
+
+    Otherwise the board behaves like :class:`kicad.pcbnew.sexprboard.SexprBoard`.
+
+    :param path: path to the ".kicad_pcb" file
+    :type path: ``str``, ``unicode``
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board
+    >>> b = Board.from_file("path/to/board.kicad_pcb", backend='lazy')# doctest: +SKIP
+    >>> references = [m.reference for m in b.modules]# doctest: +SKIP
+    """
+
+    def _load(self):
+        # type: () -> None
+        """Map the file, and only parse the expressions which describe the board itself"""
+        self._originals = {}  # type: Dict[str, List[SexprList]]
+        with io.open(self._filepath, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)  # raises ValueError for empty files
+
+        self._sections = {}  # type: Dict[str, List[Tuple[int, int]]]
+        sections = _scan_sections(self._mmap)
+        for name, start, end in sections:
+            self._sections.setdefault(name, []).append((start, end))
+
+        header_end = sections[0][1] if sections else self._mmap.rfind(b')')
+        self._obj = self._parse(0, header_end, b')')
+        if self._obj.name != 'kicad_pcb':
+            raise IOError("\"{}\" is not a kicad_pcb file".format(self._filepath))
+
+        for name in _HEADER_SECTIONS:
+            for node in self._section(name):
+                self._add_header_node(node)
+
+    def _parse(self, start, end, suffix=b''):
+        # type: (int, int, bytes) -> SexprList
+        return parse(io.StringIO((self._mmap[start:end] + suffix).decode('utf-8')))
+
+    def _section(self, name):
+        # type: (str) -> List[SexprList]
+        """Parsed expressions of a section, which is only parsed on first access"""
+        nodes = self._parsed.get(name)
+        if nodes is None:
+            try:
+                nodes = [self._parse(start, end) for start, end in self._sections.get(name, [])]
+            except (ValueError, UnicodeDecodeError) as e:
+                raise IOError("\"{}\" could not be parsed: {}".format(self._filepath, e))
+            self._parsed[name] = nodes
+            self._originals[name] = [_copy(node) for node in nodes]
+        return nodes
+
+    def _modified(self):
+        # type: () -> List[Tuple[int, int, SexprList, int]]
+        """Smallest byte ranges of all parsed expressions which were modified, ready to be passed to splice()"""
+        modified = []
+        for name, nodes in self._parsed.items():
+            for (start, end), node, original in zip(self._sections[name], nodes, self._originals[name]):
+                if node != original:
+                    modified.extend(changed_ranges(self._mmap, start, end, node, original))
+        return sorted(modified, key=lambda m: m[0])
+
+    def _all_sections(self):
+        """All top level expressions in the order of the file, parsing only one at a time if not parsed yet"""
+        ranges = sorted((start, end, name, idx) for name, section in self._sections.items()
+                        for idx, (start, end) in enumerate(section))
+        for start, end, name, idx in ranges:
+            nodes = self._parsed.get(name)
+            yield nodes[idx] if nodes is not None else self._parse(start, end)
+
+    def to_file(self, path, incremental=True):
+        # type: (str, bool) -> None
+        """Save the board to a given filepath
+
+        Items can be modified through their expression (see :func:`get_native`) or the setters supported by the
+        sexpr backend, like the size of pads. In incremental mode, only the smallest expressions which were modified
+        are written again, like the size of a single pad, and everything else is copied unchanged from the original
+        file. This keeps the formatting of the file, and results in small diffs. Otherwise the whole file is written
+        in the layout of KiCad 5 (see :func:`kicad.util.sexpr.write`), one expression at a time.
+
+        When the board is saved over its own file, it is opened again afterwards, and all items which were accessed
+        before are not part of the board anymore.
+
+        :param path: path for the ".kicad_pcb" file
+        :type path: ``str``, ``unicode``
+        :param incremental: only write modified expressions again
+        :type incremental: ``bool``
+        """
+        if incremental:
+            with atomic_write(path) as f:
+                splice(self._mmap, f, self._modified())
+        else:
+            with atomic_write(path, 'w', encoding='utf-8') as f:
+                write_root(self._obj, self._all_sections(), f)
+
+        if os.path.abspath(path) == os.path.abspath(self._filepath):
+            self._mmap.close()
+            self.__init__(self._filepath)
+
+    @property
+    def section_offsets(self):
+        # type: () -> Dict[str, List[Tuple[int, int]]]
+        """Byte ranges ``(start, end)`` of all top level expressions of the file, keyed by their name
+
+        :return: ``dict``
+        """
+        return {name: list(ranges) for name, ranges in self._sections.items()}
+
+    @staticmethod
+    def from_file(path):
+        # type: (str) -> LazySexprBoard
+        """Load a board from a given filepath
+
+        :param path: path to the ".kicad_pcb" file
+        :type path: ``str``, ``unicode``
+
+        :return: :class:`kicad.pcbnew.sexprboard.LazySexprBoard`
+        """
+        return LazySexprBoard(path)
+
+    def __repr__(self):
+        return "kicad.pcbnew.sexprboard.LazySexprBoard(\"{}\")".format(self._filepath)
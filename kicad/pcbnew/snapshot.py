@@ -0,0 +1,313 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import mmap
+import struct
+
+from typing import Dict, List  # noqa: F401
+
+from kicad.pcbnew.board import TRACK_ARRAY_DTYPE, VIA_ARRAY_DTYPE
+from kicad.util.files import atomic_write, numpy, _NUMPY_AVAILABLE
+
+
+# columns of BoardSnapshot.module_array(), coordinates are in mm, strings are indices into the string table
+MODULE_ARRAY_DTYPE = [('x', 'f8'), ('y', 'f8'), ('reference', 'i4'), ('value', 'i4'), ('layer_id', 'i4'),
+                      ('first_pad', 'i4'), ('pad_count', 'i4')]
+
+# columns of BoardSnapshot.pad_array(), coordinates and sizes are in mm, strings are indices into the string table
+PAD_ARRAY_DTYPE = [('x', 'f8'), ('y', 'f8'), ('size_x', 'f8'), ('size_y', 'f8'), ('drill_x', 'f8'),
+                   ('drill_y', 'f8'), ('layer_mask', 'u8'), ('name', 'i4'), ('net_code', 'i4'), ('module', 'i4')]
+
+# columns of BoardSnapshot.net_array(), strings are indices into the string table
+NET_ARRAY_DTYPE = [('code', 'i4'), ('name', 'i4')]
+
+_MAGIC = b'KIPCBSNP'
+_VERSION = 1
+_HEADER = struct.Struct('<8sII')  # magic, version, number of sections
+_SECTION = struct.Struct('<16sQQI4x')  # name, offset, number of rows, size of a row
+_ALIGNMENT = 8
+
+
+def _little_endian(dtype):
+    """Same columns, but with an explicit byte order to have the file independent of the machine"""
+    return numpy.dtype([(name, '<' + type) for name, type in dtype])
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.strings = []  # type: List[str]
+        self._lookup = {}  # type: Dict[str, int]
+
+    def add(self, string):
+        # type: (str) -> int
+        idx = self._lookup.get(string)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(string)
+            self._lookup[string] = idx
+        return idx
+
+
+def _board_sections(board):
+    """Collect all sections of a snapshot as ``(name, data, dtype)`` tuples"""
+    strings = _StringTable()
+
+    modules = []
+    pads = []
+    for module_idx, module in enumerate(board.modules):
+        first_pad = len(pads)
+        for pad in module.pads:
+            position = pad.position
+            size = pad.size
+            drill = pad.drill_size
+            pads.append((position.x, position.y, size.x, size.y, drill.x, drill.y, pad.layers.mask,
+                         strings.add(pad.name), pad.net.code, module_idx))
+        position = module.position
+        modules.append((position.x, position.y, strings.add(module.reference), strings.add(module.value),
+                        module.layer.id, first_pad, len(pads) - first_pad))
+
+    nets = [(net.code, strings.add(net.name)) for net in board.nets]
+
+    encoded = [s.encode('utf-8') for s in strings.strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    return [
+        ('tracks', board.track_array().astype(_little_endian(TRACK_ARRAY_DTYPE)).tobytes(), TRACK_ARRAY_DTYPE),
+        ('vias', board.via_array().astype(_little_endian(VIA_ARRAY_DTYPE)).tobytes(), VIA_ARRAY_DTYPE),
+        ('modules', numpy.array(modules, dtype=_little_endian(MODULE_ARRAY_DTYPE)).tobytes(), MODULE_ARRAY_DTYPE),
+        ('pads', numpy.array(pads, dtype=_little_endian(PAD_ARRAY_DTYPE)).tobytes(), PAD_ARRAY_DTYPE),
+        ('nets', numpy.array(nets, dtype=_little_endian(NET_ARRAY_DTYPE)).tobytes(), NET_ARRAY_DTYPE),
+        ('string_offsets', numpy.array(offsets, dtype='<u8').tobytes(), [('offset', 'u8')]),
+        ('string_data', b''.join(encoded), [('byte', 'u1')]),
+    ]
+
+
+class BoardSnapshot(object):
+    """Read-only binary image of the items of a board
+
+    A snapshot stores tracks, vias, modules, pads and nets as fixed size records, and all names in a shared string
+    table. Opening a snapshot only maps the file into memory, all arrays are views into the mapped file without
+    copying or parsing anything. This makes it suitable to analyze the same boards many times.
+
+    The file format is versioned, and independent of the machine which created it. Snapshots do not track changes
+    of the board, they have to be written again after the board was modified.
+
+    Use :func:`kicad.pcbnew.Board.snapshot` or :func:`write` to create a snapshot.
+
+    :param path: path of the snapshot file
+    :type path: ``str``
+
+    :Example:
+
+    >>> from kicad.pcbnew import Board
+    >>> from kicad.pcbnew.snapshot import BoardSnapshot
+    >>> Board.from_file("path/to/board.kicad_pcb", backend='sexpr').snapshot("board.snap")# doctest: +SKIP
+    >>> with BoardSnapshot.open("board.snap") as snapshot:# doctest: +SKIP
+    ...     print(snapshot.track_array()['width'].sum())
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        if not _NUMPY_AVAILABLE:
+            raise ImportError("numpy is required to read board snapshots")
+
+        self._path = path
+        self._sections = {}  # type: Dict[str, tuple]
+        self._net_names = None  # type: Dict[int, str]
+
+        with io.open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header()
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_header(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("\"{}\" is not a board snapshot".format(self._path))
+        magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError("\"{}\" is not a board snapshot".format(self._path))
+        if version != _VERSION:
+            raise ValueError("board snapshot version {} is not supported (expected {})".format(version, _VERSION))
+
+        for i in range(count):
+            name, offset, rows, row_size = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            if offset + rows * row_size > len(self._mmap):
+                raise ValueError("board snapshot \"{}\" is truncated".format(self._path))
+            self._sections[name.rstrip(b'\0').decode('ascii')] = (offset, rows, row_size)
+
+    @staticmethod
+    def open(path):
+        # type: (str) -> BoardSnapshot
+        """Open a snapshot file
+
+        :param path: path of the snapshot file
+        :type path: ``str``
+
+        :return: :class:`kicad.pcbnew.snapshot.BoardSnapshot`
+
+        :raises ValueError: when the file is not a snapshot, or was written by an incompatible version
+        """
+        return BoardSnapshot(path)
+
+    @staticmethod
+    def write(board, path):
+        # type: (Board, str) -> None
+        """Write a snapshot of a board
+
+        The file is replaced atomically, which means snapshots which are opened right now stay valid.
+
+        :param board: board to take the snapshot of
+        :type board: :class:`kicad.pcbnew.Board`
+        :param path: path of the snapshot file
+        :type path: ``str``
+        """
+        if not _NUMPY_AVAILABLE:
+            raise ImportError("numpy is required to write board snapshots")
+
+        sections = _board_sections(board)
+
+        header = [_HEADER.pack(_MAGIC, _VERSION, len(sections))]
+        offset = _HEADER.size + len(sections) * _SECTION.size
+        body = []
+        for name, data, dtype in sections:
+            padding = -offset % _ALIGNMENT
+            body.append(b'\0' * padding)
+            offset += padding
+
+            row_size = numpy.dtype(dtype).itemsize
+            header.append(_SECTION.pack(name.encode('ascii'), offset, len(data) // row_size, row_size))
+            body.append(data)
+            offset += len(data)
+
+        with atomic_write(path) as f:
+            f.write(b''.join(header))
+            for data in body:
+                f.write(data)
+
+    def _array(self, name, dtype):
+        offset, rows, row_size = self._sections[name]
+        dtype = _little_endian(dtype)
+        if dtype.itemsize != row_size:
+            raise ValueError("section \"{}\" of board snapshot \"{}\" has an unexpected layout".format(
+                name, self._path))
+        return numpy.frombuffer(self._mmap, dtype=dtype, count=rows, offset=offset)
+
+    @property
+    def path(self):
+        # type: () -> str
+        """Path of the snapshot file
+
+        :return: ``str``
+        """
+        return self._path
+
+    def track_array(self):
+        """All Tracks of the Board, with the columns of ``kicad.pcbnew.board.TRACK_ARRAY_DTYPE``
+
+        :return: read-only ``numpy.ndarray``
+        """
+        return self._array('tracks', TRACK_ARRAY_DTYPE)
+
+    def via_array(self):
+        """All Vias of the Board, with the columns of ``kicad.pcbnew.board.VIA_ARRAY_DTYPE``
+
+        :return: read-only ``numpy.ndarray``
+        """
+        return self._array('vias', VIA_ARRAY_DTYPE)
+
+    def module_array(self):
+        """All Modules of the Board, with the columns of ``MODULE_ARRAY_DTYPE``
+
+        The pads of a module are the rows ``first_pad`` to ``first_pad + pad_count`` of :func:`pad_array`.
+
+        :return: read-only ``numpy.ndarray``
+        """
+        return self._array('modules', MODULE_ARRAY_DTYPE)
+
+    def pad_array(self):
+        """All Pads of all Modules, with the columns of ``PAD_ARRAY_DTYPE``
+
+        :return: read-only ``numpy.ndarray``
+        """
+        return self._array('pads', PAD_ARRAY_DTYPE)
+
+    def net_array(self):
+        """All Nets of the Board, with the columns of ``NET_ARRAY_DTYPE``
+
+        :return: read-only ``numpy.ndarray``
+        """
+        return self._array('nets', NET_ARRAY_DTYPE)
+
+    def string(self, idx):
+        # type: (int) -> str
+        """Get a string of the string table, like the reference of a module
+
+        :param idx: index stored in a string column
+        :type idx: ``int``
+
+        :return: ``unicode``
+        """
+        offsets = self._array('string_offsets', [('offset', 'u8')])['offset']
+        data_offset = self._sections['string_data'][0]
+        start = data_offset + int(offsets[idx])
+        end = data_offset + int(offsets[idx + 1])
+        return self._mmap[start:end].decode('utf-8')
+
+    @property
+    def references(self):
+        # type: () -> List[str]
+        """References of all Modules, in the order of :func:`module_array`
+
+        :return: ``list`` of ``unicode``
+        """
+        return [self.string(idx) for idx in self.module_array()['reference']]
+
+    @property
+    def net_names(self):
+        # type: () -> Dict[int, str]
+        """Name of every Net, keyed by the net code
+
+        :return: ``dict``
+        """
+        if self._net_names is None:
+            self._net_names = {int(code): self.string(name) for code, name in self.net_array()}
+        return self._net_names
+
+    def close(self):
+        # type: () -> None
+        """Unmap the file
+
+        When arrays returned before are still in use, the file stays mapped until they are released.
+        """
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # still exported to an array, which keeps the mapping alive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return "kicad.pcbnew.snapshot.BoardSnapshot(\"{}\")".format(self._path)
@@ -16,6 +16,8 @@
 from kicad.pcbnew.boarditem import BoardItem
 from kicad.pcbnew.net import Net
 
+from kicad.util.point import Point2D
+
 from kicad._native import _pcbnew
 
 
@@ -43,6 +45,15 @@ class Zone(BoardItem):
     def priority(self, priority):
         self._obj.SetPriority(priority)
 
+    @property
+    def outline(self):
+        """Corners of the outline of the Zone, followed by the corners of its holes
+
+        :return: ``list`` of :class:`kicad.util.Point2D`
+        """
+        outline = self._obj.Outline()
+        return [Point2D.from_wxPoint(outline.CVertex(i)) for i in range(outline.TotalVertices())]
+
     @property
     def net(self):
         """Net of the Zone
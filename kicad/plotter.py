@@ -13,14 +13,168 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
 import sys
+import time
+import traceback
 
 from kicad.pcbnew.board import Board
 from kicad.pcbnew.layer import Layer
 
+from kicad.util.files import TMP_SUFFIX, atomic_write, makedirs
+
 from kicad._native import _pcbnew
 
 
+# options of PCB_PLOT_PARAMS which have an influence on the plotted files
+_PLOT_OPTIONS = ('GetPlotFrameRef', 'GetUseGerberProtelExtensions', 'GetUseGerberAttributes',
+                 'GetIncludeGerberNetlistInfo', 'GetCreateGerberJobFile', 'GetSubtractMaskFromSilk',
+                 'GetGerberPrecision', 'GetLineWidth', 'GetScale', 'GetFineScaleAdjustX', 'GetFineScaleAdjustY',
+                 'GetWidthAdjust', 'GetAutoScale', 'GetMirror', 'GetNegative', 'GetPlotViaOnMaskLayer',
+                 'GetExcludeEdgeLayer', 'GetDrillMarksType', 'GetUseAuxOrigin', 'GetPlotValue', 'GetPlotReference',
+                 'GetPlotInvisibleText', 'GetPlotPadsOnSilkLayer', 'GetSketchPadsOnFabLayers', 'GetTextMode',
+                 'GetPlotMode', 'GetHPGLPenNum', 'GetHPGLPenSpeed', 'GetHPGLPenDiameter', 'GetDXFPlotPolygonMode',
+                 'GetDXFPlotUnits', 'GetSvgPrecision', 'GetSvgUseInch')
+
+
+def _check_drill_support():
+    # type: () -> None
+    """Fail before anything is plotted when the drill file writer is missing, like in old versions of KiCad"""
+    if not hasattr(_pcbnew, 'EXCELLON_WRITER'):
+        raise RuntimeError("drill files are not supported by this version of KiCad")
+
+
+def _file_hash(path):
+    # type: (str) -> str
+    digest = hashlib.sha1()
+    with io.open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PlotCache(object):
+    """Directory of previously plotted files, to skip plotting boards which did not change
+
+    Entries are keyed by the content of the board file, the layer, the format and the plot options. Changes of a
+    board which were not saved to its file are not seen by the cache. When the directory grows larger than
+    max_size, the least recently used entries are removed.
+
+    :param path: directory of the cache, created when it does not exist
+    :type path: ``str``
+    :param max_size: maximum size of all files in the cache in bytes, ``None`` for no limit
+    :type max_size: ``int``
+
+    :Example:
+
+    >>> from kicad.plotter import PlotCache, Plotter
+    >>> cache = PlotCache("path/to/cache", max_size=1024 ** 3)# doctest: +SKIP
+    >>> Plotter(board, cache=cache).plot_layers(layers, Plotter.PLOT_FORMAT_GERBER, 'gerber')# doctest: +SKIP
+    """
+
+    def __init__(self, path, max_size=None):
+        self._path = os.path.abspath(path)
+        self._max_size = max_size
+        self._board_hashes = {}  # type: dict
+        makedirs(self._path)
+
+    @property
+    def path(self):
+        """directory of the cache
+
+        :return: ``str``
+        """
+        return self._path
+
+    def board_hash(self, path):
+        # type: (str) -> str
+        """Hash of the content of a board file, only calculated again when the file was modified
+
+        :return: ``str``
+        """
+        stat = os.stat(path)
+        cached = self._board_hashes.get(path)
+        if cached is None or cached[0] != (stat.st_mtime, stat.st_size):
+            cached = (stat.st_mtime, stat.st_size), _file_hash(path)
+            self._board_hashes[path] = cached
+        return cached[1]
+
+    def key(self, board_hash, layer, format, options):
+        # type: (str, Layer, int, tuple) -> str
+        """Key of a plotted file
+
+        :param board_hash: hash returned by :func:`board_hash`
+        :param layer: plotted layer
+        :param format: format of the file
+        :param options: values of all plot options
+
+        :return: ``str``
+        """
+        return hashlib.sha1(repr((board_hash, layer.id, format, options)).encode('utf-8')).hexdigest()
+
+    def get(self, key, destination):
+        # type: (str, str) -> bool
+        """Copy the file stored for a key to destination
+
+        :return: ``True`` if the file was found in the cache
+        """
+        source = os.path.join(self._path, key)
+        try:
+            shutil.copyfile(source, destination)
+            os.utime(source, None)  # mark as recently used
+            return True
+        except (IOError, OSError):
+            return False
+
+    def put(self, key, source):
+        # type: (str, str) -> None
+        """Store a copy of a plotted file
+
+        :param key: key returned by :func:`key`
+        :param source: path of the plotted file
+        """
+        with atomic_write(os.path.join(self._path, key)) as f, io.open(source, 'rb') as src:
+            shutil.copyfileobj(src, f)
+        self._evict()
+
+    def _evict(self):
+        # type: () -> None
+        """Remove the least recently used entries until the cache is smaller than max_size"""
+        if self._max_size is None:
+            return
+
+        entries = []
+        for name in os.listdir(self._path):
+            if name.endswith(TMP_SUFFIX):
+                continue  # file is written right now
+            try:
+                stat = os.stat(os.path.join(self._path, name))
+            except OSError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        size = sum(e[1] for e in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self._max_size:
+                break
+            try:
+                os.remove(os.path.join(self._path, name))
+            except OSError:
+                pass
+            size -= entry_size
+
+    def __getstate__(self):
+        return self._path, self._max_size
+
+    def __setstate__(self, state):
+        self._path, self._max_size = state
+        self._board_hashes = {}
+
+
 # https://stackoverflow.com/questions/43645628/how-to-plot-colored-output-from-pcbnew-via-python-scripting
 # https://scottbezek.blogspot.co.at/2016/04/scripting-kicad-pcbnew-exports.html
 
@@ -32,10 +186,12 @@ class Plotter(object):
     PLOT_FORMAT_PDF = _pcbnew.PLOT_FORMAT_PDF
     PLOT_FORMAT_SVG = _pcbnew.PLOT_FORMAT_SVG
 
-    def __init__(self, board, layer=None, color_mode=None):
+    def __init__(self, board, layer=None, color_mode=None, cache=None):
         assert type(board) is Board
+        assert cache is None or isinstance(cache, PlotCache)
 
         self._board = board
+        self._cache = cache
         self._pctl = _pcbnew.PLOT_CONTROLLER(self._board.get_native())
         self._popt = self._pctl.GetPlotOptions()
 
@@ -130,6 +286,112 @@ class Plotter(object):
         """plot layer to opened file"""
         self._pctl.PlotLayer()
 
+    def _plot_options(self):
+        # type: () -> tuple
+        """Values of all plot options which have an influence on the output"""
+        values = [self._pctl.GetColorMode()]
+        for name in _PLOT_OPTIONS:
+            getter = getattr(self._popt, name, None)
+            values.append(None if getter is None else getter())
+        return tuple(values)
+
+    def _default_naming(self, layer):
+        # type: (Layer) -> str
+        """File suffix used by KiCad itself, like "F_Cu" """
+        return (self._board.layer_name(layer) or layer.name).replace('.', '_')
+
+    def plot_layers(self, layers, format, output_dir, naming=None, drill=False):
+        """Plot multiple layers into one file per layer
+
+        The plot controller and its options are set up once and reused for all layers. When the Plotter was created
+        with a :class:`kicad.plotter.PlotCache`, files which were already plotted with the same board file, layer,
+        format and options are copied from the cache instead.
+
+        :param layers: layers to plot
+        :type layers: iterable of :class:`kicad.pcbnew.Layer`
+        :param format: format of the output files
+        :param output_dir: directory to write the files into
+        :type output_dir: ``str``
+        :param naming: function returning the file suffix of a layer, by default the layer name like ``F_Cu``
+        :param drill: also write excellon drill files
+        :type drill: ``bool``
+
+        :return: ``list`` of the written files
+
+        :raises RuntimeError: when drill files are requested, but not supported by this version of KiCad
+
+        :Example:
+
+        >>> from kicad.pcbnew import Board, Layer
+        >>> from kicad.plotter import Plotter
+        >>> b = Board.from_file("path/to/board.kicad_pcb")# doctest: +SKIP
+        >>> p = Plotter(b)# doctest: +SKIP
+        >>> layers = [Layer.from_name(n) for n in ['F.Cu', 'B.Cu', 'F.Mask', 'B.Mask', 'Edge.Cuts']]# doctest: +SKIP
+        >>> p.plot_layers(layers, Plotter.PLOT_FORMAT_GERBER, 'gerber', drill=True)# doctest: +SKIP
+        """
+        if drill:
+            _check_drill_support()
+        if naming is None:
+            naming = self._default_naming
+
+        output_dir = os.path.abspath(output_dir)  # relative paths would be resolved relative to the board
+        self._popt.SetOutputDirectory(output_dir)
+
+        board_hash = options = None
+        if self._cache is not None:
+            board_hash = self._cache.board_hash(self._board.filepath)
+            options = self._plot_options()
+
+        files = []
+        for layer in layers:
+            assert isinstance(layer, Layer)
+            self._pctl.SetLayer(layer.id)
+            self._pctl.OpenPlotfile(naming(layer), format, layer.name)
+            filename = self._pctl.GetPlotFileName()
+            files.append(filename)
+
+            key = None if self._cache is None else self._cache.key(board_hash, layer, format, options)
+            if key is not None:
+                self._pctl.ClosePlot()  # opening the file is cheap, it is overwritten by the cached one
+                if self._cache.get(key, filename):
+                    continue
+                self._pctl.OpenPlotfile(naming(layer), format, layer.name)
+
+            self._pctl.PlotLayer()
+            self._pctl.ClosePlot()
+            if key is not None:
+                self._cache.put(key, filename)
+
+        if drill:
+            files.extend(self.plot_drill(output_dir))
+
+        return files
+
+    def plot_drill(self, output_dir, merge_npth=False):
+        """Write excellon drill files
+
+        :param output_dir: directory to write the files into
+        :type output_dir: ``str``
+        :param merge_npth: write plated and non plated holes into one file
+        :type merge_npth: ``bool``
+
+        :return: ``list`` of the written files
+
+        :raises RuntimeError: when drill files are not supported by this version of KiCad
+        """
+        _check_drill_support()
+
+        makedirs(output_dir)
+
+        writer = _pcbnew.EXCELLON_WRITER(self._board.get_native())
+        writer.SetOptions(False, False, self._board.get_native().GetAuxOrigin(), merge_npth)
+        writer.SetFormat(True)  # metric
+        writer.CreateDrillandMapFilesSet(output_dir, True, False)
+
+        name = os.path.splitext(os.path.basename(self._board.filepath))[0]
+        candidates = [name + '.drl'] if merge_npth else [name + '-PTH.drl', name + '-NPTH.drl']
+        return [os.path.join(output_dir, c) for c in candidates if os.path.exists(os.path.join(output_dir, c))]
+
     def __enter__(self):
         # TODO: this only works with the open statement
         if not self.is_open:
@@ -144,3 +406,130 @@ class Plotter(object):
 
     def __str__(self):
         return "kicad.plotter.Plotter(layer=\"{}\")".format(self.layer.name)
+
+
+class PlotResult(object):
+    """Outcome of plotting a single board with :func:`plot_boards`
+
+    :param path: path of the board
+    :param files: written files
+    :param duration: time required to load and plot the board in seconds
+    :param error: formatted exception if plotting failed
+    """
+
+    def __init__(self, path, files, duration, error=None):
+        self._path = path
+        self._files = files
+        self._duration = duration
+        self._error = error
+
+    @property
+    def path(self):
+        """path of the board
+
+        :return: ``str``
+        """
+        return self._path
+
+    @property
+    def files(self):
+        """all written files
+
+        :return: ``list`` of ``str``
+        """
+        return self._files
+
+    @property
+    def duration(self):
+        """time required to load and plot the board in seconds
+
+        :return: ``float``
+        """
+        return self._duration
+
+    @property
+    def error(self):
+        """formatted exception if plotting failed
+
+        :return: ``str`` or ``None``
+        """
+        return self._error
+
+    @property
+    def ok(self):
+        """was the board plotted successfully?
+
+        :return: ``bool``
+        """
+        return self._error is None
+
+    def __repr__(self):
+        return "kicad.plotter.PlotResult(path=\"{}\", files={}, duration={:.3f}, ok={})".format(
+            self._path, len(self._files), self._duration, self.ok)
+
+
+def _board_output_dir(output_dir, path):
+    # type: (str, str) -> str
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def _plot_board(task):
+    # type: (tuple) -> PlotResult
+    """Load a single board and plot all layers of it, executed by the worker processes"""
+    path, layers, format, output_dir, naming, drill, cache = task
+    start = time.time()
+    try:
+        plotter = Plotter(Board.from_file(path), cache=cache)
+        files = plotter.plot_layers(layers, format, _board_output_dir(output_dir, path), naming=naming, drill=drill)
+        return PlotResult(path, files, time.time() - start)
+    except Exception:
+        return PlotResult(path, [], time.time() - start, traceback.format_exc())
+
+
+def plot_boards(paths, layers, format, output_dir, processes=None, naming=None, drill=False, cache=None):
+    """Plot many boards in parallel using a pool of worker processes
+
+    The plotter of KiCad is neither thread-safe nor able to use multiple cores, which is why every board is loaded
+    and plotted by a separate process. The files of each board are written into a subdirectory of output_dir named
+    like the board. Results are returned as soon as a board is finished, which is not the order of paths.
+
+    :param paths: paths of the ".kicad_pcb" files
+    :type paths: iterable of ``str``
+    :param layers: layers to plot for every board
+    :type layers: ``list`` of :class:`kicad.pcbnew.Layer`
+    :param format: format of the output files
+    :param output_dir: directory to write the files into
+    :type output_dir: ``str``
+    :param processes: number of worker processes, by default the number of cores
+    :type processes: ``int``
+    :param naming: function returning the file suffix of a layer, has to be picklable (defined at module level)
+    :param drill: also write excellon drill files
+    :type drill: ``bool``
+    :param cache: cache of plotted files shared by all workers
+    :type cache: :class:`kicad.plotter.PlotCache`
+
+    :return: Iterator over :class:`kicad.plotter.PlotResult`
+
+    :raises RuntimeError: when drill files are requested, but not supported by this version of KiCad
+
+    :Example:
+
+    >>> from kicad.pcbnew import Layer
+    >>> from kicad.plotter import Plotter, plot_boards
+    >>> layers = [Layer.from_name('F.Cu'), Layer.from_name('B.Cu')]
+    >>> for result in plot_boards(["a.kicad_pcb", "b.kicad_pcb"], layers, Plotter.PLOT_FORMAT_GERBER, 'out'):
+    ...     print(result.path, result.duration, result.error)# doctest: +SKIP
+    """
+    if drill:
+        _check_drill_support()  # instead of failing every board in the workers
+    layers = list(layers)
+    output_dir = os.path.abspath(output_dir)
+    tasks = [(os.path.abspath(path), layers, format, output_dir, naming, drill, cache) for path in paths]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(_plot_board, tasks):
+            yield result
+    finally:
+        pool.terminate()  # all tasks are finished, or the caller is not interested in the remaining results
+        pool.join()
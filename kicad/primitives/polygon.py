@@ -13,33 +13,133 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import multiprocessing
+import struct
+import sys
+from array import array
+
+from kicad.util.point import Point2D, PointArray
+
 from kicad._native import _pcbnew
 
 
+def _chain_nm(chain):
+    # type: (_pcbnew.SHAPE_LINE_CHAIN) -> array
+    """Copy all vertices of a native line chain into an interleaved buffer in nm"""
+    coords = array('i')
+    extend = coords.extend
+    point = chain.CPoint
+    for i in range(chain.PointCount()):
+        p = point(i)
+        extend((p.x, p.y))
+    return coords
+
+
+def _coords_to_bytes(coords):
+    # type: (array) -> bytes
+    """Convert a coordinate buffer to little-endian 32 bit integers"""
+    if sys.byteorder != 'little':
+        coords = array('i', coords)
+        coords.byteswap()
+    return coords.tobytes() if sys.version_info >= (3,) else coords.tostring()
+
+
+def _coords_from_bytes(data):
+    # type: (bytes) -> array
+    """Convert little-endian 32 bit integers to a coordinate buffer"""
+    coords = array('i')
+    if sys.version_info >= (3,):
+        coords.frombytes(data)
+    else:
+        coords.fromstring(data)
+    if sys.byteorder != 'little':
+        coords.byteswap()
+    return coords
+
+
+def _chain_points(chain):
+    # type: (_pcbnew.SHAPE_LINE_CHAIN) -> PointArray
+    """Copy all vertices of a native line chain into a PointArray"""
+    return PointArray.from_nm(_chain_nm(chain))
+
+
+def _box(poly_set):
+    # type: (_pcbnew.SHAPE_POLY_SET) -> tuple
+    """Bounding box of a native polygon set as (min_x, min_y, max_x, max_y) in nm"""
+    box = poly_set.BBox()
+    box.Normalize()
+    origin = box.GetOrigin()
+    end = box.GetEnd()
+    return origin.x, origin.y, end.x, end.y
+
+
+def _merge(a, b):
+    # type: (PolygonSet, PolygonSet) -> PolygonSet
+    """Add b to a, without running a boolean operation when both do not overlap"""
+    box_a = _box(a._obj)
+    box_b = _box(b._obj)
+    if box_a[0] > box_b[2] or box_b[0] > box_a[2] or box_a[1] > box_b[3] or box_b[1] > box_a[3]:
+        a._obj.Append(b._obj)
+    else:
+        a._obj.BooleanAdd(b._obj, _pcbnew.SHAPE_POLY_SET.PM_FAST)
+    return a
+
+
+def _union_tree(polysets):
+    # type: (list) -> PolygonSet
+    """Union all PolygonSet by merging pairs of similar size, the given objects are not modified"""
+    polysets = [p for p in polysets if p._obj.OutlineCount()]
+    if not polysets:
+        return PolygonSet()
+
+    # neighbours are merged first, which keeps the intermediate results small and often disjoint
+    polysets.sort(key=lambda p: _box(p._obj)[0])
+    level = [_merge(polysets[i].copy(), polysets[i + 1]) for i in range(0, len(polysets) - 1, 2)]
+    if len(polysets) % 2:
+        level.append(polysets[-1].copy())
+
+    while len(level) > 1:
+        merged = [_merge(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+    return level[0]
+
+
 class Polygon(object):
-    def __init__(self):
-        self._outline = []
-        self._holes = []
+    """Polygon consisting of an outline and optional holes
+
+    :param outline: vertices of the outline
+    :type outline: :class:`kicad.util.PointArray`
+    :param holes: vertices of every hole
+    :type holes: ``list`` of :class:`kicad.util.PointArray`
+    """
+
+    def __init__(self, outline=None, holes=None):
+        self._outline = PointArray() if outline is None else outline
+        self._holes = [] if holes is None else holes
 
     @property
     def outline(self):
+        """Vertices of the outline
+
+        :return: :class:`kicad.util.PointArray`
+        """
         return self._outline
 
     @property
     def holes(self):
+        """Vertices of all holes
+
+        :return: ``list`` of :class:`kicad.util.PointArray`
+        """
         return self._holes
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
             return False
 
-        if not isinstance(self._obj, other._obj.__class__):
-            return False
-
-        if self._obj == other._obj:
-            return True
-
-        return False  # TODO: implement real equal check
+        return self._outline == other._outline and self._holes == other._holes
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -62,6 +162,52 @@ class PolygonSet(object):
         """
         return self._obj
 
+    def copy(self):
+        """Create an independent copy of the PolygonSet
+
+        :return: :class:`kicad.primitives.PolygonSet`
+        """
+        return PolygonSet(_pcbnew.SHAPE_POLY_SET(self._obj))
+
+    @staticmethod
+    def union_all(polysets, processes=None):
+        """Performs boolean union of many PolygonSet at once
+
+        Instead of adding one PolygonSet after another to an ever growing result, pairs of similar size are merged
+        in a balanced tree. PolygonSet which do not overlap are simply added without running a boolean operation.
+
+        :param polysets: PolygonSet to unite, they are not modified
+        :type polysets: iterable of :class:`kicad.primitives.PolygonSet`
+        :param processes: number of worker processes which merge independent subtrees, ``None`` to run in this
+                          process only
+        :type processes: ``int``
+
+        :return: :class:`kicad.primitives.PolygonSet`
+        """
+        polysets = list(polysets)
+        if not processes or processes <= 1 or len(polysets) < 2 * processes:
+            return _union_tree(polysets)
+
+        polysets.sort(key=lambda p: _box(p._obj)[0])
+        size = -(-len(polysets) // processes)
+        chunks = [polysets[i:i + size] for i in range(0, len(polysets), size)]
+        pool = multiprocessing.Pool(processes)
+        try:
+            merged = pool.map(_union_tree, chunks)
+        finally:
+            pool.close()
+            pool.join()
+        return _union_tree(merged)
+
+    @property
+    def bounding_box(self):
+        """Axis aligned bounding box of all polygons
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        min_x, min_y, max_x, max_y = _box(self._obj)
+        return Point2D.from_nm(min_x, min_y), Point2D.from_nm(max_x, max_y)
+
     def fracture(self):
         """Converts a set of polygons with holes to a singe outline with
         slits/fractures connecting the outer ring to the inner holes"""
@@ -101,28 +247,104 @@ class PolygonSet(object):
         assert isinstance(other, PolygonSet)
         self._obj.BooleanIntersection(other._obj, _pcbnew.SHAPE_POLY_SET.PM_FAST)
 
+    def outline(self, index):
+        """Get the vertices of the outline of a polygon
+
+        :param index: index of the polygon
+        :type index: ``int``
+
+        :return: :class:`kicad.util.PointArray`
+        """
+        return _chain_points(self._obj.COutline(index))
+
+    def holes(self, index):
+        """Get the vertices of all holes of a polygon
+
+        :param index: index of the polygon
+        :type index: ``int``
+
+        :return: ``list`` of :class:`kicad.util.PointArray`
+        """
+        return [_chain_points(self._obj.CHole(index, hole)) for hole in range(self._obj.HoleCount(index))]
+
+    def _to_nm(self):
+        """Get all polygons as lists of interleaved buffers in nm, the first one being the outline"""
+        polygons = []
+        for index in range(self._obj.OutlineCount()):
+            chains = [_chain_nm(self._obj.COutline(index))]
+            chains.extend(_chain_nm(self._obj.CHole(index, hole)) for hole in range(self._obj.HoleCount(index)))
+            polygons.append(chains)
+        return polygons
+
+    @staticmethod
+    def _from_nm(polygons):
+        """Create a PolygonSet from the output of :func:`_to_nm`"""
+        poly_set = PolygonSet()
+        native = poly_set._obj
+        for chains in polygons:
+            outline = native.NewOutline()
+            for n, coords in enumerate(chains):
+                hole = -1 if n == 0 else native.NewHole(outline)
+                for i in range(0, len(coords), 2):
+                    native.Append(coords[i], coords[i + 1], outline, hole)
+        return poly_set
+
+    def to_bytes(self):
+        """Serialize all polygons into a compact binary format
+
+        All counts are stored as little-endian unsigned 32 bit integers, followed by the coordinates in nm as
+        little-endian signed 32 bit integers.
+
+        :return: ``bytes``
+        """
+        parts = [struct.pack('<I', self._obj.OutlineCount())]
+        for chains in self._to_nm():
+            parts.append(struct.pack('<I', len(chains)))
+            for coords in chains:
+                parts.append(struct.pack('<I', len(coords)))
+                parts.append(_coords_to_bytes(coords))
+        return b''.join(parts)
+
+    @staticmethod
+    def from_bytes(data):
+        """Create a PolygonSet from the output of :func:`to_bytes`
+
+        :param data: serialized polygons
+        :type data: ``bytes``
+
+        :return: :class:`kicad.primitives.PolygonSet`
+        """
+        try:
+            polygon_count, = struct.unpack_from('<I', data, 0)
+            offset = 4
+            polygons = []
+            for _ in range(polygon_count):
+                chain_count, = struct.unpack_from('<I', data, offset)
+                offset += 4
+                chains = []
+                for _ in range(chain_count):
+                    coord_count, = struct.unpack_from('<I', data, offset)
+                    offset += 4
+                    end = offset + coord_count * 4
+                    if end > len(data):
+                        raise ValueError("unexpected end of data")
+                    chains.append(_coords_from_bytes(data[offset:end]))
+                    offset = end
+                polygons.append(chains)
+        except struct.error as e:
+            raise ValueError("invalid serialized PolygonSet: {}".format(e))
+        return PolygonSet._from_nm(polygons)
+
+    def __reduce__(self):
+        return PolygonSet._from_nm, (self._to_nm(),)
+
+    def __len__(self):
+        return self._obj.OutlineCount()
+
     def __iter__(self):
-        # TODO: for the moment, we need to parse the polygon from a string, needs to be improved!!
-        # Reason: it seems we cannot access the polygons using std::vector using python
-        lines = iter(self._obj.Format().split('\n'))
-
-        polygons = list()
-        for _ in range(int(lines.next()[len('polyset '):])):
-            new_polygon = Polygon()
-            for poly in range(int(lines.next()[len('poly '):])):
-                xy_coord = []  # TODO: correct type
-                for _ in range(int(lines.next())):
-                    xy_coord.append([_pcbnew.ToMM(int(v)) for v in lines.next().split(' ')])
-                if poly == 0:
-                    new_polygon._outline = xy_coord
-                else:
-                    new_polygon._holes.append(xy_coord)
-            polygons.append(new_polygon)
-            lines.next()
-
-        # generate all polygons beforehand to prevent possible race-conditions
-        for polygon in polygons:
-            yield polygon
+        """Iterate over all polygons, the vertices of every polygon are copied when it is reached"""
+        for index in range(self._obj.OutlineCount()):
+            yield Polygon(self.outline(index), self.holes(index))
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
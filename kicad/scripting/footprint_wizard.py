@@ -14,8 +14,11 @@
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 import argparse
+import multiprocessing
 import os
 import sys
+import time
+import traceback
 
 try:
     import yaml
@@ -156,6 +159,8 @@ class FootprintScriptingWizard(object):
                             help='library path where to store the footprints')
         parser.add_argument('--dry-run', action='store_true',
                             help='do not save the generated footprints')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='number of worker processes (default: 1), 0 = number of CPUs')
 
         args = parser.parse_args()
 
@@ -165,26 +170,61 @@ class FootprintScriptingWizard(object):
         if not _YAML_AVAILABLE:
             parser.error('PyYAML is required to be installed')
 
-        for definition in args.definitions:
-            param_generator = self.parse_yaml(params, definition)
-            for fp_params in param_generator:
-                print(fp_params)
-                # TODO: duplicate with _FootprintWizardBase
-                module = Module(_pcbnew.MODULE(None))
-
-                module.value = wizard.value  # TODO: name?
-                module.reference = "{}**".format(wizard.reference_prefix)
-
-                fpid = _pcbnew.LIB_ID("", module.value)  # the lib name  (empty) and the name in library
-                module.get_native().SetFPID(fpid)
-
-                wizard.build_footprint(module, fp_params)
-
-                fp_name = '{}.kicad_mod'.format(module.get_native().GetFPID().GetLibItemName())
-                print('* Footprint generated: "{}"'.format(os.path.join(args.library, fp_name)))
+        if args.jobs < 0:
+            parser.error('--jobs has to be non-negative (0 = number of CPUs)')
+        args.jobs = args.jobs or None
+
+        params_generator = (fp_params for definition in args.definitions
+                            for fp_params in self.parse_yaml(params, definition))
+
+        start = time.time()
+        generated = failed = 0
+        for fp_params, path, duration, error in self.build_footprints(params_generator, args.library, args.dry_run,
+                                                                      args.jobs):
+            print(fp_params)
+            if error is None:
+                generated += 1
+                print('* Footprint generated: "{}" ({:.3f} s)'.format(path, duration))
+            else:
+                failed += 1
+                print('* Footprint failed ({:.3f} s):\n{}'.format(duration, error))
+
+        print('{} footprints generated, {} failed in {:.1f} s'.format(generated, failed, time.time() - start))
+        if failed:
+            sys.exit(1)
 
-                if not args.dry_run:
-                    module.to_library(args.library)
+    def build_footprints(self, params_generator, library, dry_run=False, jobs=1):
+        """Build and save footprints for many parameter sets
+
+        Every process creates its own wizard and library writer once, which are reused for all footprints it builds.
+
+        :param params_generator: parameter sets to build footprints for
+        :type params_generator: Iterator over :class:`kicad.scripting.parameter.ParsedParameterMap`
+        :param library: library path where to store the footprints
+        :type library: ``str``
+        :param dry_run: do not save the generated footprints
+        :type dry_run: ``bool``
+        :param jobs: number of worker processes, ``1`` builds in the current process, ``None`` uses all CPUs
+        :type jobs: ``int``
+
+        :return: Iterator over ``(parameters, path, duration, error)`` tuples in the order of ``params_generator``,
+                 independent of the number of processes. ``error`` is ``None`` on success, otherwise the formatted
+                 traceback.
+        """
+        if jobs == 1:
+            builder = _FootprintBuilder(self.wizard_class, library, dry_run)
+            for fp_params in params_generator:
+                yield builder(fp_params)
+            return
+
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(self.wizard_class, library, dry_run))
+        try:
+            for result in pool.imap(_build_worker, params_generator, chunksize=8):
+                yield result
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
 
     def parse_yaml(self, params, definition):
         if not _YAML_AVAILABLE:
@@ -202,6 +242,55 @@ class FootprintScriptingWizard(object):
             yield fp_params
 
 
+def _build_module(wizard, fp_params):
+    # type: (FootprintWizard, ParsedParameterMap) -> Module
+    module = Module(_pcbnew.MODULE(None))
+
+    module.value = wizard.value  # TODO: name?
+    module.reference = "{}**".format(wizard.reference_prefix)
+
+    fpid = _pcbnew.LIB_ID("", module.value)  # the lib name  (empty) and the name in library
+    module.get_native().SetFPID(fpid)
+
+    wizard.build_footprint(module, fp_params)
+    return module
+
+
+class _FootprintBuilder(object):
+    """Build and save footprints, reusing one wizard and library writer"""
+
+    def __init__(self, wizard_class, library, dry_run):
+        self.wizard = wizard_class()
+        self.plugin = _pcbnew.PCB_IO()
+        self.library = library
+        self.dry_run = dry_run
+
+    def __call__(self, fp_params):
+        start = time.time()
+        try:
+            # TODO: duplicate with _FootprintWizardBase
+            module = _build_module(self.wizard, fp_params)
+
+            fp_name = '{}.kicad_mod'.format(module.get_native().GetFPID().GetLibItemName())
+            if not self.dry_run:
+                module.to_library(self.library, plugin=self.plugin)
+            return fp_params, os.path.join(self.library, fp_name), time.time() - start, None
+        except Exception:
+            return fp_params, None, time.time() - start, traceback.format_exc()
+
+
+# builder of the current worker process, set by _init_worker
+_worker_state = {}
+
+
+def _init_worker(wizard_class, library, dry_run):
+    _worker_state['builder'] = _FootprintBuilder(wizard_class, library, dry_run)
+
+
+def _build_worker(fp_params):
+    return _worker_state['builder'](fp_params)
+
+
 def register_footprint_wizard(wizard_class):
     # create object and register as footprint wizard
     registered_wizard = wizard_class()
@@ -14,3 +14,4 @@
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
 from kicad.util.point import Point2D        # noqa: F401
+from kicad.util.point import PointArray     # noqa: F401
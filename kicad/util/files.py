@@ -0,0 +1,102 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import contextlib
+import errno
+import io
+import os
+import stat
+import tempfile
+
+# optional dependencies are imported here once, and taken from this module by everyone who can use them
+try:
+    import numpy
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    numpy = None
+    _NUMPY_AVAILABLE = False
+
+
+# suffix of files which are written right now by atomic_write
+TMP_SUFFIX = '.tmp'
+
+
+def makedirs(path):
+    # type: (str) -> None
+    """Create a directory including its parents, which is not an error when it already exists
+
+    :param path: directory to create
+    :type path: ``str``, ``unicode``
+    """
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(path):
+            raise
+
+
+def _replace(src, dst):
+    # type: (str, str) -> None
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    else:
+        os.rename(src, dst)  # python 2, atomic on POSIX but fails on Windows when dst exists
+
+
+def _file_mode(path):
+    # type: (str) -> int
+    """Permissions of an existing file, or the default permissions of a new file"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        umask = os.umask(0)  # the umask can only be read by setting it
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode='wb', encoding=None):
+    """Write a file, which replaces the old one only after it was written completely
+
+    The content is written into a temporary file next to the target, which is renamed over the target when the
+    block was left without an exception. Readers never see a partially written file, and when something fails the
+    original file is kept and the temporary file is removed. The permissions of the original file are kept as well,
+    and new files are created with the default permissions of the process.
+
+    :param path: file to write
+    :type path: ``str``, ``unicode``
+    :param mode: ``'wb'`` or ``'w'``
+    :type mode: ``str``
+    :param encoding: encoding of text files
+    :type encoding: ``str``
+
+    :return: file object to write to
+
+    :Example:
+
+    >>> from kicad.util.files import atomic_write
+    >>> with atomic_write("path/to/file.bin") as f:# doctest: +SKIP
+    ...     f.write(b'data')
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=TMP_SUFFIX)
+    try:
+        with io.open(fd, mode, encoding=encoding) as f:
+            yield f
+        os.chmod(tmp_path, _file_mode(path))
+        _replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -13,12 +13,35 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import operator
+
+from array import array
+
+from kicad.util.files import numpy, _NUMPY_AVAILABLE  # noqa: F401
+
 from kicad._native import _pcbnew
 
 
+IU_PER_MM = 1000000.  # internal units of pcbnew are nanometres
+
+_NUMBER_TYPES = (int, float)
+
+
+def _new_point(x, y):
+    # type: (float, float) -> Point2D
+    """Create a Point2D without parsing the arguments, x and y have to be floats already"""
+    point = Point2D.__new__(Point2D)
+    point.x = x
+    point.y = y
+    return point
+
+
 class Point2D(object):
     """Representation of a 2D Point in space
 
+    Coordinates are stored as ``float`` in mm. Conversions from and to the internal units of KiCad (integer
+    nanometres) are done without additional type parsing, which makes them suitable for hot loops.
+
     :Example:
 
     >>> from kicad.util.point import Point2D
@@ -33,17 +56,26 @@ class Point2D(object):
     >>> Point2D(Point2D(8, 9))
     kicad.util.point.Point2D(8.0, 9.0)
     """
+    __slots__ = ('x', 'y')
+
     def __init__(self, coordinates=None, y=None):
+        # parse points with format: Point2D(0, 0)
+        if y is not None and type(coordinates) in _NUMBER_TYPES:
+            self.x = float(coordinates)
+            self.y = float(y)
+            return
+
+        # parse points with format: Point2D(Point2D(0, 0))
+        if isinstance(coordinates, Point2D):
+            self.x = coordinates.x
+            self.y = coordinates.y
+            return
+
         # parse constructor
         if coordinates is None:
             coordinates = {}
-        elif type(coordinates) in [int, float]:
-            if y is not None:
-                coordinates = [coordinates, y]
-            else:
-                raise TypeError('you have to give x and y coordinate')
-        elif isinstance(coordinates, Point2D):
-            coordinates = coordinates.__dict__()
+        elif type(coordinates) in _NUMBER_TYPES:
+            raise TypeError('you have to give x and y coordinate')
 
         # parse points with format: Point2D({'x':0, 'y':0})
         if type(coordinates) is dict:
@@ -62,6 +94,40 @@ class Point2D(object):
 
         raise TypeError('invalid parameters given')
 
+    @staticmethod
+    def from_nm(x, y):
+        # type: (int, int) -> Point2D
+        """Create a Point2D from KiCad internal units (nanometres)
+
+        :param x: x coordinate in nm
+        :type x: ``int``
+        :param y: y coordinate in nm
+        :type y: ``int``
+
+        :return: :class:`kicad.util.Point2D`
+
+        :Example:
+
+        >>> from kicad.util.point import Point2D
+        >>> Point2D.from_nm(1500000, -250000)
+        kicad.util.point.Point2D(1.5, -0.25)
+        """
+        return _new_point(x / IU_PER_MM, y / IU_PER_MM)
+
+    def to_nm(self):
+        # type: () -> tuple
+        """Convert coordinate to KiCad internal units (nanometres)
+
+        :return: ``tuple`` of two ``int``
+
+        :Example:
+
+        >>> from kicad.util.point import Point2D
+        >>> Point2D(1.5, -0.25).to_nm()
+        (1500000, -250000)
+        """
+        return int(round(self.x * IU_PER_MM)), int(round(self.y * IU_PER_MM))
+
     @staticmethod
     def from_wxPoint(wxobj):
         """Convert a wxPoint to a Point2D
@@ -71,7 +137,7 @@ class Point2D(object):
 
         :return: :class:`kicad.util.Point2D`
         """
-        return Point2D(_pcbnew.ToMM(wxobj))
+        return _new_point(wxobj.x / IU_PER_MM, wxobj.y / IU_PER_MM)
 
     @staticmethod
     def from_wxSize(wxobj):
@@ -82,21 +148,21 @@ class Point2D(object):
 
         :return: :class:`kicad.util.Point2D`
         """
-        return Point2D(_pcbnew.ToMM(wxobj))
+        return _new_point(wxobj.x / IU_PER_MM, wxobj.y / IU_PER_MM)
 
     def to_wxPoint(self):
         """Convert coordinate to internal coordinate
 
         :return: :class:`pcbnew.wxPoint`
         """
-        return _pcbnew.wxPointMM(float(self.x), float(self.y))
+        return _pcbnew.wxPoint(*self.to_nm())
 
     def to_wxSize(self):
         """Convert size given as Point2D to internal size
 
         :return: :class:`pcbnew.wxSize`
         """
-        return _pcbnew.wxSizeMM(float(self.x), float(self.y))
+        return _pcbnew.wxSize(*self.to_nm())
 
     def round_to(self, base, prec=10):
         """Round to a specific base (like it's required for a grid)
@@ -117,8 +183,8 @@ class Point2D(object):
         if base == 0:
             return self
 
-        return Point2D({'x': round(base * round(self.x / base), prec),
-                        'y': round(base * round(self.y / base), prec)})
+        return _new_point(round(base * round(self.x / base), prec),
+                          round(base * round(self.y / base), prec))
 
     def __eq__(self, other):
         if not isinstance(self, other.__class__):
@@ -131,35 +197,28 @@ class Point2D(object):
     @staticmethod
     def __arithmetic_parse(value):
         if isinstance(value, Point2D):
-            return value
-        elif type(value) in [int, float]:
-            return Point2D([value, value])
+            return value.x, value.y
+        elif type(value) in _NUMBER_TYPES:
+            return value, value
         else:
-            return Point2D(value)
+            other = Point2D(value)
+            return other.x, other.y
 
     def __add__(self, value):
-        other = Point2D.__arithmetic_parse(value)
-
-        return Point2D({'x': self.x + other.x,
-                        'y': self.y + other.y})
+        x, y = Point2D.__arithmetic_parse(value)
+        return _new_point(float(self.x + x), float(self.y + y))
 
     def __sub__(self, value):
-        other = Point2D.__arithmetic_parse(value)
-
-        return Point2D({'x': self.x - other.x,
-                        'y': self.y - other.y})
+        x, y = Point2D.__arithmetic_parse(value)
+        return _new_point(float(self.x - x), float(self.y - y))
 
     def __mul__(self, value):
-        other = Point2D.__arithmetic_parse(value)
-
-        return Point2D({'x': self.x * other.x,
-                        'y': self.y * other.y})
+        x, y = Point2D.__arithmetic_parse(value)
+        return _new_point(float(self.x * x), float(self.y * y))
 
     def __div__(self, value):
-        other = Point2D.__arithmetic_parse(value)
-
-        return Point2D({'x': self.x / other.x,
-                        'y': self.y / other.y})
+        x, y = Point2D.__arithmetic_parse(value)
+        return _new_point(float(self.x) / x, float(self.y) / y)
 
     def __truediv__(self, obj):
         return self.__div__(obj)
@@ -167,11 +226,255 @@ class Point2D(object):
     def __dict__(self):
         return {'x': self.x, 'y': self.y}
 
+    def __reduce__(self):
+        return Point2D, (self.x, self.y)
+
     def __hash__(self):
         return hash((self.x, self.y))
 
     def __repr__(self):
-        return "kicad.util.point.Point2D({x}, {y})".format(**self.__dict__())
+        return "kicad.util.point.Point2D({}, {})".format(self.x, self.y)
 
     def __str__(self):
-        return "[{x}, {y}]".format(**self.__dict__())
+        return "[{}, {}]".format(self.x, self.y)
+
+
+def _xy(value):
+    # type: (object) -> tuple
+    """Parse a scalar or point like operand into a (x, y) tuple"""
+    if isinstance(value, Point2D):
+        return value.x, value.y
+    elif type(value) in _NUMBER_TYPES:
+        return value, value
+    else:
+        other = Point2D(value)
+        return other.x, other.y
+
+
+class PointArray(object):
+    """Batch of 2D Points stored in a contiguous buffer
+
+    The coordinates are stored in a ``numpy.ndarray`` of shape ``(n, 2)`` if numpy is installed, otherwise in an
+    interleaved ``array('d')``. All operations work on the whole batch at once.
+
+    :param points: points to store, like a list of :class:`kicad.util.Point2D` or ``[x, y]`` pairs
+    :type points: iterable, ``numpy.ndarray``, :class:`kicad.util.PointArray`
+
+    :Example:
+
+    >>> from kicad.util.point import PointArray
+    >>> a = PointArray([[0, 0], [1.234, 5.678]])
+    >>> len(a)
+    2
+    >>> (a + 1).round_to(0.1)
+    kicad.util.point.PointArray([[1.0, 1.0], [2.2, 6.7]])
+    >>> a.bounding_box()
+    (kicad.util.point.Point2D(0.0, 0.0), kicad.util.point.Point2D(1.234, 5.678))
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, points=None):
+        if points is None:
+            points = []
+
+        if isinstance(points, PointArray):
+            self._data = points._data.copy() if _NUMPY_AVAILABLE else array('d', points._data)
+        elif _NUMPY_AVAILABLE:
+            if isinstance(points, numpy.ndarray):
+                data = numpy.array(points, dtype=float)
+            else:
+                data = numpy.array([_xy(p) for p in points], dtype=float)
+            self._data = data.reshape(-1, 2)
+        else:
+            data = array('d')
+            for p in points:
+                data.extend(_xy(p))
+            self._data = data
+
+    @staticmethod
+    def _wrap(data):
+        """Create a PointArray from an already converted buffer"""
+        points = PointArray.__new__(PointArray)
+        points._data = data
+        return points
+
+    @staticmethod
+    def from_nm(coordinates):
+        """Create a PointArray from interleaved KiCad internal units (nanometres)
+
+        :param coordinates: ``x0, y0, x1, y1, ...`` in nm
+        :type coordinates: iterable of ``int``
+
+        :return: :class:`kicad.util.PointArray`
+        """
+        if _NUMPY_AVAILABLE:
+            return PointArray._wrap(numpy.array(coordinates, dtype=float).reshape(-1, 2) / IU_PER_MM)
+        else:
+            return PointArray._wrap(array('d', [v / IU_PER_MM for v in coordinates]))
+
+    def to_nm(self):
+        """Convert all coordinates to KiCad internal units (nanometres)
+
+        :return: ``list`` of ``(x, y)`` tuples of ``int``
+        """
+        if _NUMPY_AVAILABLE:
+            return [(x, y) for x, y in numpy.rint(self._data * IU_PER_MM).astype(numpy.int64).tolist()]
+        else:
+            nm = [int(round(v * IU_PER_MM)) for v in self._data]
+            return list(zip(nm[0::2], nm[1::2]))
+
+    @staticmethod
+    def from_wxPoints(wxpoints):
+        """Convert a list of wxPoint to a PointArray
+
+        :param wxpoints: points to convert
+        :type wxpoints: iterable of :class:`pcbnew.wxPoint`
+
+        :return: :class:`kicad.util.PointArray`
+        """
+        coordinates = []
+        extend = coordinates.extend
+        for p in wxpoints:
+            extend((p.x, p.y))
+        return PointArray.from_nm(coordinates)
+
+    def to_wxPoints(self):
+        """Convert all coordinates to internal coordinates
+
+        :return: ``list`` of :class:`pcbnew.wxPoint`
+        """
+        wxPoint = _pcbnew.wxPoint
+        return [wxPoint(x, y) for x, y in self.to_nm()]
+
+    def to_numpy(self):
+        """Get the coordinates as numpy array
+
+        :return: ``numpy.ndarray`` of shape ``(n, 2)``
+        """
+        if not _NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for PointArray.to_numpy()")
+        return self._data
+
+    @property
+    def x(self):
+        """x coordinates of all points
+
+        :return: ``numpy.ndarray`` or ``array('d')``
+        """
+        return self._data[:, 0] if _NUMPY_AVAILABLE else self._data[0::2]
+
+    @property
+    def y(self):
+        """y coordinates of all points
+
+        :return: ``numpy.ndarray`` or ``array('d')``
+        """
+        return self._data[:, 1] if _NUMPY_AVAILABLE else self._data[1::2]
+
+    def round_to(self, base, prec=10):
+        """Round all points to a specific base (like it's required for a grid)
+
+        :param base: base we want to round to
+        :type base: ``float``
+        :param prec: precision of rounding operation
+        :type prec: ``int``
+
+        :return: :class:`kicad.util.PointArray`
+        """
+        if base == 0:
+            return self
+
+        if _NUMPY_AVAILABLE:
+            return PointArray._wrap(numpy.round(base * numpy.round(self._data / base), prec))
+        else:
+            return PointArray._wrap(array('d', [round(base * round(v / base), prec) for v in self._data]))
+
+    def bounding_box(self):
+        """Get the axis aligned bounding box of all points
+
+        :return: ``tuple`` of two :class:`kicad.util.Point2D` (minimum and maximum)
+        """
+        if not len(self):
+            raise ValueError("bounding box of an empty PointArray is not defined")
+
+        if _NUMPY_AVAILABLE:
+            (min_x, min_y), (max_x, max_y) = self._data.min(axis=0).tolist(), self._data.max(axis=0).tolist()
+        else:
+            min_x, max_x = min(self.x), max(self.x)
+            min_y, max_y = min(self.y), max(self.y)
+        return _new_point(min_x, min_y), _new_point(max_x, max_y)
+
+    def _arithmetic(self, value, op):
+        if isinstance(value, PointArray):
+            if len(value) != len(self):
+                raise ValueError("PointArray sizes do not match ({} != {})".format(len(self), len(value)))
+            if _NUMPY_AVAILABLE:
+                return PointArray._wrap(op(self._data, value._data))
+            return PointArray._wrap(array('d', map(op, self._data, value._data)))
+
+        x, y = _xy(value)
+        if _NUMPY_AVAILABLE:
+            return PointArray._wrap(op(self._data, numpy.array([x, y], dtype=float)))
+        data = array('d', self._data)
+        data[0::2] = array('d', [op(v, x) for v in self._data[0::2]])
+        data[1::2] = array('d', [op(v, y) for v in self._data[1::2]])
+        return PointArray._wrap(data)
+
+    def __add__(self, value):
+        return self._arithmetic(value, operator.add)
+
+    def __sub__(self, value):
+        return self._arithmetic(value, operator.sub)
+
+    def __mul__(self, value):
+        return self._arithmetic(value, operator.mul)
+
+    def __div__(self, value):
+        return self._arithmetic(value, operator.truediv)
+
+    def __truediv__(self, value):
+        return self.__div__(value)
+
+    def __len__(self):
+        return len(self._data) if _NUMPY_AVAILABLE else len(self._data) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if _NUMPY_AVAILABLE:
+                return PointArray._wrap(self._data[index].copy())
+            return PointArray(list(self)[index])
+
+        if _NUMPY_AVAILABLE:
+            x, y = self._data[index].tolist()
+        else:
+            if index < 0:
+                index += len(self)
+            x, y = self._data[2 * index:2 * index + 2]
+        return _new_point(x, y)
+
+    def __iter__(self):
+        if _NUMPY_AVAILABLE:
+            for x, y in self._data.tolist():
+                yield _new_point(x, y)
+        else:
+            data = self._data
+            for i in range(0, len(data), 2):
+                yield _new_point(data[i], data[i + 1])
+
+    def __eq__(self, other):
+        if not isinstance(self, other.__class__):
+            return False
+        if _NUMPY_AVAILABLE:
+            return self._data.shape == other._data.shape and bool((self._data == other._data).all())
+        return self._data == other._data
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None  # mutable container
+
+    def __reduce__(self):
+        return PointArray, ([[p.x, p.y] for p in self],)
+
+    def __repr__(self):
+        return "kicad.util.point.PointArray({})".format([[p.x, p.y] for p in self])
@@ -0,0 +1,329 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import heapq
+import itertools
+import math
+
+from typing import Any, Iterable, List, Tuple  # noqa: F401
+
+from kicad.util.point import _xy
+
+
+_NODE_CAPACITY = 16
+
+
+def _to_box(bbox):
+    # type: (Any) -> Tuple[float, float, float, float]
+    """Convert a pair of corner points into a normalized tuple (min_x, min_y, max_x, max_y)"""
+    x1, y1 = _xy(bbox[0])
+    x2, y2 = _xy(bbox[1])
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+
+def _union(boxes):
+    # type: (Iterable[Tuple[float, float, float, float]]) -> Tuple[float, float, float, float]
+    min_x, min_y, max_x, max_y = zip(*boxes)
+    return min(min_x), min(min_y), max(max_x), max(max_y)
+
+
+def _enlarge(a, b):
+    # type: (Tuple, Tuple) -> Tuple[float, float, float, float]
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def _area(box):
+    # type: (Tuple) -> float
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _intersects(a, b):
+    # type: (Tuple, Tuple) -> bool
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _distance(box, x, y):
+    # type: (Tuple, float, float) -> float
+    """Distance between a point and a box, which is zero when the point is inside of the box"""
+    dx = max(box[0] - x, 0., x - box[2])
+    dy = max(box[1] - y, 0., y - box[3])
+    return math.hypot(dx, dy)
+
+
+class _Node(object):
+    __slots__ = ('box', 'children', 'leaf')
+
+    def __init__(self, children, leaf):
+        # type: (list, bool) -> None
+        self.children = children  # leafs contain (box, item) tuples, all other nodes contain _Node objects
+        self.leaf = leaf
+        self.box = _union(c[0] for c in children) if leaf else _union(c.box for c in children)
+
+    def update_box(self):
+        # type: () -> None
+        self.box = _union(c[0] for c in self.children) if self.leaf else _union(c.box for c in self.children)
+
+
+def _str_pack(entries, key, capacity):
+    # type: (list, Any, int) -> List[list]
+    """Sort-Tile-Recursive packing: group entries into tiles of similar x and y positions"""
+    count = int(math.ceil(len(entries) / float(capacity)))
+    slices = int(math.ceil(math.sqrt(count)))
+    slice_size = slices * capacity
+
+    entries = sorted(entries, key=lambda e: key(e)[0] + key(e)[2])
+    groups = []
+    for i in range(0, len(entries), slice_size):
+        vertical = sorted(entries[i:i + slice_size], key=lambda e: key(e)[1] + key(e)[3])
+        for j in range(0, len(vertical), capacity):
+            groups.append(vertical[j:j + capacity])
+    return groups
+
+
+class RTree(object):
+    """Spatial index over axis aligned bounding boxes
+
+    The tree is bulk loaded using Sort-Tile-Recursive packing, which results in nearly optimal filled nodes. Items
+    can be inserted, removed and updated afterwards, for example when they were moved.
+
+    Items are stored in a ``dict`` to find them again, which means they need to be hashable. Bounding boxes are
+    given as pair of corner points, like returned by :func:`kicad.util.PointArray.bounding_box`.
+
+    :param entries: ``(item, bounding_box)`` pairs to bulk load
+    :param node_capacity: maximum number of children of a node
+    :type node_capacity: ``int``
+
+    :Example:
+
+    >>> from kicad.util.rtree import RTree
+    >>> tree = RTree([('a', [(0, 0), (1, 1)]), ('b', [(5, 5), (6, 7)])])
+    >>> tree.query_point((0.5, 0.5))
+    ['a']
+    >>> tree.nearest((4, 4))
+    ['b']
+    """
+
+    def __init__(self, entries=(), node_capacity=_NODE_CAPACITY):
+        # type: (Iterable[Tuple[Any, Any]], int) -> None
+        assert type(node_capacity) is int and node_capacity >= 2
+        self._capacity = node_capacity
+        self._boxes = {}  # type: dict
+
+        leaf_entries = []
+        for item, bbox in entries:
+            box = _to_box(bbox)
+            if item in self._boxes:
+                raise ValueError("item {!r} is already present in the tree".format(item))
+            self._boxes[item] = box
+            leaf_entries.append((box, item))
+        self._root = self._bulk_load(leaf_entries)
+
+    def _bulk_load(self, entries):
+        # type: (list) -> _Node
+        if not entries:
+            return self._empty_node()
+
+        nodes = [_Node(group, True) for group in _str_pack(entries, lambda e: e[0], self._capacity)]
+        while len(nodes) > 1:
+            nodes = [_Node(group, False) for group in _str_pack(nodes, lambda n: n.box, self._capacity)]
+        return nodes[0]
+
+    @staticmethod
+    def _empty_node():
+        # type: () -> _Node
+        node = _Node.__new__(_Node)
+        node.children = []
+        node.leaf = True
+        node.box = None
+        return node
+
+    def insert(self, item, bbox):
+        # type: (Any, Any) -> None
+        """Add a new item to the tree
+
+        :param item: hashable object to store
+        :param bbox: bounding box of the item as pair of corner points
+        """
+        if item in self._boxes:
+            raise ValueError("item {!r} is already present in the tree".format(item))
+        box = _to_box(bbox)
+        self._boxes[item] = box
+
+        if self._root.box is None:
+            self._root = _Node([(box, item)], True)
+            return
+
+        split = self._insert(self._root, (box, item))
+        if split is not None:
+            self._root = _Node([self._root, split], False)
+
+    def _insert(self, node, entry):
+        # type: (_Node, tuple) -> _Node
+        """Insert entry into the subtree of node, and return the new sibling when node had to be split"""
+        box = entry[0]
+        node.box = _enlarge(node.box, box)
+        if node.leaf:
+            node.children.append(entry)
+        else:
+            # choose the child which needs the least enlargement to contain the new box
+            best = min(node.children, key=lambda c: (_area(_enlarge(c.box, box)) - _area(c.box), _area(c.box)))
+            split = self._insert(best, entry)
+            if split is not None:
+                node.children.append(split)
+
+        if len(node.children) <= self._capacity:
+            return None
+        return self._split(node)
+
+    def _split(self, node):
+        # type: (_Node) -> _Node
+        """Split an overflowing node in half along its longer axis"""
+        box = node.box
+        key = (lambda c: c[0]) if node.leaf else (lambda c: c.box)
+        axis = 0 if box[2] - box[0] >= box[3] - box[1] else 1
+        children = sorted(node.children, key=lambda c: key(c)[axis] + key(c)[axis + 2])
+        half = len(children) // 2
+        node.children = children[:half]
+        node.update_box()
+        return _Node(children[half:], node.leaf)
+
+    def remove(self, item):
+        # type: (Any) -> None
+        """Remove an item from the tree
+
+        :param item: object which was stored before
+
+        :raises KeyError: when the item is not present in the tree
+        """
+        box = self._boxes.pop(item)
+        if not self._remove(self._root, box, item):
+            raise AssertionError("tree is inconsistent, item {!r} was not found".format(item))
+        if not self._root.children:
+            self._root = self._empty_node()
+        elif not self._root.leaf and len(self._root.children) == 1:
+            self._root = self._root.children[0]
+
+    def _remove(self, node, box, item):
+        # type: (_Node, tuple, Any) -> bool
+        if node.leaf:
+            for idx, (entry_box, entry_item) in enumerate(node.children):
+                if entry_box == box and entry_item == item:
+                    del node.children[idx]
+                    if node.children:
+                        node.update_box()
+                    return True
+            return False
+
+        for idx, child in enumerate(node.children):
+            if _intersects(child.box, box) and self._remove(child, box, item):
+                if not child.children:
+                    del node.children[idx]  # underfull nodes are kept, only empty ones are dropped
+                if node.children:
+                    node.update_box()
+                return True
+        return False
+
+    def update(self, item, bbox):
+        # type: (Any, Any) -> None
+        """Change the bounding box of an item, for example after it was moved
+
+        :param item: object which was stored before
+        :param bbox: new bounding box of the item as pair of corner points
+        """
+        self.remove(item)
+        self.insert(item, bbox)
+
+    def bounding_box(self, item):
+        # type: (Any) -> Tuple[float, float, float, float]
+        """Get the bounding box an item is stored with
+
+        :return: ``tuple`` (min_x, min_y, max_x, max_y)
+        """
+        return self._boxes[item]
+
+    def query_bbox(self, bbox):
+        # type: (Any) -> list
+        """Find all items whose bounding box intersects with the given one
+
+        :param bbox: region to search as pair of corner points
+
+        :return: ``list`` of items
+        """
+        box = _to_box(bbox)
+        result = []
+        if self._root.box is None:
+            return result
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if not _intersects(node.box, box):
+                continue
+            if node.leaf:
+                result.extend(item for entry_box, item in node.children if _intersects(entry_box, box))
+            else:
+                stack.extend(node.children)
+        return result
+
+    def query_point(self, point):
+        # type: (Any) -> list
+        """Find all items whose bounding box contains the given point
+
+        :param point: point to search at
+
+        :return: ``list`` of items
+        """
+        return self.query_bbox((point, point))
+
+    def nearest(self, point, k=1):
+        # type: (Any, int) -> list
+        """Find the k items whose bounding boxes are nearest to a point
+
+        :param point: point to search from
+        :param k: number of items to return
+        :type k: ``int``
+
+        :return: ``list`` of items, ordered by distance
+        """
+        x, y = _xy(point)
+        result = []
+        if self._root.box is None or k <= 0:
+            return result
+
+        counter = itertools.count()  # tie breaker, nodes and items are not comparable
+        heap = [(_distance(self._root.box, x, y), next(counter), False, self._root)]
+        while heap and len(result) < k:
+            _, _, is_item, entry = heapq.heappop(heap)
+            if is_item:
+                result.append(entry)
+            elif entry.leaf:
+                for entry_box, item in entry.children:
+                    heapq.heappush(heap, (_distance(entry_box, x, y), next(counter), True, item))
+            else:
+                for child in entry.children:
+                    heapq.heappush(heap, (_distance(child.box, x, y), next(counter), False, child))
+        return result
+
+    def __contains__(self, item):
+        return item in self._boxes
+
+    def __iter__(self):
+        return iter(self._boxes)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __repr__(self):
+        return "kicad.util.rtree.RTree(<{} items>)".format(len(self))
@@ -0,0 +1,629 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import re
+
+from typing import Generator, Iterable, Iterator, List, Optional  # noqa: F401
+
+
+_CHUNK_SIZE = 64 * 1024
+
+# tokens are separated by whitespace, "(" and ")" are always tokens of their own
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))', re.DOTALL)
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t'}
+
+# atoms containing one of those characters have to be quoted when written
+_QUOTE_RE = re.compile(r'[\s()"\\]')
+_UNESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t', '"': '\\"', '\\': '\\\\'}
+_UNESCAPE_RE = re.compile(r'[\n\r\t"\\]')
+
+# tokens of a file which are relevant to find the end of an expression
+_STRUCTURE_RE = re.compile(br'\(|\)|"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+# Layout of the expressions KiCad 5 writes over multiple lines, every other expression is written on a single line.
+# keyword -> (child lists written on the line of the keyword, number of other children per line (None for all of
+# them on one line), closing parenthesis on a line of its own)
+_LAYOUTS = {
+    'kicad_pcb': (('version', 'host'), 1, True),
+    'general': ((), 1, True),
+    'title_block': ((), 1, True),
+    'layers': ((), 1, True),
+    'setup': ((), 1, True),
+    'pcbplotparams': ((), 1, False),
+    'net_class': ((), 1, True),
+    'module': (('layer', 'tedit', 'tstamp'), 1, True),
+    'fp_text': (('at', 'layer'), 1, True),
+    'gr_text': (('at', 'layer'), 1, True),
+    'dimension': (('width', 'layer'), 1, True),
+    'model': ((), 1, True),
+    'pad': (('at', 'size', 'rect_delta', 'drill', 'layers', 'roundrect_rratio', 'chamfer_ratio', 'chamfer'), None,
+            False),
+    'zone': (('net', 'net_name', 'layer', 'layers', 'tstamp', 'hatch'), 1, True),
+    'polygon': ((), 1, True),
+    'filled_polygon': ((), 1, True),
+    'fill_segments': ((), 1, True),
+}
+
+# the points of zone outlines are written on lines of their own, all other points continue the line of their parent
+_POINT_LAYOUT = ((), 5, True)
+_POINT_PARENTS = frozenset(['polygon', 'filled_polygon', 'fill_segments'])
+_INLINE_POINTS_PER_LINE = 4
+
+OPEN = object()
+CLOSE = object()
+
+
+class QuotedString(type(u'')):
+    """String atom which was quoted in the source file
+
+    Behaves exactly like ``unicode``, the type of all other atoms, but allows a writer to reproduce the quoting of the
+    original file.
+    """
+    __slots__ = ()
+
+
+class SexprList(list):
+    """Parsed S-expression list
+
+    The first element is the keyword of the expression, all following elements are either atoms (``str``) or
+    nested :class:`kicad.util.sexpr.SexprList` objects.
+
+    :Example:
+
+    >>> from kicad.util.sexpr import parse_string
+    >>> node = parse_string('(segment (start 1 2) (end 3 4) (width 0.25) (net 1))')
+    >>> node.name
+    'segment'
+    >>> node.find('start')
+    ['start', '1', '2']
+    >>> node.value('width')
+    '0.25'
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        # type: () -> str
+        """keyword of the expression
+
+        :return: ``str``
+        """
+        return self[0] if self else ''
+
+    def find(self, name):
+        # type: (str) -> Optional[SexprList]
+        """Get the first child expression with the given keyword
+
+        :param name: keyword to search for
+        :type name: ``str``
+
+        :return: :class:`kicad.util.sexpr.SexprList` or ``None``
+        """
+        for item in self:
+            if type(item) is SexprList and item and item[0] == name:
+                return item
+        return None
+
+    def find_all(self, name):
+        # type: (str) -> Generator[SexprList, None, None]
+        """Iterate over all child expressions with the given keyword
+
+        :param name: keyword to search for
+        :type name: ``str``
+
+        :return: Iterator over :class:`kicad.util.sexpr.SexprList`
+        """
+        for item in self:
+            if type(item) is SexprList and item and item[0] == name:
+                yield item
+
+    def value(self, name, default=None):
+        """Get the first atom of the child expression with the given keyword
+
+        :param name: keyword to search for
+        :type name: ``str``
+        :param default: value returned when the child expression does not exist
+
+        :return: ``str``
+        """
+        item = self.find(name)
+        if item is None or len(item) < 2:
+            return default
+        return item[1]
+
+    def atoms(self):
+        # type: () -> Generator[str, None, None]
+        """Iterate over all direct atoms of the expression (without the keyword)
+
+        :return: Iterator over ``str``
+        """
+        for item in self[1:]:
+            if type(item) is not SexprList:
+                yield item
+
+
+def _unescape(match):
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
+def tokenize(stream, chunk_size=_CHUNK_SIZE):
+    # type: (io.TextIOBase, int) -> Iterator
+    """Split a S-expression stream into tokens without reading it as a whole
+
+    :param stream: file like object opened in text mode
+    :param chunk_size: number of characters to read at once
+    :type chunk_size: ``int``
+
+    :return: Iterator over tokens, which are :attr:`OPEN`, :attr:`CLOSE` or atoms (``str``)
+
+    :Example:
+
+    >>> import io
+    >>> from kicad.util.sexpr import tokenize, OPEN, CLOSE
+    >>> [t for t in tokenize(io.StringIO(u'(net 1 "GND")')) if t not in (OPEN, CLOSE)]
+    ['net', '1', 'GND']
+    """
+    buf = ''
+    pos = 0
+    eof = False
+    match = _TOKEN_RE.match
+    while True:
+        if not eof:
+            chunk = stream.read(chunk_size)
+            if chunk:
+                buf = buf[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+
+        end = len(buf)
+        # keep some characters in the buffer as long as there is more to read, to not split a token
+        limit = end if eof else end - 256
+        while pos < limit:
+            m = match(buf, pos)
+            if m is None:
+                break
+            if not eof and m.end() == end and m.lastindex > 2:
+                break  # the atom could continue in the next chunk
+            pos = m.end()
+            idx = m.lastindex
+            if idx == 1:
+                yield OPEN
+            elif idx == 2:
+                yield CLOSE
+            elif idx == 3:
+                string = m.group(3)
+                if '\\' in string:
+                    string = _ESCAPE_RE.sub(_unescape, string)
+                yield QuotedString(string)
+            else:
+                yield m.group(4)
+
+        if eof:
+            if buf[pos:].strip():
+                raise ValueError("invalid S-expression near: {!r}".format(buf[pos:pos + 40]))
+            return
+
+
+def _parse_list(tokens):
+    # type: (Iterator) -> SexprList
+    """Parse all tokens until the matching :attr:`CLOSE` (the :attr:`OPEN` token was already consumed)"""
+    stack = [SexprList()]
+    for token in tokens:
+        if token is OPEN:
+            stack.append(SexprList())
+        elif token is CLOSE:
+            node = stack.pop()
+            if not stack:
+                return node
+            stack[-1].append(node)
+        else:
+            stack[-1].append(token)
+    raise ValueError("unexpected end of S-expression")
+
+
+def iter_parse(stream, chunk_size=_CHUNK_SIZE):
+    # type: (io.TextIOBase, int) -> Generator[SexprList, None, None]
+    """Parse the root expression of a stream incrementally
+
+    The first yielded element is the root expression containing only its atoms (like ``kicad_pcb``), followed by
+    every child expression of the root in the order of the file. Only one child expression is held in memory at a
+    time, which allows to skip uninteresting parts of big files.
+
+    :param stream: file like object opened in text mode
+    :param chunk_size: number of characters to read at once
+    :type chunk_size: ``int``
+
+    :return: Iterator over :class:`kicad.util.sexpr.SexprList`
+
+    :Example:
+
+    >>> import io
+    >>> from kicad.util.sexpr import iter_parse
+    >>> [node.name for node in iter_parse(io.StringIO(u'(kicad_pcb (version 1) (net 0 ""))'))]
+    ['kicad_pcb', 'version', 'net']
+    """
+    tokens = tokenize(stream, chunk_size)
+    if next(tokens, None) is not OPEN:
+        raise ValueError("S-expression has to start with \"(\"")
+
+    root = SexprList()
+    root_yielded = False
+    for token in tokens:
+        if token is OPEN:
+            if not root_yielded:
+                root_yielded = True
+                yield root
+            yield _parse_list(tokens)
+        elif token is CLOSE:
+            if not root_yielded:
+                yield root
+            if next(tokens, None) is not None:
+                raise ValueError("unexpected data after the root S-expression")
+            return
+        elif root_yielded:
+            raise ValueError("atoms are only allowed in front of the child expressions of the root")
+        else:
+            root.append(token)
+    raise ValueError("unexpected end of S-expression")
+
+
+def parse(stream, chunk_size=_CHUNK_SIZE):
+    # type: (io.TextIOBase, int) -> SexprList
+    """Parse a whole S-expression stream into a tree
+
+    :param stream: file like object opened in text mode
+    :param chunk_size: number of characters to read at once
+    :type chunk_size: ``int``
+
+    :return: :class:`kicad.util.sexpr.SexprList`
+    """
+    nodes = iter_parse(stream, chunk_size)
+    root = next(nodes)
+    root.extend(nodes)
+    return root
+
+
+def parse_string(text):
+    # type: (str) -> SexprList
+    """Parse a S-expression given as string
+
+    :param text: S-expression
+    :type text: ``str``, ``unicode``
+
+    :return: :class:`kicad.util.sexpr.SexprList`
+
+    :Example:
+
+    >>> from kicad.util.sexpr import parse_string
+    >>> parse_string('(at 1.5 -2 90)')
+    ['at', '1.5', '-2', '90']
+    """
+    return parse(io.StringIO(u'{}'.format(text)))
+
+
+def open_file(path):
+    """Open a S-expression file for :func:`kicad.util.sexpr.iter_parse`
+
+    :param path: path to the file
+    :type path: ``str``, ``unicode``
+
+    :return: file object
+    """
+    return io.open(path, 'r', encoding='utf-8')
+
+
+def format_float(value):
+    # type: (float) -> str
+    """Format a number like KiCad does, with up to 6 decimal places and without trailing zeros
+
+    :Example:
+
+    >>> from kicad.util.sexpr import format_float
+    >>> format_float(1.5), format_float(2.), format_float(-0.1234567)
+    ('1.5', '2', '-0.123457')
+    """
+    text = '{:.6f}'.format(value).rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def _format_atom(atom):
+    # type: (object) -> str
+    if isinstance(atom, float):
+        return u'{}'.format(format_float(atom))
+    elif not isinstance(atom, str) and not isinstance(atom, type(u'')):
+        return u'{}'.format(atom)
+    elif type(atom) is QuotedString or not atom or _QUOTE_RE.search(atom):
+        return u'"{}"'.format(_UNESCAPE_RE.sub(lambda m: _UNESCAPES[m.group()], atom))
+    return u'{}'.format(atom)  # text streams of python 2 do not accept byte strings
+
+
+def _keyword(node):
+    # type: (list) -> Optional[str]
+    return node[0] if node and not isinstance(node[0], list) else None
+
+
+def _layout(node, parent=None):
+    # type: (list, Optional[str]) -> Optional[tuple]
+    """Layout of a list which is written over multiple lines, or ``None`` if it is written on a single line"""
+    keyword = _keyword(node)
+    children = [item for item in node if isinstance(item, list)]
+    if not children:
+        return None
+    if keyword == 'pts':
+        return _POINT_LAYOUT if parent in _POINT_PARENTS else None
+    layout = _LAYOUTS.get(keyword)
+    if layout is None and any(_layout(child, keyword) is not None for child in children):
+        return (), 1, True  # unknown expressions are written over multiple lines when one of their children is
+    return layout
+
+
+def _write_inline(node, stream, indent):
+    # type: (list, io.TextIOBase, int) -> None
+    wrap = _keyword(node) == 'pts'
+    stream.write(u'(')
+    for idx, item in enumerate(node):
+        if wrap and idx > 1 and (idx - 1) % _INLINE_POINTS_PER_LINE == 0:
+            stream.write(u'\n')
+            stream.write(u' ' * (indent + 2))
+        elif idx:
+            stream.write(u' ')
+        if isinstance(item, list):
+            _write_inline(item, stream, indent)
+        else:
+            stream.write(_format_atom(item))
+    stream.write(u')')
+
+
+def _write(node, stream, indent, parent):
+    # type: (list, io.TextIOBase, int, Optional[str]) -> None
+    layout = _layout(node, parent)
+    if layout is None:
+        _write_inline(node, stream, indent)
+        return
+    header, per_line, closing_line = layout
+
+    # the first line contains all leading atoms, and the lists of the header
+    stream.write(u'(')
+    idx = 0
+    while idx < len(node):
+        item = node[idx]
+        if isinstance(item, list):
+            if _keyword(item) not in header:
+                break
+            stream.write(u' ')
+            _write_inline(item, stream, indent)
+        else:
+            if idx:
+                stream.write(u' ')
+            stream.write(_format_atom(item))
+        idx += 1
+
+    keyword = _keyword(node)
+    child_indent = u' ' * (indent + 2)
+    for count, item in enumerate(node[idx:]):
+        if count == 0 or (per_line is not None and count % per_line == 0):
+            stream.write(u'\n')
+            stream.write(child_indent)
+        else:
+            stream.write(u' ')
+        if isinstance(item, list):
+            _write(item, stream, indent + 2, keyword)
+        else:
+            stream.write(_format_atom(item))
+    if closing_line:
+        stream.write(u'\n')
+        stream.write(u' ' * indent)
+    stream.write(u')')
+
+
+def write(node, stream, indent=0):
+    # type: (list, io.TextIOBase, int) -> None
+    """Write a S-expression in the layout of KiCad 5
+
+    Most lists are written on a single line. Items like modules, pads, texts and zones are written like KiCad does:
+    their keyword, atoms and some attributes on the first line, and every other child on a line of its own. The closing
+    parenthesis is either written on a line of its own, or on the line of the last child, depending on the item. Lines
+    are never wrapped by their width, only long lists of points are split over multiple lines. Atoms are quoted when
+    they were quoted in the parsed file (:class:`kicad.util.sexpr.QuotedString`) or when they contain characters which
+    require quoting.
+
+    Only one line is formatted at a time, which allows to write arbitrarily large expressions.
+
+    :param node: expression to write, containing atoms (``str``, ``int``, ``float``) and nested lists
+    :type node: :class:`kicad.util.sexpr.SexprList`
+    :param stream: file like object opened in text mode
+    :param indent: number of spaces the expression is indented with, used for the following lines
+    :type indent: ``int``
+
+    :Example:
+
+    >>> import io
+    >>> from kicad.util.sexpr import parse_string, write
+    >>> stream = io.StringIO()
+    >>> write(parse_string('(pad 1 smd rect (at -1 0) (size 1 1) (layers F.Cu) (net 1 "GND"))'), stream)
+    >>> print(stream.getvalue())
+    (pad 1 smd rect (at -1 0) (size 1 1) (layers F.Cu)
+      (net 1 "GND"))
+    """
+    _write(node, stream, indent, None)
+
+
+def write_root(root, children, stream):
+    # type: (list, Iterable[list], io.TextIOBase) -> None
+    """Write a whole file, whose top level expressions are given by an iterator
+
+    This allows to write files without holding all expressions in memory at once.
+
+    :param root: root expression with its atoms and the lists to write on the first line, like ``kicad_pcb``
+    :type root: :class:`kicad.util.sexpr.SexprList`
+    :param children: top level expressions, each one is written on a new line
+    :param stream: file like object opened in text mode
+    """
+    stream.write(u'(')
+    for idx, item in enumerate(root):
+        if idx:
+            stream.write(u' ')
+        if isinstance(item, list):
+            _write_inline(item, stream, 0)
+        else:
+            stream.write(_format_atom(item))
+
+    for child in children:
+        stream.write(u'\n  ')
+        write(child, stream, 2)
+    stream.write(u'\n)\n')
+
+
+def dumps(node, indent=0):
+    # type: (list, int) -> str
+    """Format a S-expression in the layout of KiCad 5, see :func:`kicad.util.sexpr.write`
+
+    :return: ``unicode``
+
+    :Example:
+
+    >>> from kicad.util.sexpr import dumps, parse_string
+    >>> dumps(parse_string('(at   1.5 -2 90)'))
+    '(at 1.5 -2 90)'
+    """
+    stream = io.StringIO()
+    write(node, stream, indent)
+    return stream.getvalue()
+
+
+def splice(source, stream, replacements, chunk_size=_CHUNK_SIZE):
+    # type: (bytes, io.BufferedIOBase, Iterable[tuple], int) -> None
+    r"""Copy a file, and replace some of its expressions
+
+    Everything outside of the replaced byte ranges is copied unchanged, which keeps the formatting of the file. The
+    replacements are written in the layout of KiCad 5 (see :func:`kicad.util.sexpr.write`), and
+    :func:`kicad.util.sexpr.changed_ranges` finds the smallest ranges to replace.
+
+    :param source: content of the original file, like a ``mmap.mmap``
+    :param stream: file like object opened in binary mode
+    :param replacements: ``(start, end, node, indent)`` tuples sorted by start, where start and end are the byte range
+                         to replace, and node the expression to write instead (``None`` to remove the range)
+    :param chunk_size: number of bytes to copy at once
+    :type chunk_size: ``int``
+
+    :Example:
+
+    >>> import io
+    >>> from kicad.util.sexpr import parse_string, splice
+    >>> source = b'(kicad_pcb\n  (net 0 "")\n  (net  1   GND)\n)\n'
+    >>> stream = io.BytesIO()
+    >>> splice(source, stream, [(26, 40, parse_string('(net 1 VCC)'), 2)])
+    >>> stream.getvalue()
+    b'(kicad_pcb\n  (net 0 "")\n  (net 1 VCC)\n)\n'
+    """
+    def copy(start, end):
+        for pos in range(start, end, chunk_size):
+            stream.write(source[pos:min(pos + chunk_size, end)])
+
+    pos = 0
+    for start, end, node, indent in replacements:
+        if start < pos:
+            raise ValueError("replacements have to be sorted and must not overlap")
+        copy(pos, start)
+        if node is not None:
+            stream.write(dumps(node, indent).encode('utf-8'))
+        pos = end
+    copy(pos, len(source))
+
+
+def _child_ranges(source, start, end):
+    # type: (bytes, int, int) -> List[tuple]
+    """Byte ranges of the lists which are direct children of the list at start:end"""
+    ranges = []
+    depth = 0
+    child_start = None
+    for match in _STRUCTURE_RE.finditer(source, start, end):
+        token = match.group()
+        if token == b'(':
+            depth += 1
+            if depth == 2:
+                child_start = match.start()
+        elif token == b')':
+            if depth == 2:
+                ranges.append((child_start, match.end()))
+            depth -= 1
+    return ranges
+
+
+def _indentation(source, start):
+    # type: (bytes, int) -> int
+    """Indentation of the line containing start"""
+    line = source[source.rfind(b'\n', 0, start) + 1:start]
+    return len(line) - len(line.lstrip(b' '))
+
+
+def _changed_ranges(source, start, end, node, original, parent):
+    # type: (bytes, int, int, list, list, Optional[str]) -> Optional[List[tuple]]
+    if [None if isinstance(i, list) else i for i in node] == [None if isinstance(i, list) else i for i in original]:
+        # same atoms and number of lists, only the lists which differ have to be written again
+        changes = []
+        children = [i for i in node if isinstance(i, list)]
+        originals = [i for i in original if isinstance(i, list)]
+        for (child_start, child_end), child, child_original in zip(_child_ranges(source, start, end), children,
+                                                                   originals):
+            if child != child_original:
+                child_changes = _changed_ranges(source, child_start, child_end, child, child_original, _keyword(node))
+                if child_changes is None:
+                    break
+                changes.extend(child_changes)
+        else:
+            return changes
+
+    if _layout(node, parent) != _layout(node):
+        return None  # the layout depends on the parent, which has to be written instead
+    return [(start, end, node, _indentation(source, start))]
+
+
+def changed_ranges(source, start, end, node, original):
+    # type: (bytes, int, int, list, list) -> List[tuple]
+    r"""Find the smallest expressions which have to be written again, to change an expression of a file
+
+    Lists are compared with the original expression child by child. As long as the atoms and the number of lists
+    are the same, only the lists which differ are written again, like a single pad of a module.
+
+    :param source: content of the original file, like a ``mmap.mmap``
+    :param start: byte offset where the expression starts
+    :type start: ``int``
+    :param end: byte offset where the expression ends
+    :type end: ``int``
+    :param node: modified expression
+    :type node: :class:`kicad.util.sexpr.SexprList`
+    :param original: expression parsed from ``source[start:end]``
+    :type original: :class:`kicad.util.sexpr.SexprList`
+
+    :return: ``list`` of ``(start, end, node, indent)`` tuples sorted by start, as expected by :func:`splice`
+
+    :Example:
+
+    >>> from kicad.util.sexpr import changed_ranges, parse_string
+    >>> source = b'(pad 1 smd rect (at 1 2) (size 1 1))'
+    >>> pad = parse_string(source.decode())
+    >>> pad[5][1] = 2.
+    >>> changed_ranges(source, 0, len(source), pad, parse_string(source.decode()))
+    [(25, 35, ['size', 2.0, '1'], 0)]
+    """
+    changes = _changed_ranges(source, start, end, node, original, None)
+    if changes is None:
+        return [(start, end, node, _indentation(source, start))]
+    return changes
@@ -17,7 +17,8 @@ import unittest
 import os
 
 import pcbnew as _pcbnew
-from kicad.pcbnew import Board
+from kicad.pcbnew import Board, Track, Via
+from kicad.util.point import Point2D
 
 
 TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
@@ -59,6 +60,13 @@ class BoardTests(unittest.TestCase):
         b2 = Board(bp.GetBoard())
         self.assertEqual(b1, b2)
 
+    def test_hash(self):
+        bp = _pcbnew.BOARD()
+        b1 = Board(bp)
+        b2 = Board(bp.GetBoard())
+        self.assertEqual(hash(b1), hash(b2))
+        self.assertEqual(1, len({b1, b2}))
+
     @unittest.skip("Board.from_editor() seems to return a new BOARD object")
     def test_eq_from_editor(self):
         b1 = Board.from_editor()
@@ -75,3 +83,56 @@ class BoardTests(unittest.TestCase):
         self.assertNotEqual(b1, None)
         self.assertNotEqual(b1, 1)
         self.assertNotEqual(b1, "foo")
+
+    def test_wrapper_cache(self):
+        b = Board.from_file(TEST_PROJECT_FILE)
+        self.assertFalse(b.wrapper_cache)
+        self.assertIsNot(next(b.modules), next(b.modules))
+
+        b.wrapper_cache = True
+        modules = list(b.modules)
+        self.assertEqual([id(m) for m in modules], [id(m) for m in b.modules])
+        pads = list(modules[0].pads)
+        self.assertEqual([id(p) for p in pads], [id(p) for p in modules[0].pads])
+
+        b.invalidate_cache()
+        self.assertIsNot(modules[0], next(b.modules))
+
+    def test_track_partition(self):
+        b = Board.from_file(TEST_PROJECT_FILE)
+        tracks = list(b.tracks)
+        vias = list(b.vias)
+        self.assertEqual(27, len(tracks))
+        self.assertEqual(4, len(vias))
+
+        track = _pcbnew.TRACK(b.get_native())
+        b.get_native().Add(track)
+        via = _pcbnew.VIA(b.get_native())
+        b.get_native().Add(via)
+        self.assertEqual(tracks, list(b.tracks))  # stale until the cache is invalidated
+        self.assertEqual(vias, list(b.vias))
+
+        b.invalidate_cache()
+        self.assertEqual(set(tracks) | {Track(track)}, set(b.tracks))
+        self.assertEqual(set(vias) | {Via(via)}, set(b.vias))
+        self.assertEqual(set(), set(b.tracks) & set(b.vias))  # every item is either a track or a via
+
+    def test_item_identity(self):
+        b = Board.from_file(TEST_PROJECT_FILE)
+        track = next(b.tracks)
+        same = Track(track.get_native())
+        self.assertIsNot(track, same)
+        self.assertEqual(track, same)
+        self.assertEqual(hash(track), hash(same))
+        self.assertEqual(1, len({track, same}))
+
+        natives = [_pcbnew.TRACK(b.get_native()) for _ in range(2)]
+        for native in natives:
+            native.SetStart(Point2D(1, 2).to_wxPoint())
+            native.SetEnd(Point2D(3, 4).to_wxPoint())
+            native.SetWidth(_pcbnew.FromMM(0.25))
+            native.SetLayer(_pcbnew.F_Cu)
+        t1, t2 = [Track(native) for native in natives]
+        self.assertEqual((t1.start, t1.end, t1.width, t1.layer), (t2.start, t2.end, t2.width, t2.layer))
+        self.assertNotEqual(t1, t2)  # same geometry, but different items
+        self.assertEqual(2, len({t1, t2}))
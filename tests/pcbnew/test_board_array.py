@@ -0,0 +1,69 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import os
+import unittest
+
+from kicad._native import _PCBNEW_AVAILABLE
+from kicad.pcbnew import Board
+from kicad.pcbnew.board import TRACK_ARRAY_DTYPE, VIA_ARRAY_DTYPE, numpy, _NUMPY_AVAILABLE
+from kicad.util.point import Point2D
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+
+@unittest.skipUnless(_PCBNEW_AVAILABLE, "pcbnew is not installed")
+@unittest.skipUnless(_NUMPY_AVAILABLE, "numpy is not installed")
+class BoardArrayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board.from_file(TEST_PROJECT_FILE)
+        self.reference = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+
+    def assertSameRows(self, expected, actual):
+        # pcbnew keeps the track list sorted by net, which is why the rows are compared independent of their order
+        expected = numpy.sort(expected)
+        actual = numpy.sort(actual)
+        for name in expected.dtype.names:
+            numpy.testing.assert_allclose(expected[name], actual[name], err_msg=name)
+
+    def test_track_array(self):
+        tracks = self.board.track_array()
+        self.assertEqual(numpy.dtype(TRACK_ARRAY_DTYPE), tracks.dtype)
+        self.assertEqual(27, len(tracks))
+
+        track = next(t for t in self.board.tracks if t.start == Point2D(152.595, 90.095))
+        row = tracks[numpy.isclose(tracks['start_x'], 152.595) & numpy.isclose(tracks['start_y'], 90.095)][0]
+        self.assertAlmostEqual(153.3, row['end_x'])  # mm, not nanometres
+        self.assertAlmostEqual(90.8, row['end_y'])
+        self.assertAlmostEqual(0.25, row['width'])
+        self.assertEqual(track.net.code, row['net_code'])
+        self.assertEqual(track.layer.id, row['layer_id'])
+
+        self.assertSameRows(self.reference.track_array(), tracks)
+
+    def test_via_array(self):
+        vias = self.board.via_array()
+        self.assertEqual(numpy.dtype(VIA_ARRAY_DTYPE), vias.dtype)
+        self.assertEqual(4, len(vias))
+
+        row = vias[numpy.isclose(vias['x'], 155) & numpy.isclose(vias['y'], 96)][0]
+        self.assertAlmostEqual(0.8, row['width'])
+        self.assertAlmostEqual(0.4, row['drill'])
+        self.assertEqual((0, 31), (row['top_layer_id'], row['bottom_layer_id']))
+
+        self.assertSameRows(self.reference.via_array(), vias)
@@ -0,0 +1,80 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import shutil
+import tempfile
+import unittest
+import os
+
+from kicad.pcbnew import Board, Layer
+from kicad.pcbnew.copperdiff import PolygonCache, diff_boards, merge_net, net_key
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+
+class CopperDiffTests(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board.from_file(TEST_PROJECT_FILE)
+        self.layer = Layer.from_name('F.Cu')
+
+    def test_same_board(self):
+        nodiff_poly, add_poly, sub_poly = diff_boards(self.board, self.board, self.layer)
+        self.assertNotEqual(0, len(nodiff_poly))
+        self.assertEqual(0, len(add_poly))
+        self.assertEqual(0, len(sub_poly))
+
+    def test_processes(self):
+        sequential = diff_boards(self.board, self.board, self.layer)
+        parallel = diff_boards(self.board, self.board, self.layer, processes=2)
+        self.assertEqual([len(p) for p in sequential], [len(p) for p in parallel])
+
+
+class PolygonCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.board = Board.from_file(TEST_PROJECT_FILE)
+        self.layer = Layer.from_name('F.Cu')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_net_key(self):
+        net = next(iter(self.board.net_index))
+        other_board = Board.from_file(TEST_PROJECT_FILE)
+        self.assertEqual(net_key(self.board, self.layer, net), net_key(other_board, self.layer, net.code))
+        self.assertNotEqual(net_key(self.board, self.layer, net), net_key(self.board, Layer.from_name('B.Cu'), net))
+
+    def test_get_put(self):
+        cache = PolygonCache(self.path)
+        net = next(iter(self.board.net_index))
+        key = net_key(self.board, self.layer, net)
+        self.assertIsNone(cache.get(key))
+
+        poly = merge_net(self.board, self.layer, net)
+        cache.put(key, poly)
+        self.assertEqual(poly.to_bytes(), cache.get(key).to_bytes())
+
+    def test_diff(self):
+        cache = PolygonCache(self.path)
+        uncached = diff_boards(self.board, self.board, self.layer)
+        cached = diff_boards(self.board, self.board, self.layer, cache=cache)
+        self.assertNotEqual([], os.listdir(self.path))
+        self.assertEqual([len(p) for p in uncached], [len(p) for p in cached])
+        cached = diff_boards(self.board, self.board, self.layer, cache=cache)
+        self.assertEqual([len(p) for p in uncached], [len(p) for p in cached])
@@ -0,0 +1,157 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from kicad._native import _PCBNEW_AVAILABLE, _pcbnew
+from kicad.pcbnew import Board
+from kicad.pcbnew.diff import BoardHashes, diff
+from kicad.pcbnew.drawsegment import Arc
+from kicad.pcbnew.text import Text
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+
+class DiffTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.board = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def modified_board(self, *replacements):
+        with io.open(TEST_PROJECT_FILE, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for old, new in replacements:
+            self.assertIn(old, content)
+            content = content.replace(old, new, 1)
+        path = os.path.join(self.path, 'modified.kicad_pcb')
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return Board.from_file(path, backend='sexpr')
+
+    def test_same_board(self):
+        other = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+        self.assertEqual(BoardHashes(self.board).root, BoardHashes(other).root)
+        self.assertFalse(diff(self.board, other))
+
+    def test_module_moved(self):
+        other = self.modified_board(('(at 155 92)', '(at 156 92)'))
+        old_hashes = BoardHashes(self.board)
+        new_hashes = BoardHashes(other)
+        self.assertNotEqual(old_hashes.root, new_hashes.root)
+        self.assertEqual(old_hashes.layer_hashes, new_hashes.layer_hashes)
+
+        changes = diff(self.board, other)
+        module_changes = [c for c in changes if c.kind == 'module']
+        self.assertEqual(1, len(module_changes))
+        self.assertEqual('modified', module_changes[0].change)
+        self.assertEqual('RN1', module_changes[0].new.reference)
+        self.assertEqual([], [c for c in changes if c.kind == 'pad'])  # the pads did not move relative to the module
+        self.assertEqual([], changes.added)
+        self.assertEqual([], changes.removed)
+
+    def test_module_rotated(self):
+        other = self.modified_board(('(at 155 92)', '(at 155 92 90)'))
+        changes = diff(self.board, other)
+        self.assertEqual(['module'], [c.kind for c in changes])
+        self.assertEqual(90, changes.modified[0].new.orientation)
+
+    def test_pad_moved(self):
+        other = self.modified_board(('(pad 1 smd rect (at -3.075 -1.905)', '(pad 1 smd rect (at -3.075 -2.005)'))
+        changes = diff(self.board, other)
+        self.assertEqual([('pad', (('SW1', 0), ('1', 0)))], [(c.kind, c.key) for c in changes])
+
+    def test_track_changed(self):
+        other = self.modified_board(('(end 153.3 90.8) (width 0.25)', '(end 153.3 90.8) (width 0.3)'))
+        changes = diff(self.board, other)
+        self.assertEqual(2, len(changes))
+        self.assertEqual(0.25, changes.removed[0].old.width)
+        self.assertEqual(0.3, changes.added[0].new.width)
+        self.assertEqual('track', changes.added[0].kind)
+
+    def test_footprint_changed(self):
+        other = self.modified_board(('(module Buttons_Switches_SMD:SW_DIP_x4_W6.15mm_Slide_Omron_A6H',
+                                     '(module Buttons_Switches_SMD:SW_DIP_x4_W6.15mm_Slide_Omron_A6S'))
+        changes = diff(self.board, other)
+        self.assertEqual(1, len(changes))
+        self.assertEqual('module', changes.modified[0].kind)
+        self.assertEqual('SW1', changes.modified[0].old.reference)
+
+    def test_zone_outline_changed(self):
+        zone = ('  (zone (net 0) (net_name "") (layer F.Cu) (tstamp 0) (hatch edge 0.508)\n'
+                '    (polygon\n'
+                '      (pts\n'
+                '        (xy 130 80) (xy 140 80) {}(xy 140 90) (xy 130 90)\n'
+                '      )\n'
+                '    )\n'
+                '  )\n')
+        circle = '  (gr_circle (center 155 99)'
+        old = self.modified_board((circle, zone.format('') + circle))
+        new = self.modified_board((circle, zone.format('(xy 135 85) ') + circle))  # same bounding box
+        self.assertEqual(next(old.zones).bounding_box, next(new.zones).bounding_box)
+
+        changes = diff(old, new)
+        self.assertEqual(2, len(changes))
+        self.assertEqual('zone', changes.removed[0].kind)
+        self.assertEqual(5, len(changes.added[0].new.outline))
+
+    def test_entries(self):
+        hashes = BoardHashes(self.board)
+        module_hash, _, module, pads = hashes.module_entry(('SW1', 0))
+        self.assertEqual(hashes.module_hashes[('SW1', 0)], module_hash)
+        self.assertEqual('SW1', module.reference)
+        self.assertEqual(8, len(pads))
+        self.assertIsNone(hashes.module_entry(('SW1', 1)))
+
+        self.assertEqual((None, {}), hashes.layer_entry(('track', 99)))
+
+    def test_drawing_changed(self):
+        other = self.modified_board(('(gr_text TEST (at 160.5 99)', '(gr_text TEXT (at 160.5 99)'),
+                                    ('(gr_arc (start 151 97) (end 152 97) (angle -90)',
+                                     '(gr_arc (start 151 97) (end 152 97) (angle -45)'))
+        changes = diff(self.board, other)
+        self.assertEqual(4, len(changes))
+        self.assertEqual(['drawing', 'drawing'], [c.kind for c in changes.added])
+        self.assertEqual(['TEXT'], [c.new.text for c in changes.added if isinstance(c.new, Text)])
+        self.assertEqual([-45], [c.new.angle for c in changes.added if isinstance(c.new, Arc)])
+        self.assertEqual(0, changes.unsupported_drawings)
+
+
+@unittest.skipUnless(_PCBNEW_AVAILABLE, "pcbnew is not installed")
+class DiffPcbnewTests(unittest.TestCase):
+
+    def test_unsupported_drawing(self):
+        old = Board.from_file(TEST_PROJECT_FILE)
+        new = Board.from_file(TEST_PROJECT_FILE)
+        curve = _pcbnew.DRAWSEGMENT(new.get_native())
+        curve.SetShape(_pcbnew.S_CURVE)
+        new.get_native().Add(curve)
+        text = next(d for d in new.drawings if isinstance(d, Text))
+        text.text = 'TEXT'
+
+        hashes = BoardHashes(new)
+        self.assertEqual(1, hashes.unsupported_drawings)
+        changes = diff(old, new)
+        self.assertEqual(1, changes.unsupported_drawings)
+        self.assertEqual(['TEXT'], [c.new.text for c in changes.added])  # the other drawings are still compared
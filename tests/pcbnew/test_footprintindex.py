@@ -0,0 +1,125 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from kicad.pcbnew import FootprintIndex
+
+
+SOIC_8 = u"""(module SOIC-8 (layer F.Cu) (tedit 5A02F2D3)
+  (descr "8-Lead Plastic Small Outline, 3.9mm body")
+  (tags "SOIC SO")
+  (fp_line (start -3.7 -2.7) (end 3.7 -2.7) (layer F.CrtYd) (width 0.05))
+  (fp_line (start 3.7 -2.7) (end 3.7 2.7) (layer F.CrtYd) (width 0.05))
+  (fp_line (start 3.7 2.7) (end -3.7 2.7) (layer F.CrtYd) (width 0.05))
+  (fp_line (start -3.7 2.7) (end -3.7 -2.7) (layer F.CrtYd) (width 0.05))
+  (fp_line (start -2 -2.5) (end 2 -2.5) (layer F.SilkS) (width 0.12))
+{pads})
+"""
+
+R_0603 = u"""(module R_0603 (layer F.Cu) (tedit 5A02F2D3)
+  (descr "Resistor SMD 0603")
+  (tags resistor)
+  (fp_poly (pts (xy -1.5 -0.75) (xy 1.5 -0.75) (xy 1.5 0.75) (xy -1.5 0.75)) (layer F.CrtYd) (width 0.05))
+  (pad 1 smd rect (at -0.75 0) (size 0.8 0.95) (layers F.Cu F.Paste F.Mask))
+  (pad 2 smd rect (at 0.75 0) (size 0.8 0.95) (layers F.Cu F.Paste F.Mask))
+)
+"""
+
+
+def _soic_pads():
+    pads = []
+    for i in range(4):
+        y = -1.905 + i * 1.27
+        pads.append(u'  (pad {} smd rect (at -2.7 {}) (size 1.5 0.6) (layers F.Cu F.Paste F.Mask))'.format(i + 1, y))
+        pads.append(u'  (pad {} smd rect (at 2.7 {}) (size 1.5 0.6) (layers F.Cu F.Paste F.Mask))'.format(8 - i, -y))
+    return u'\n'.join(pads)
+
+
+class FootprintIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.library = os.path.join(self.path, 'test.pretty')
+        os.mkdir(self.library)
+        self.index_path = os.path.join(self.path, 'footprints.idx')
+        self._write('SOIC-8', SOIC_8.format(pads=_soic_pads()))
+        self._write('R_0603', R_0603)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _write(self, name, content):
+        with io.open(os.path.join(self.library, name + '.kicad_mod'), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_update(self):
+        index = FootprintIndex(self.index_path)
+        self.assertEqual(2, index.update([self.library]))
+        self.assertEqual(2, len(index))
+        self.assertEqual([os.path.abspath(self.library)], index.libraries)
+
+        soic = index.search(keyword='soic')[0]
+        self.assertEqual('SOIC-8', soic.name)
+        self.assertEqual('8-Lead Plastic Small Outline, 3.9mm body', soic.description)
+        self.assertEqual(['SOIC', 'SO'], soic.keywords)
+        self.assertEqual(8, soic.pad_count)
+        self.assertEqual((-3.7, -2.7, 3.7, 2.7), soic.courtyard)
+        self.assertAlmostEqual(1.27, soic.pitch)
+
+        resistor = index.search(keyword='resistor')[0]
+        self.assertEqual((-1.5, -0.75, 1.5, 0.75), resistor.courtyard)
+        self.assertAlmostEqual(1.5, resistor.pitch)
+
+    def test_update_incremental(self):
+        index = FootprintIndex(self.index_path)
+        index.update([self.library])
+        self.assertEqual(0, index.update([self.library]))
+
+        os.remove(os.path.join(self.library, 'R_0603.kicad_mod'))
+        self._write('R_0805', R_0603.replace('R_0603', 'R_0805'))
+        self.assertEqual(1, index.update([self.library]))
+        self.assertEqual(['R_0805', 'SOIC-8'], [i.name for i in index.search(library=self.library)])
+
+    def test_save_load(self):
+        index = FootprintIndex(self.index_path)
+        index.update([self.library])
+        index.save()
+
+        loaded = FootprintIndex(self.index_path)
+        self.assertEqual(2, len(loaded))
+        self.assertEqual(0, loaded.update([self.library]))
+        self.assertEqual((-3.7, -2.7, 3.7, 2.7), loaded.search(pad_count=8)[0].courtyard)
+
+    def test_search(self):
+        index = FootprintIndex(self.index_path)
+        index.update([self.library])
+        self.assertEqual(['SOIC-8'], [i.name for i in index.search(pad_count=8)])
+        self.assertEqual(['R_0603'], [i.name for i in index.search(max_width=5)])
+        self.assertEqual(['R_0603', 'SOIC-8'], [i.name for i in index.search(max_height=6)])
+        self.assertEqual(['SOIC-8'], [i.name for i in index.search(pitch=1.27)])
+        self.assertEqual([], index.search(keyword='SOIC', pad_count=2))
+        self.assertEqual([], index.search(keyword='not_existing'))
+
+    def test_remove(self):
+        index = FootprintIndex(self.index_path)
+        index.update([self.library])
+        index.remove(self.library)
+        self.assertEqual(0, len(index))
+        self.assertRaises(KeyError, index.remove, self.library)
@@ -0,0 +1,76 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import pickle
+import unittest
+
+from kicad.pcbnew import Layer, LayerSet
+
+
+class LayerTests(unittest.TestCase):
+
+    def test_interned(self):
+        self.assertIs(Layer.from_name('F.Cu'), Layer.from_id(0))
+        self.assertIs(Layer(31), Layer.from_name('B.Cu'))
+
+    def test_immutable(self):
+        layer = Layer.from_id(0)
+        with self.assertRaises(AttributeError):
+            layer.id = 31
+
+    def test_pickle(self):
+        layer = Layer.from_name('B.Cu')
+        self.assertIs(layer, pickle.loads(pickle.dumps(layer)))
+
+
+class LayerSetTests(unittest.TestCase):
+
+    def setUp(self):
+        self.f_cu = Layer.from_name('F.Cu')
+        self.b_cu = Layer.from_name('B.Cu')
+        self.f_mask = Layer.from_name('F.Mask')
+
+    def test_from_layers(self):
+        s = LayerSet.from_layers([self.f_cu, self.b_cu.id])
+        self.assertEqual((1 << self.f_cu.id) | (1 << self.b_cu.id), s.mask)
+        self.assertEqual(s, LayerSet.from_mask(s.mask))
+        self.assertEqual([self.f_cu, self.b_cu], list(s))
+
+    def test_contains(self):
+        s = LayerSet.from_layers([self.f_cu, self.f_mask])
+        self.assertIn(self.f_cu, s)
+        self.assertIn(self.f_mask.id, s)
+        self.assertNotIn(self.b_cu, s)
+
+    def test_set_algebra(self):
+        front = LayerSet.from_layers([self.f_cu, self.f_mask])
+        copper = LayerSet.from_layers([self.f_cu, self.b_cu])
+
+        self.assertEqual(LayerSet.from_layers([self.f_cu, self.b_cu, self.f_mask]), front | copper)
+        self.assertEqual(LayerSet.from_layers([self.f_cu]), front & copper)
+        self.assertEqual(LayerSet.from_layers([self.f_mask]), front - copper)
+        self.assertEqual(front.union(copper), copper.union(front))
+
+    def test_len(self):
+        self.assertEqual(0, len(LayerSet.from_mask(0)))
+        self.assertFalse(LayerSet.from_mask(0))
+        self.assertEqual(3, len(LayerSet.from_layers([self.f_cu, self.b_cu, self.f_mask])))
+
+    def test_hash(self):
+        s1 = LayerSet.from_layers([self.f_cu, self.b_cu])
+        s2 = LayerSet.from_layers([self.b_cu, self.f_cu])
+        self.assertEqual(hash(s1), hash(s2))
+        self.assertEqual(1, len({s1, s2}))
+        self.assertNotEqual(s1, LayerSet.from_layers([self.f_cu]))
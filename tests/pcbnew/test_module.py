@@ -0,0 +1,87 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pcbnew as _pcbnew
+from kicad.pcbnew import FootprintLibrary, Module
+
+
+def _create_module(name):
+    module = Module(_pcbnew.MODULE(None))
+    module.value = name
+    module.get_native().SetFPID(_pcbnew.LIB_ID("", name))
+    return module
+
+
+class FootprintLibraryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'test.pretty')
+        os.mkdir(self.path)
+        for name in ('A', 'B', 'C'):
+            _create_module(name).to_library(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def test_names(self):
+        lib = FootprintLibrary(self.path)
+        self.assertEqual(['A', 'B', 'C'], lib.names)
+        self.assertEqual(3, len(lib))
+        self.assertIn('B', lib)
+        self.assertNotIn('D', lib)
+
+    def test_index_updated(self):
+        lib = FootprintLibrary(self.path)
+        self.assertEqual(3, len(lib))
+        lib.save(_create_module('D'))
+        self.assertIn('D', lib)
+
+    def test_load(self):
+        lib = FootprintLibrary(self.path)
+        first = lib.load('A')
+        second = lib.load('A')
+        self.assertEqual('A', first.value)
+        self.assertNotEqual(first, second)  # every load returns its own copy
+
+        first.value = 'changed'
+        self.assertEqual('A', lib.load('A').value)
+
+    def test_save_evicts_cache(self):
+        lib = FootprintLibrary(self.path)
+        self.assertEqual('A', lib.load('A').value)
+
+        path = os.path.join(self.path, 'A.kicad_mod')
+        mtime = os.stat(path).st_mtime
+        module = _create_module('A')
+        module.value = 'saved'
+        lib.save(module)
+        os.utime(path, (mtime, mtime))  # saved within the same tick of the file system clock
+        self.assertEqual('saved', lib.load('A').value)
+
+    def test_load_not_existing(self):
+        self.assertRaises(KeyError, FootprintLibrary(self.path).load, 'D')
+
+    def test_cache_size(self):
+        lib = FootprintLibrary(self.path, cache_size=2)
+        for name in ('A', 'B', 'C'):
+            lib.load(name)
+        self.assertEqual(['B', 'C'], list(lib._cache))
+        lib.load('B')
+        self.assertEqual(['C', 'B'], list(lib._cache))
@@ -0,0 +1,410 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import math
+import unittest
+import os
+import shutil
+import stat
+import tempfile
+
+from kicad.pcbnew import Board, Layer
+from kicad.pcbnew.board import _NUMPY_AVAILABLE
+from kicad.pcbnew.drawsegment import Arc, Circle, Line, Polygon
+from kicad.pcbnew.sexprboard import SexprTrack, _copy
+from kicad.pcbnew.text import Text
+from kicad.util.point import Point2D
+from kicad.util.sexpr import dumps, parse_string
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+# first pad of the first module of the test project
+FIRST_PAD = b'(pad 1 smd rect (at -3.075 -1.905) (size 1.25 0.76) (layers F.Cu F.Mask)\n      (net 10 VDD))'
+
+
+class SexprBoardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+
+    def test_from_file(self):
+        self.assertEqual(TEST_PROJECT_FILE, self.board.filepath)
+        self.assertEqual(Point2D(133.5, 86.5), self.board.aux_origin)
+        self.assertEqual(Point2D(133.5, 86.5), self.board.grid_origin)
+
+    def test_layer_names(self):
+        self.assertIs(Layer.from_name('B.Cu'), self.board.layer_from_name('B.Cu'))
+        self.assertEqual('F.Cu', self.board.layer_name(Layer.from_id(0)))
+        self.assertRaises(KeyError, self.board.layer_from_name, 'not_existing')
+
+    def test_from_file_not_existing(self):
+        self.assertRaises(IOError, Board.from_file, os.path.join(TEST_PROJECT_DIR, 'not_existing.kicad_pcb'),
+                          backend='sexpr')
+
+    def test_from_file_invalid(self):
+        self.assertRaises(IOError, Board.from_file, os.path.join(TEST_PROJECT_DIR, 'testproject.pro'),
+                          backend='sexpr')
+
+    def test_modules(self):
+        modules = {m.reference: m for m in self.board.modules}
+        self.assertEqual(8, len(modules))
+
+        d4 = modules['D4']
+        self.assertEqual(Point2D(160, 89), d4.position)
+        self.assertEqual('LED', d4.value)
+        self.assertEqual('LED 0805 smd package', d4.description)
+        self.assertFalse(d4.is_locked)
+        self.assertTrue(modules['REF***'].is_locked)
+
+        pads = {p.name: p for p in d4.pads}
+        self.assertEqual(Point2D(158.9, 89), pads['2'].position)  # module is rotated by 180 degree
+        self.assertEqual(Point2D(1.2, 1.2), pads['2'].size)
+        self.assertEqual(Point2D(0, 0), pads['2'].drill_size)
+        self.assertEqual('Net-(D4-Pad2)', pads['2'].net.name)
+        self.assertIn(Layer.from_name('F.Paste'), pads['2'].layers)
+
+        j1_pads = {p.name: p for p in modules['J1'].pads}
+        self.assertEqual(Point2D(1.2, 1.2), j1_pads['1'].drill_size)
+        self.assertIn(Layer.from_name('B.Cu'), j1_pads['1'].layers)  # "*.Cu"
+
+    def test_tracks(self):
+        tracks = list(self.board.tracks)
+        self.assertEqual(27, len(tracks))
+        self.assertEqual(Point2D(152.595, 90.095), tracks[0].start)
+        self.assertEqual(Point2D(153.3, 90.8), tracks[0].end)
+        self.assertEqual(0.25, tracks[0].width)
+        self.assertEqual('Net-(RN1-Pad1)', tracks[0].net.name)
+        self.assertEqual(Layer.from_name('F.Cu'), tracks[0].layer)
+
+    def test_vias(self):
+        vias = list(self.board.vias)
+        self.assertEqual(4, len(vias))
+        self.assertEqual(Point2D(155, 96), vias[0].position)
+        self.assertEqual(0.4, vias[0].drill)
+        self.assertEqual(0.8, vias[0].width)
+        self.assertEqual('GND', vias[0].net.name)
+        self.assertIn(Layer.from_name('In1.Cu'), vias[0].layers)
+
+    def test_zones(self):
+        zones = list(self.board.zones)
+        self.assertEqual(4, len(zones))
+        self.assertEqual(['GND', 'VDD', 'GND', ''], [z.net.name for z in zones])
+        self.assertEqual([0, 1, 0, 0], [z.priority for z in zones])
+        self.assertEqual(Layer.from_name('B.Cu'), zones[2].layer)
+
+    def test_drawings(self):
+        drawings = list(self.board.drawings)
+        self.assertEqual(15, len(drawings))
+        lines = [d for d in drawings if isinstance(d, Line)]
+        self.assertEqual(6, len(lines))
+        self.assertEqual(Point2D(133.5, 95), lines[0].start)
+        self.assertEqual(Point2D(133.5, 87.5), lines[0].end)
+        self.assertEqual(0.15, lines[0].width)
+        self.assertEqual(Layer.from_name('Edge.Cuts'), lines[0].layer)
+
+        arc = next(d for d in drawings if isinstance(d, Arc))
+        self.assertEqual(Point2D(163.5, 87.5), arc.center)
+        self.assertEqual(Point2D(164.5, 87.5), arc.start)
+        self.assertEqual(-90, arc.angle)
+
+        circle = next(d for d in drawings if isinstance(d, Circle))
+        self.assertEqual(Point2D(155, 99), circle.center)
+        self.assertEqual(3, circle.diameter)
+
+        polygon = next(d for d in drawings if isinstance(d, Polygon))
+        self.assertEqual(4, len(polygon.points))
+        self.assertEqual(Layer.from_name('B.SilkS'), polygon.layer)
+
+        text = next(d for d in drawings if isinstance(d, Text))
+        self.assertEqual('TEST', text.text)
+        self.assertEqual(Point2D(160.5, 99), text.position)
+        self.assertEqual(Point2D(1.5, 1.5), text.text_size)
+        self.assertEqual(0.3, text.thickness)
+
+    def test_multi_layer_zone(self):
+        path = tempfile.mkdtemp()
+        try:
+            with io.open(TEST_PROJECT_FILE, 'r', encoding='utf-8') as f:
+                content = f.read()
+            zone = (u'  (zone (net 0) (net_name "") (layers F.Cu B.Cu) (tstamp 0) (hatch edge 0.508)\n'
+                    u'    (polygon (pts (xy 130 80) (xy 140 80) (xy 140 90)))\n'
+                    u'  )\n')
+            filename = os.path.join(path, 'board.kicad_pcb')
+            with io.open(filename, 'w', encoding='utf-8') as f:
+                f.write(content.replace(u'  (gr_circle ', zone + u'  (gr_circle ', 1))
+
+            zone = next(z for z in Board.from_file(filename, backend='sexpr').zones if z.priority == 0 and
+                        Layer.from_name('B.Cu') in z.layers and Layer.from_name('F.Cu') in z.layers)
+            self.assertEqual(Layer.from_name('F.Cu'), zone.layer)
+        finally:
+            shutil.rmtree(path)
+
+    def test_nets(self):
+        nets = list(self.board.nets)
+        self.assertEqual(11, len(nets))
+        self.assertEqual('GND', nets[9].name)
+        self.assertEqual(9, nets[9].code)
+
+    def test_net_index(self):
+        index = self.board.net_index
+        self.assertIs(index, self.board.net_index)
+
+        vdd = index.net(10)
+        self.assertEqual('VDD', vdd.name)
+        self.assertIn(vdd, index)
+        self.assertIn(10, index)
+        self.assertEqual(7, index.count(vdd))
+        self.assertEqual(0, index.track_length(vdd))
+
+        net = index.net(1)
+        tracks = [t for t in self.board.tracks if t.net == net]
+        pads = [p for m in self.board.modules for p in m.pads if p.net == net]
+        self.assertEqual(tracks, index.tracks(net))
+        self.assertEqual(pads, index.pads(1))
+        self.assertEqual(3, len(tracks))
+        self.assertEqual(len(tracks) + len(index.vias(net)) + len(index.zones(net)) + len(pads), index.count(net))
+        self.assertEqual(index.count(net), len(index.items(net)))
+        self.assertAlmostEqual(sum(math.hypot(t.end.x - t.start.x, t.end.y - t.start.y) for t in tracks),
+                               index.track_length(net))
+
+        self.assertEqual([], index.tracks(1000))
+        self.assertEqual(0, index.count(1000))
+
+    def test_bounding_box(self):
+        track = next(self.board.tracks)
+        width = track.width
+        bbox_min, bbox_max = track.bounding_box
+        self.assertAlmostEqual(min(track.start.x, track.end.x) - width / 2, bbox_min.x)
+        self.assertAlmostEqual(max(track.start.y, track.end.y) + width / 2, bbox_max.y)
+
+        via = next(self.board.vias)
+        self.assertEqual((via.position - via.width / 2, via.position + via.width / 2), via.bounding_box)
+
+    def test_bounding_box_drawings(self):
+        drawings = list(self.board.drawings)
+        line = next(d for d in drawings if isinstance(d, Line))
+        self.assertEqual((Point2D(133.425, 87.425), Point2D(133.575, 95.075)), line.bounding_box)
+
+        circle = next(d for d in drawings if isinstance(d, Circle))
+        self.assertEqual((Point2D(153.425, 97.425), Point2D(156.575, 100.575)), circle.bounding_box)
+
+        arc = next(d for d in drawings if isinstance(d, Arc))
+        self.assertEqual((Point2D(162.425, 86.425), Point2D(164.575, 88.575)), arc.bounding_box)
+
+        text = next(d for d in drawings if isinstance(d, Text))
+        bbox_min, bbox_max = text.bounding_box
+        self.assertTrue(bbox_min.x < text.position.x - 3 and bbox_max.x > text.position.x + 3)  # 4 characters
+
+    def test_bounding_box_module(self):
+        module = next(self.board.modules)
+        bbox_min, bbox_max = module.bounding_box
+        for pad in module.pads:
+            pad_min, pad_max = pad.bounding_box
+            self.assertTrue(bbox_min.x <= pad_min.x and bbox_min.y <= pad_min.y)
+            self.assertTrue(bbox_max.x >= pad_max.x and bbox_max.y >= pad_max.y)
+        # the courtyard is the outermost graphic of the switch, which is 8 x 7.2 mm and has a width of 0.05 mm
+        self.assertAlmostEqual(module.position.x + 4.025, bbox_max.x)
+        self.assertAlmostEqual(module.position.y + 3.625, bbox_max.y)
+
+    def test_spatial_index(self):
+        f_cu = Layer.from_name('F.Cu')
+        index = self.board.spatial_index(layer=f_cu)
+        items = [t for t in self.board.tracks if f_cu in t.layers] + \
+                [p for m in self.board.modules for p in m.pads if f_cu in p.layers] + \
+                [v for v in self.board.vias] + [z for z in self.board.zones if f_cu in z.layers]
+        self.assertEqual(len(items), len(index))
+
+        pad = next(next(self.board.modules).pads)
+        self.assertIn(pad, index.query_point(pad.position))
+        self.assertIn(pad, index.nearest(pad.position, k=3))
+
+    def test_eq(self):
+        t1 = list(self.board.tracks)
+        t2 = list(self.board.tracks)
+        self.assertEqual(t1[0], t2[0])
+        self.assertNotEqual(t1[0], t2[1])
+        self.assertEqual(1, len({t1[0], t2[0]}))
+
+        node = t1[0].get_native()
+        copy = SexprTrack(_copy(node), self.board)  # same content, but a different item
+        self.assertEqual(node, copy.get_native())
+        self.assertNotEqual(t1[0], copy)
+        self.assertEqual(2, len({t1[0], copy}))
+
+    @unittest.skipIf(not _NUMPY_AVAILABLE, "numpy is not installed")
+    def test_track_array(self):
+        tracks = self.board.track_array()
+        self.assertEqual(27, len(tracks))
+        self.assertEqual((152.595, 90.095, 153.3, 90.8, 0.25, 1, 0), tuple(tracks[0]))
+        self.assertAlmostEqual(0.25 * 27, tracks['width'].sum())
+
+    @unittest.skipIf(not _NUMPY_AVAILABLE, "numpy is not installed")
+    def test_via_array(self):
+        vias = self.board.via_array()
+        self.assertEqual(4, len(vias))
+        self.assertEqual((155., 96., 0.8, 0.4, 9, 0, 31), tuple(vias[0]))
+
+
+class LazySexprBoardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board.from_file(TEST_PROJECT_FILE, backend='lazy')
+        self.reference = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+
+    def _assert_same_items(self, board):
+        self.assertEqual([m.reference for m in self.reference.modules], [m.reference for m in board.modules])
+        self.assertEqual([t.start for t in self.reference.tracks], [t.start for t in board.tracks])
+        self.assertEqual([v.position for v in self.reference.vias], [v.position for v in board.vias])
+        self.assertEqual([z.priority for z in self.reference.zones], [z.priority for z in board.zones])
+        self.assertEqual([d.layer for d in self.reference.drawings], [d.layer for d in board.drawings])
+        self.assertEqual([(n.code, n.name) for n in self.reference.nets], [(n.code, n.name) for n in board.nets])
+        self.assertEqual(self.reference.layers_enabled, board.layers_enabled)
+
+    def test_items(self):
+        self._assert_same_items(self.board)
+
+    def test_parsed_on_demand(self):
+        self.assertNotIn('module', self.board._parsed)
+        list(self.board.modules)
+        self.assertIn('module', self.board._parsed)
+        self.assertNotIn('zone', self.board._parsed)
+        self.assertNotIn('gr_line', self.board._parsed)
+
+    def test_section_offsets(self):
+        offsets = self.board.section_offsets
+        self.assertEqual(8, len(offsets['module']))
+        self.assertEqual(6, len(offsets['gr_line']))
+        with io.open(TEST_PROJECT_FILE, 'rb') as f:
+            content = f.read()
+        start, end = offsets['segment'][0]
+        self.assertTrue(content[start:end].startswith(b'(segment '))
+        self.assertTrue(content[start:end].endswith(b')'))
+
+    def test_not_formatted_by_kicad(self):
+        path = tempfile.mkdtemp()
+        try:
+            with io.open(TEST_PROJECT_FILE, 'r', encoding='utf-8') as f:
+                content = ' '.join(f.read().split())  # everything on a single line
+            filename = os.path.join(path, 'board.kicad_pcb')
+            with io.open(filename, 'w', encoding='utf-8') as f:
+                f.write(content)
+            self._assert_same_items(Board.from_file(filename, backend='lazy'))
+        finally:
+            shutil.rmtree(path)
+
+    def test_invalid(self):
+        self.assertRaises(IOError, Board.from_file, os.path.join(TEST_PROJECT_DIR, 'testproject.pro'),
+                          backend='lazy')
+
+
+class LazySexprBoardSaveTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.filename = os.path.join(self.path, 'board.kicad_pcb')
+        shutil.copyfile(TEST_PROJECT_FILE, self.filename)
+        self.board = Board.from_file(self.filename, backend='lazy')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _read(self, filename):
+        with io.open(filename, 'rb') as f:
+            return f.read()
+
+    def test_unmodified(self):
+        list(self.board.modules)
+        saved = os.path.join(self.path, 'saved.kicad_pcb')
+        self.board.to_file(saved)
+        self.assertEqual(self._read(self.filename), self._read(saved))
+
+    def test_incremental(self):
+        pad = list(list(self.board.modules)[0].pads)[0]
+        pad.size = Point2D(1.5, 0.76)
+
+        saved = os.path.join(self.path, 'saved.kicad_pcb')
+        self.board.to_file(saved)
+
+        # only the size of the pad is written again, everything else of the module keeps its bytes
+        original = self._read(self.filename)
+        self.assertIn(FIRST_PAD, original)
+        expected = original.replace(FIRST_PAD, FIRST_PAD.replace(b'(size 1.25 0.76)', b'(size 1.5 0.76)'), 1)
+        self.assertEqual(expected, self._read(saved))
+
+        reloaded_pad = list(list(Board.from_file(saved, backend='lazy').modules)[0].pads)[0]
+        self.assertEqual(Point2D(1.5, 0.76), reloaded_pad.size)
+
+    def test_incremental_pad_rewritten(self):
+        pad = list(list(self.board.modules)[0].pads)[0]
+        pad.size = Point2D(2.5, 1.25)
+        pad.drill_size = Point2D(0.8, 1.2)  # adds a list to the pad, which is written again as a whole
+
+        saved = os.path.join(self.path, 'saved.kicad_pcb')
+        self.board.to_file(saved)
+
+        expected = self._read(self.filename).replace(
+            FIRST_PAD, b'(pad 1 smd rect (at -3.075 -1.905) (size 2.5 1.25) (drill oval 0.8 1.2) (layers F.Cu F.Mask)\n'
+                       b'      (net 10 VDD))', 1)
+        self.assertEqual(expected, self._read(saved))
+
+        reloaded_pad = list(list(Board.from_file(saved, backend='lazy').modules)[0].pads)[0]
+        self.assertEqual(Point2D(2.5, 1.25), reloaded_pad.size)
+        self.assertEqual(Point2D(0.8, 1.2), reloaded_pad.drill_size)
+
+    def test_layout_of_kicad(self):
+        original = self._read(self.filename)
+        for name, ranges in self.board.section_offsets.items():
+            for start, end in ranges:
+                text = original[start:end].decode('utf-8')
+                self.assertEqual(text, dumps(parse_string(text), 2))
+
+    def test_save_own_file(self):
+        os.chmod(self.filename, 0o644)
+        pad = list(list(self.board.modules)[0].pads)[0]
+        pad.size = Point2D(2.5, 1.25)
+        self.board.to_file(self.filename)
+        self.assertEqual(Point2D(2.5, 1.25), list(list(self.board.modules)[0].pads)[0].size)
+        self.assertEqual(0o644, stat.S_IMODE(os.stat(self.filename).st_mode))
+
+    def test_sexpr_backend(self):
+        board = Board.from_file(self.filename, backend='sexpr')
+        pad = list(next(board.modules).pads)[0]
+        pad.size = Point2D(1.5, 0.76)
+
+        saved = os.path.join(self.path, 'saved.kicad_pcb')
+        board.to_file(saved)
+        expected = self._read(self.filename).replace(
+            FIRST_PAD, FIRST_PAD.replace(b'(size 1.25 0.76)', b'(size 1.5 0.76)'), 1)
+        self.assertEqual(expected, self._read(saved))
+
+        # the sections which are not kept in memory cannot be copied from a file which was changed in the meantime
+        content = self._read(self.filename)
+        start = content.index(b'\n  (segment ')
+        with io.open(self.filename, 'wb') as f:
+            f.write(content[:start] + content[content.index(b'\n  (', start + 1):])
+        self.assertRaises(IOError, board.to_file, saved)
+
+    def test_not_incremental(self):
+        saved = os.path.join(self.path, 'saved.kicad_pcb')
+        self.board.to_file(saved, incremental=False)
+        self.assertNotEqual(self._read(self.filename), self._read(saved))
+
+        saved_board = Board.from_file(saved, backend='lazy')
+        self.assertEqual([m.reference for m in self.board.modules], [m.reference for m in saved_board.modules])
+        self.assertEqual([t.end for t in self.board.tracks], [t.end for t in saved_board.tracks])
+        self.assertEqual(sorted(self.board.section_offsets), sorted(saved_board.section_offsets))
@@ -0,0 +1,83 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from kicad.pcbnew import Board
+from kicad.pcbnew.board import _NUMPY_AVAILABLE
+from kicad.pcbnew.snapshot import BoardSnapshot
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+
+@unittest.skipUnless(_NUMPY_AVAILABLE, "numpy is required for snapshots")
+class BoardSnapshotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.path, 'board.snap')
+        self.board = Board.from_file(TEST_PROJECT_FILE, backend='sexpr')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_arrays(self):
+        with self.board.snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual(self.board.track_array().tolist(), snapshot.track_array().tolist())
+            self.assertEqual(self.board.via_array().tolist(), snapshot.via_array().tolist())
+            self.assertFalse(snapshot.track_array().flags.writeable)
+
+    def test_modules(self):
+        modules = list(self.board.modules)
+        with self.board.snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual([m.reference for m in modules], snapshot.references)
+
+            module_array = snapshot.module_array()
+            pad_array = snapshot.pad_array()
+            for module, row in zip(modules, module_array):
+                self.assertEqual(module.value, snapshot.string(row['value']))
+                self.assertAlmostEqual(module.position.x, row['x'])
+                pads = pad_array[row['first_pad']:row['first_pad'] + row['pad_count']]
+                self.assertEqual([p.name for p in module.pads], [snapshot.string(idx) for idx in pads['name']])
+                self.assertEqual([p.net.code for p in module.pads], pads['net_code'].tolist())
+                self.assertEqual([p.layers.mask for p in module.pads], pads['layer_mask'].tolist())
+
+    def test_nets(self):
+        with self.board.snapshot(self.snapshot_path) as snapshot:
+            self.assertEqual({net.code: net.name for net in self.board.nets}, snapshot.net_names)
+
+    def test_open_invalid(self):
+        with open(self.snapshot_path, 'wb') as f:
+            f.write(b'not a snapshot')
+        self.assertRaises(ValueError, BoardSnapshot.open, self.snapshot_path)
+
+    def test_open_other_version(self):
+        BoardSnapshot.write(self.board, self.snapshot_path)
+        with open(self.snapshot_path, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('<I', 999))
+        self.assertRaises(ValueError, BoardSnapshot.open, self.snapshot_path)
+
+    def test_close_with_arrays(self):
+        snapshot = self.board.snapshot(self.snapshot_path)
+        tracks = snapshot.track_array()
+        snapshot.close()
+        self.assertEqual(len(list(self.board.tracks)), len(tracks))
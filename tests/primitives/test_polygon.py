@@ -0,0 +1,105 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import pickle
+import unittest
+
+import pcbnew as _pcbnew
+from kicad.primitives import PolygonSet
+from kicad.util.point import PointArray
+
+
+def create_square(poly_set, x, y, size, hole_size=0):
+    poly_set.NewOutline()
+    for px, py in [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]:
+        poly_set.Append(_pcbnew.FromMM(px), _pcbnew.FromMM(py))
+    if hole_size:
+        poly_set.NewHole()
+        for px, py in [(x + 1, y + 1), (x + 1 + hole_size, y + 1), (x + 1 + hole_size, y + 1 + hole_size)]:
+            poly_set.Append(_pcbnew.FromMM(px), _pcbnew.FromMM(py), -1, 0)
+
+
+class PolygonSetTests(unittest.TestCase):
+
+    def setUp(self):
+        native = _pcbnew.SHAPE_POLY_SET()
+        create_square(native, 0, 0, 10, hole_size=2)
+        create_square(native, 20, 0, 5)
+        self.poly_set = PolygonSet(native)
+
+    def test_len(self):
+        self.assertEqual(2, len(self.poly_set))
+        self.assertEqual(0, len(PolygonSet()))
+
+    def test_outline(self):
+        self.assertEqual(PointArray([[0, 0], [10, 0], [10, 10], [0, 10]]), self.poly_set.outline(0))
+        self.assertEqual(PointArray([[20, 0], [25, 0], [25, 5], [20, 5]]), self.poly_set.outline(1))
+
+    def test_holes(self):
+        self.assertEqual([PointArray([[1, 1], [3, 1], [3, 3]])], self.poly_set.holes(0))
+        self.assertEqual([], self.poly_set.holes(1))
+
+    def test_iter(self):
+        polygons = list(self.poly_set)
+        self.assertEqual(2, len(polygons))
+        self.assertEqual(self.poly_set.outline(0), polygons[0].outline)
+        self.assertEqual(self.poly_set.holes(0), polygons[0].holes)
+        self.assertEqual([], polygons[1].holes)
+
+    def test_pickle(self):
+        restored = pickle.loads(pickle.dumps(self.poly_set))
+        self.assertEqual(2, len(restored))
+        self.assertEqual(self.poly_set.outline(0), restored.outline(0))
+        self.assertEqual(self.poly_set.holes(0), restored.holes(0))
+
+    def test_bytes(self):
+        restored = PolygonSet.from_bytes(self.poly_set.to_bytes())
+        self.assertEqual(self.poly_set.outline(1), restored.outline(1))
+        self.assertEqual(self.poly_set.holes(0), restored.holes(0))
+        self.assertEqual(0, len(PolygonSet.from_bytes(PolygonSet().to_bytes())))
+        self.assertRaises(ValueError, PolygonSet.from_bytes, self.poly_set.to_bytes()[:-1])
+
+
+class UnionAllTests(unittest.TestCase):
+
+    @staticmethod
+    def create_squares(positions, size):
+        polysets = []
+        for x, y in positions:
+            native = _pcbnew.SHAPE_POLY_SET()
+            create_square(native, x, y, size)
+            polysets.append(PolygonSet(native))
+        return polysets
+
+    def test_empty(self):
+        self.assertEqual(0, len(PolygonSet.union_all([])))
+
+    def test_disjoint(self):
+        polysets = self.create_squares([(x * 10, 0) for x in range(9)], 5)
+        result = PolygonSet.union_all(polysets)
+        self.assertEqual(9, len(result))
+        self.assertEqual(1, len(polysets[0]))  # inputs are not modified
+
+    def test_overlapping(self):
+        polysets = self.create_squares([(x * 4, 0) for x in range(9)], 5)
+        result = PolygonSet.union_all(polysets)
+        self.assertEqual(1, len(result))
+        bbox_min, bbox_max = result.bounding_box
+        self.assertEqual((0, 0), (bbox_min.x, bbox_min.y))
+        self.assertEqual((37, 5), (bbox_max.x, bbox_max.y))
+
+    def test_processes(self):
+        polysets = self.create_squares([(x * 4, 0) for x in range(9)] + [(x * 10, 20) for x in range(9)], 5)
+        self.assertEqual(10, len(PolygonSet.union_all(polysets, processes=2)))
@@ -0,0 +1,75 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pcbnew as _pcbnew
+from kicad.scripting.footprint_wizard import FootprintScriptingWizard, FootprintWizard
+from kicad.scripting.parameter import ParameterMap, ParsedParameterMap
+
+
+class TrivialWizard(FootprintWizard):
+    """Names the footprint after its size, and fails for negative sizes"""
+
+    def generate_parameter_list(self, params):
+        params.add_parameter("Package", "size", int, 1)
+
+    def build_footprint(self, module, params):
+        size = params._parsed_parameters['size'].value
+        if size < 0:
+            raise ValueError("negative size")
+        module.get_native().SetFPID(_pcbnew.LIB_ID("", "Trivial_{}".format(size)))
+        return module
+
+
+def _params(size):
+    params = ParameterMap()
+    TrivialWizard().generate_parameter_list(params)
+    fp_params = ParsedParameterMap(params)
+    fp_params.add('size', size)
+    return fp_params
+
+
+class FootprintScriptingWizardTests(unittest.TestCase):
+
+    def setUp(self):
+        self.library = tempfile.mkdtemp()
+        self.wizard = FootprintScriptingWizard(TrivialWizard)
+        self.sizes = [(i * 7) % 23 - 3 for i in range(40)]  # more than one chunk per process, some of them fail
+
+    def tearDown(self):
+        shutil.rmtree(self.library)
+
+    def _build(self, jobs):
+        results = []
+        for fp_params, path, duration, error in self.wizard.build_footprints((_params(s) for s in self.sizes),
+                                                                             self.library, dry_run=True, jobs=jobs):
+            self.assertGreaterEqual(duration, 0)
+            results.append((repr(fp_params), path, error.splitlines()[-1] if error else None))
+        return results
+
+    def test_build_footprints(self):
+        results = self._build(1)
+        self.assertEqual([repr(_params(s)) for s in self.sizes], [params for params, _, _ in results])
+        self.assertEqual((os.path.join(self.library, 'Trivial_4.kicad_mod'), None), results[1][1:])
+        self.assertEqual((None, 'ValueError: negative size'), results[0][1:])
+        self.assertEqual([], os.listdir(self.library))  # nothing is saved in a dry run
+
+    def test_build_footprints_jobs(self):
+        self.assertEqual(self._build(1), self._build(3))
+        self.assertEqual([], os.listdir(self.library))
@@ -0,0 +1,127 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kicad.pcbnew import Board, Layer
+from kicad.plotter import PlotCache, Plotter, plot_boards
+
+
+TEST_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pcbnew', 'testproject')
+TEST_PROJECT_FILE = os.path.join(TEST_PROJECT_DIR, 'testproject.kicad_pcb')
+
+
+class PlotterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.board = Board.from_file(TEST_PROJECT_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_plot_layers(self):
+        layers = [Layer.from_name('F.Cu'), Layer.from_name('B.Cu')]
+        files = Plotter(self.board).plot_layers(layers, Plotter.PLOT_FORMAT_GERBER, self.path)
+        self.assertEqual(2, len(files))
+        self.assertIn('F_Cu', os.path.basename(files[0]))
+        for f in files:
+            self.assertTrue(os.path.isfile(f))
+
+    def test_plot_layers_naming(self):
+        files = Plotter(self.board).plot_layers([Layer.from_name('F.Cu')], Plotter.PLOT_FORMAT_SVG, self.path,
+                                                naming=lambda layer: 'top')
+        self.assertIn('top', os.path.basename(files[0]))
+
+    def test_plot_drill(self):
+        files = Plotter(self.board).plot_drill(self.path)
+        self.assertNotEqual([], files)
+
+
+class PlotBoardsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_plot_boards(self):
+        paths = [TEST_PROJECT_FILE, os.path.join(TEST_PROJECT_DIR, 'not_existing.kicad_pcb')]
+        results = {r.path: r for r in plot_boards(paths, [Layer.from_name('F.Cu')], Plotter.PLOT_FORMAT_GERBER,
+                                                  self.path, processes=2)}
+        self.assertEqual(set(paths), set(results))
+
+        result = results[TEST_PROJECT_FILE]
+        self.assertTrue(result.ok)
+        self.assertEqual(1, len(result.files))
+        self.assertEqual(os.path.join(self.path, 'testproject'), os.path.dirname(result.files[0]))
+
+        self.assertFalse(results[paths[1]].ok)
+        self.assertEqual([], results[paths[1]].files)
+
+
+class PlotCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.path, 'cache')
+        self.board = Board.from_file(TEST_PROJECT_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _write(self, name, size):
+        path = os.path.join(self.path, name)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        return path
+
+    def test_get_put(self):
+        cache = PlotCache(self.cache_path)
+        destination = os.path.join(self.path, 'out')
+        self.assertFalse(cache.get('key', destination))
+
+        cache.put('key', self._write('plot', 10))
+        self.assertTrue(cache.get('key', destination))
+        with open(destination, 'rb') as f:
+            self.assertEqual(b'x' * 10, f.read())
+
+    def test_evict(self):
+        cache = PlotCache(self.cache_path, max_size=25)
+        cache.put('a', self._write('a', 10))
+        os.utime(os.path.join(self.cache_path, 'a'), (0, 0))
+        cache.put('b', self._write('b', 10))
+        cache.put('c', self._write('c', 10))  # 'a' is the least recently used entry
+        self.assertEqual(['b', 'c'], sorted(os.listdir(self.cache_path)))
+
+    def test_plot_layers(self):
+        cache = PlotCache(self.cache_path)
+        layers = [Layer.from_name('F.Cu')]
+        first = Plotter(self.board, cache=cache).plot_layers(layers, Plotter.PLOT_FORMAT_GERBER,
+                                                             os.path.join(self.path, 'first'))
+        self.assertEqual(1, len(os.listdir(self.cache_path)))
+
+        second = Plotter(self.board, cache=cache).plot_layers(layers, Plotter.PLOT_FORMAT_GERBER,
+                                                              os.path.join(self.path, 'second'))
+        self.assertEqual(1, len(os.listdir(self.cache_path)))
+        with open(first[0], 'rb') as f1, open(second[0], 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+        Plotter(self.board, cache=cache).plot_layers(layers, Plotter.PLOT_FORMAT_SVG, os.path.join(self.path, 'svg'))
+        self.assertEqual(2, len(os.listdir(self.cache_path)))
@@ -0,0 +1,81 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from kicad.util.files import atomic_write, makedirs
+
+
+class FilesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_makedirs(self):
+        path = os.path.join(self.path, 'a', 'b')
+        makedirs(path)
+        makedirs(path)  # already existing
+        self.assertTrue(os.path.isdir(path))
+
+        filename = os.path.join(self.path, 'file')
+        io.open(filename, 'wb').close()
+        self.assertRaises(OSError, makedirs, filename)
+
+    def test_atomic_write(self):
+        filename = os.path.join(self.path, 'file.txt')
+        with atomic_write(filename, 'w', encoding='utf-8') as f:
+            f.write(u'first')
+        with atomic_write(filename) as f:
+            f.write(b'second')
+        with io.open(filename, 'rb') as f:
+            self.assertEqual(b'second', f.read())
+        self.assertEqual(['file.txt'], os.listdir(self.path))
+
+    def test_atomic_write_error(self):
+        filename = os.path.join(self.path, 'file.txt')
+        with atomic_write(filename) as f:
+            f.write(b'original')
+
+        with self.assertRaises(RuntimeError):
+            with atomic_write(filename) as f:
+                f.write(b'partial')
+                raise RuntimeError()
+
+        with io.open(filename, 'rb') as f:
+            self.assertEqual(b'original', f.read())
+        self.assertEqual(['file.txt'], os.listdir(self.path))
+
+    def test_atomic_write_mode(self):
+        filename = os.path.join(self.path, 'file.txt')
+        umask = os.umask(0o022)
+        try:
+            with atomic_write(filename) as f:
+                f.write(b'new')
+            self.assertEqual(0o644, stat.S_IMODE(os.stat(filename).st_mode))
+
+            os.chmod(filename, 0o640)
+            with atomic_write(filename) as f:
+                f.write(b'replaced')
+            self.assertEqual(0o640, stat.S_IMODE(os.stat(filename).st_mode))
+        finally:
+            os.umask(umask)
@@ -13,6 +13,7 @@
 #
 # (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
 
+import pickle
 import unittest
 
 from kicad.util.point import Point2D
@@ -49,6 +50,26 @@ class Point2DTests(unittest.TestCase):
         # TODO: invalid type tests
         # TODO: tests if int is always converted to float
 
+    def test_nm(self):
+        p1 = Point2D.from_nm(1500000, -250000)
+        self.assertEqual(p1.x, 1.5)
+        self.assertEqual(p1.y, -0.25)
+        self.assertIs(type(p1.x), float)
+
+        self.assertEqual(Point2D(1.5, -0.25).to_nm(), (1500000, -250000))
+        self.assertEqual(Point2D(4.35, 0.3).to_nm(), (4350000, 300000))  # no truncation errors
+
+    def test_slots(self):
+        p1 = Point2D(1, 2)
+        self.assertRaises(AttributeError, setattr, p1, 'z', 3)
+
+        p1.x = 5
+        self.assertEqual(p1.x, 5)
+
+    def test_pickle(self):
+        p1 = Point2D(1.5, 2.5)
+        self.assertEqual(p1, pickle.loads(pickle.dumps(p1)))
+
     def test_round_to(self):
         p1 = Point2D([1.234, 5.678]).round_to(0)
         self.assertAlmostEqual(p1.x, 1.234)
@@ -0,0 +1,74 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import unittest
+
+import kicad.util.point
+from kicad.util.point import Point2D, PointArray
+
+
+class PointArrayTests(unittest.TestCase):
+
+    def test_init(self):
+        a = PointArray([[1, 2], (3, 4), Point2D(5, 6), {'x': 7, 'y': 8}])
+        self.assertEqual(4, len(a))
+        self.assertEqual([Point2D(1, 2), Point2D(3, 4), Point2D(5, 6), Point2D(7, 8)], list(a))
+        self.assertEqual(Point2D(7, 8), a[-1])
+        self.assertEqual([1, 3, 5, 7], list(a.x))
+        self.assertEqual([2, 4, 6, 8], list(a.y))
+        self.assertEqual(PointArray([[3, 4], [5, 6]]), a[1:3])
+
+        self.assertEqual(0, len(PointArray()))
+        self.assertEqual(a, PointArray(a))
+
+    def test_nm(self):
+        a = PointArray.from_nm([1500000, -250000, 0, 4350000])
+        self.assertEqual(PointArray([[1.5, -0.25], [0, 4.35]]), a)
+        self.assertEqual([(1500000, -250000), (0, 4350000)], a.to_nm())
+
+    def test_arithmetic(self):
+        a = PointArray([[1, 2], [3, 4]])
+        self.assertEqual(PointArray([[6, 7], [8, 9]]), a + 5)
+        self.assertEqual(PointArray([[0, 0], [2, 2]]), a - [1, 2])
+        self.assertEqual(PointArray([[2, 6], [6, 12]]), a * Point2D(2, 3))
+        self.assertEqual(PointArray([[0.25, 0.4], [0.75, 0.8]]), a / [4, 5])
+        self.assertEqual(PointArray([[2, 4], [6, 8]]), a + a)
+        self.assertRaises(ValueError, a.__add__, PointArray([[1, 2]]))
+
+    def test_round_to(self):
+        a = PointArray([[1.234, 5.678], [-1.234, -5.678]])
+        self.assertEqual(a, a.round_to(0))
+
+        rounded = a.round_to(0.1)
+        self.assertAlmostEqual(1.2, rounded[0].x)
+        self.assertAlmostEqual(5.7, rounded[0].y)
+        self.assertAlmostEqual(-1.2, rounded[1].x)
+        self.assertAlmostEqual(-5.7, rounded[1].y)
+
+    def test_bounding_box(self):
+        a = PointArray([[1, 8], [-3, 4], [5, -6]])
+        self.assertEqual((Point2D(-3, -6), Point2D(5, 8)), a.bounding_box())
+        self.assertRaises(ValueError, PointArray().bounding_box)
+
+
+class PointArrayFallbackTests(PointArrayTests):
+    """Run the same tests using the array('d') storage, which is used when numpy is not installed"""
+
+    def setUp(self):
+        self._numpy_available = kicad.util.point._NUMPY_AVAILABLE
+        kicad.util.point._NUMPY_AVAILABLE = False
+
+    def tearDown(self):
+        kicad.util.point._NUMPY_AVAILABLE = self._numpy_available
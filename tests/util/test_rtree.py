@@ -0,0 +1,82 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import unittest
+
+from kicad.util.point import Point2D
+from kicad.util.rtree import RTree
+
+
+def grid_entries(count):
+    return [((x, y), [(x, y), (x + 0.5, y + 0.5)]) for x in range(count) for y in range(count)]
+
+
+class RTreeTests(unittest.TestCase):
+
+    def test_empty(self):
+        tree = RTree()
+        self.assertEqual(0, len(tree))
+        self.assertEqual([], tree.query_point((0, 0)))
+        self.assertEqual([], tree.nearest((0, 0)))
+
+    def test_query_bbox(self):
+        tree = RTree(grid_entries(20), node_capacity=4)
+        self.assertEqual(400, len(tree))
+        self.assertEqual({(2, 3), (2, 4), (3, 3), (3, 4)}, set(tree.query_bbox([(2.2, 3.2), (3.1, 4.1)])))
+        self.assertEqual([], tree.query_bbox([(50, 50), (60, 60)]))
+
+    def test_query_point(self):
+        tree = RTree(grid_entries(10))
+        self.assertEqual([(5, 7)], tree.query_point(Point2D(5.25, 7.25)))
+        self.assertEqual([], tree.query_point(Point2D(5.75, 7.25)))
+
+    def test_normalize_bbox(self):
+        tree = RTree([('a', [(1, 1), (0, 0)])])
+        self.assertEqual((0, 0, 1, 1), tree.bounding_box('a'))
+        self.assertEqual(['a'], tree.query_point((0.5, 0.5)))
+
+    def test_nearest(self):
+        tree = RTree(grid_entries(10), node_capacity=4)
+        self.assertEqual([(9, 9)], tree.nearest((20, 20)))
+        self.assertEqual([(3, 4), (3, 3)], tree.nearest((3.25, 3.8), k=2))
+        self.assertEqual(100, len(tree.nearest((0, 0), k=1000)))
+
+    def test_insert(self):
+        tree = RTree(node_capacity=2)
+        for item, bbox in grid_entries(10):
+            tree.insert(item, bbox)
+        self.assertEqual(100, len(tree))
+        self.assertEqual([(4, 2)], tree.query_point((4.1, 2.1)))
+        self.assertRaises(ValueError, tree.insert, (4, 2), [(0, 0), (1, 1)])
+
+    def test_remove(self):
+        tree = RTree(grid_entries(10), node_capacity=4)
+        tree.remove((4, 2))
+        self.assertNotIn((4, 2), tree)
+        self.assertEqual([], tree.query_point((4.1, 2.1)))
+        self.assertRaises(KeyError, tree.remove, (4, 2))
+
+        for item, _ in grid_entries(10):
+            if item in tree:
+                tree.remove(item)
+        self.assertEqual(0, len(tree))
+        self.assertEqual([], tree.query_point((1.1, 1.1)))
+
+    def test_update(self):
+        tree = RTree(grid_entries(10), node_capacity=4)
+        tree.update((4, 2), [(20, 20), (21, 21)])
+        self.assertEqual([], tree.query_point((4.1, 2.1)))
+        self.assertEqual([(4, 2)], tree.query_point((20.5, 20.5)))
+        self.assertEqual([(4, 2)], tree.nearest((30, 30)))
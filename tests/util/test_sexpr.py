@@ -0,0 +1,151 @@
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# (C) 2018 by Thomas Pointhuber, <thomas.pointhuber@gmx.at>
+
+import io
+import unittest
+
+from kicad.util.sexpr import QuotedString, changed_ranges, dumps, format_float, iter_parse, parse, parse_string, \
+    splice, write_root
+
+
+class SexprTests(unittest.TestCase):
+
+    def test_parse_string(self):
+        node = parse_string('(pad 1 smd rect (at -1.1 0) (net 9 "GND"))')
+        self.assertEqual(['pad', '1', 'smd', 'rect', ['at', '-1.1', '0'], ['net', '9', 'GND']], node)
+        self.assertEqual('pad', node.name)
+        self.assertEqual(['at', '-1.1', '0'], node.find('at'))
+        self.assertEqual('9', node.value('net'))
+        self.assertIsNone(node.find('drill'))
+        self.assertEqual(['1', 'smd', 'rect'], list(node.atoms()))
+
+    def test_quoted_strings(self):
+        node = parse_string(r'(text "a \"b\" (c)" "" d)')
+        self.assertEqual(['text', 'a "b" (c)', '', 'd'], node)
+        self.assertIs(QuotedString, type(node[1]))
+        self.assertIs(QuotedString, type(node[2]))
+        self.assertIsNot(QuotedString, type(node[3]))
+
+    def test_non_ascii(self):
+        node = parse_string(u'(fp_text value "10\u00b5F" \u00b5F)')
+        self.assertEqual([u'fp_text', u'value', u'10\u00b5F', u'\u00b5F'], node)
+        self.assertIs(QuotedString, type(node[2]))
+        self.assertIsInstance(node[2], type(node[3]))  # quoted and unquoted atoms are both text
+        self.assertEqual(u'(fp_text value "10\u00b5F" \u00b5F)', dumps(node))
+
+    def test_chunk_boundaries(self):
+        text = u'(kicad_pcb (version 1) (net 1 "Net-(RN1-Pad1)") (segment (start 152.595 90.095) (width 0.25)))'
+        expected = parse(io.StringIO(text))
+        for chunk_size in [1, 2, 3, 5, 8, 13]:
+            self.assertEqual(expected, parse(io.StringIO(text), chunk_size=chunk_size))
+
+    def test_iter_parse(self):
+        nodes = iter_parse(io.StringIO(u'(kicad_pcb (version 1) (net 0 "") (net 1 GND))'))
+        self.assertEqual(['kicad_pcb'], next(nodes))
+        self.assertEqual([['version', '1'], ['net', '0', ''], ['net', '1', 'GND']], list(nodes))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parse_string, 'kicad_pcb')
+        self.assertRaises(ValueError, parse_string, '(kicad_pcb (version 1)')
+        self.assertRaises(ValueError, parse_string, '(kicad_pcb))')
+        self.assertRaises(ValueError, parse_string, '(kicad_pcb "unterminated)')
+
+
+class SexprWriterTests(unittest.TestCase):
+
+    def test_format_float(self):
+        self.assertEqual('1.27', format_float(1.27))
+        self.assertEqual('0', format_float(-0.0000001))
+        self.assertEqual('-3', format_float(-3.))
+
+    def test_dumps_inline(self):
+        self.assertEqual('(segment (start 1 2) (end 3 4) (width 0.25) (layer F.Cu) (net 1))',
+                         dumps(parse_string('(segment (start 1 2) (end 3 4) (width 0.25) (layer F.Cu) (net 1))')))
+        self.assertEqual('(pad 1 smd rect (at -1.1 0) (size 1 1) (layers F.Cu))',
+                         dumps(parse_string('(pad 1 smd rect (at -1.1 0) (size 1 1) (layers F.Cu))')))
+
+    def test_dumps_quoting(self):
+        node = parse_string(r'(text "a \"b\" (c)" "" d "e")')
+        self.assertEqual(r'(text "a \"b\" (c)" "" d "e")', dumps(node))
+        self.assertEqual(node, parse_string(dumps(node)))
+        self.assertEqual('(text "a b" 1 2.5)', dumps(['text', 'a b', 1, 2.5]))
+
+    def test_dumps_multiline(self):
+        node = parse_string('(zone (net 1) (layer F.Cu) (fill yes (arc_segments 16)) (polygon (pts {})))'.format(
+            ' '.join(['(xy 100.5 200.5)'] * 7)))
+        text = dumps(node, 2)
+        self.assertEqual(node, parse_string(text))
+        self.assertEqual('(zone (net 1) (layer F.Cu)\n'
+                         '    (fill yes (arc_segments 16))\n'
+                         '    (polygon\n'
+                         '      (pts\n'
+                         '        {}\n'
+                         '        (xy 100.5 200.5) (xy 100.5 200.5)\n'
+                         '      )\n'
+                         '    )\n'
+                         '  )'.format(' '.join(['(xy 100.5 200.5)'] * 5)), text)
+
+    def test_dumps_module(self):
+        node = parse_string('(module R_0603 (layer F.Cu) (tedit 0) (at 1 2) (fp_text reference R1 (at 0 0) '
+                            '(layer F.SilkS) hide (effects (font (size 1 1) (thickness 0.15)))) '
+                            '(fp_poly (pts {}) (layer F.SilkS) (width 0.1)) '
+                            '(pad 1 smd rect (at -1 0) (size 1 1) (layers F.Cu) (net 1 GND)))'.format(
+                                ' '.join(['(xy 1 2)'] * 6)))
+        self.assertEqual('(module R_0603 (layer F.Cu) (tedit 0)\n'
+                         '  (at 1 2)\n'
+                         '  (fp_text reference R1 (at 0 0) (layer F.SilkS) hide\n'
+                         '    (effects (font (size 1 1) (thickness 0.15)))\n'
+                         '  )\n'
+                         '  (fp_poly (pts (xy 1 2) (xy 1 2) (xy 1 2) (xy 1 2)\n'
+                         '    (xy 1 2) (xy 1 2)) (layer F.SilkS) (width 0.1))\n'
+                         '  (pad 1 smd rect (at -1 0) (size 1 1) (layers F.Cu)\n'
+                         '    (net 1 GND))\n'
+                         ')', dumps(node))
+
+    def test_write_root(self):
+        stream = io.StringIO()
+        write_root(parse_string('(kicad_pcb (version 4))'), [parse_string('(net 0 "")')], stream)
+        self.assertEqual(u'(kicad_pcb (version 4)\n  (net 0 "")\n)\n', stream.getvalue())
+
+    def test_splice(self):
+        source = b'(a\n  (b 1)\n  (c 2)\n  (d 3)\n)\n'
+        stream = io.BytesIO()
+        splice(source, stream, [(5, 10, parse_string('(b 10)'), 2), (21, 26, None, 2)], chunk_size=4)
+        self.assertEqual(b'(a\n  (b 10)\n  (c 2)\n  \n)\n', stream.getvalue())
+
+        self.assertRaises(ValueError, splice, source, io.BytesIO(), [(21, 26, None, 2), (5, 10, None, 2)])
+
+    def test_changed_ranges(self):
+        source = (b'(module X (layer F.Cu)\n'
+                  b'  (pad 1 smd rect (at 0 0) (size 1 1))\n'
+                  b'  (pad 2 smd rect (at 1 0) (size 1 1))\n'
+                  b')')
+        original = parse_string(source.decode())
+        self.assertEqual([], changed_ranges(source, 0, len(source), original, original))
+
+        node = parse_string(source.decode())
+        node[4][5][1] = 2.
+        self.assertEqual([(89, 99, node[4][5], 2)], changed_ranges(source, 0, len(source), node, original))
+        self.assertEqual(b'(size 1 1)', source[89:99])
+
+        node = parse_string(source.decode())
+        node[4].append(parse_string('(net 1 GND)'))  # the pad gets another child, it has to be written as a whole
+        self.assertEqual([(64, 100, node[4], 2)], changed_ranges(source, 0, len(source), node, original))
+
+        node = parse_string('(zone (polygon (pts (xy 0 0) (xy 1 0))))')
+        original = parse_string('(zone (polygon (pts (xy 0 0))))')
+        source = b'(zone (polygon (pts (xy 0 0))))'
+        # points of a polygon are written depending on their parent, so the polygon is written again
+        self.assertEqual([(6, 30, node[1], 0)], changed_ranges(source, 0, len(source), node, original))